@@ -0,0 +1,54 @@
+# backfill.py
+import argparse
+import asyncio
+import csv
+
+from src.connectors.http_client import create_http_client
+from src.database import create_db_and_tables, shutdown_db_executor
+from src.logging_config import setup_logging
+from src.schemas.jobs import Dataset
+from src.services.ingestion import IngestionService
+from src.services.jobs import JobManager
+
+CSV_PATH = "symbols.csv"
+
+def load_symbols(csv_file: str) -> list[str]:
+    with open(csv_file, newline="") as f:
+        reader = csv.DictReader(f)
+        return [row["symbol"] for row in reader]
+
+async def run(symbols: list[str], datasets: list[Dataset]) -> dict:
+    # Writes straight to the database through the staging-table loader, not through the API
+    http_client = create_http_client()
+    try:
+        return await IngestionService(http_client=http_client).backfill(symbols, datasets)
+    finally:
+        await http_client.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="First-time load of full history for many symbols.")
+    parser.add_argument("symbols", nargs="*", help="symbols to load (default: read from --csv)")
+    parser.add_argument("--csv", default=CSV_PATH, help="CSV file with a 'symbol' column")
+    parser.add_argument(
+        "--datasets", nargs="+", choices=[d.value for d in Dataset], default=[d.value for d in Dataset],
+    )
+    args = parser.parse_args()
+
+    symbols = JobManager.normalize_symbols(args.symbols or load_symbols(args.csv))
+    datasets = [Dataset(d) for d in args.datasets]
+
+    setup_logging()
+    create_db_and_tables()
+    try:
+        summary = asyncio.run(run(symbols, datasets))
+    finally:
+        shutdown_db_executor()
+
+    for dataset, counts in summary.items():
+        print(
+            f"✔ {dataset.value}: {counts['symbols']} symbols, {counts['staged']} rows staged, "
+            f"inserted {counts['inserted']}, updated {counts['updated']}, {counts['failed']} failed"
+        )
+
+if __name__ == "__main__":
+    main()
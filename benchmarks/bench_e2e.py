@@ -0,0 +1,287 @@
+"""
+End-to-end ingestion benchmark against the local Alphavantage stand-in
+(benchmarks/mock_alphavantage.py) and a fresh SQLite database.
+
+Each (dataset, concurrency, mode) run is a batch job driven through
+JobManager in its own process, so peak RSS is per run. Concurrency is
+BATCH_MAX_CONCURRENCY; mode ``direct`` commits per payload and mode
+``pipeline`` goes through the batched writer stage. Reported per run:
+rows/s, commits, failed items, p50/p95/p99 per ingestion stage and peak
+RSS. Results are saved as JSON named after the commit, and ``--compare``
+prints the change against an earlier results file.
+
+    python -m benchmarks.bench_e2e --symbols 20 --concurrency 1 4 16 --modes direct pipeline
+    python -m benchmarks.bench_e2e --latency-ms 50 --throttle-rate 0.02 --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then not reported
+    resource = None
+
+DATASETS = ["balance_sheet", "income_statement", "daily_prices"]
+STAGES = ["fetch", "parse", "validate", "upsert", "total"]
+PERCENTILES = (50, 95, 99)
+RESULT_PREFIX = "BENCH-RESULT "
+# Results are named after this checkout's commit, wherever the benchmark runs from
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+# ─────────────────────────────── child run ────────────────────────────────
+async def _run_job(dataset: str, symbols: int, pipeline_mode: bool) -> Dict[str, Any]:
+    # Imported here: the parent sets the environment these settings are read from
+    from src.connectors.http_client import create_http_client
+    from src.metrics import COMMIT_SECONDS, STAGE_SECONDS
+    from src.schemas.jobs import Dataset, JobStatus
+    from src.services.ingestion import IngestionService
+    from src.services.jobs import JobManager
+    from src.services.pipeline import WritePipeline
+
+    # Keep every stage sample for exact percentiles; the histograms only keep buckets
+    samples: Dict[str, List[float]] = defaultdict(list)
+    commits = [0]
+    observe_stage, observe_commit = STAGE_SECONDS.observe, COMMIT_SECONDS.observe
+
+    def tap_stage(value: float, **labels: str) -> None:
+        samples[labels["stage"]].append(value)
+        observe_stage(value, **labels)
+
+    def tap_commit(value: float, **labels: str) -> None:
+        commits[0] += 1
+        observe_commit(value, **labels)
+
+    STAGE_SECONDS.observe = tap_stage
+    COMMIT_SECONDS.observe = tap_commit
+
+    http_client = create_http_client()
+    service = IngestionService(http_client=http_client)
+    manager = JobManager(service, pipeline=WritePipeline(service) if pipeline_mode else None)
+    try:
+        started = time.perf_counter()
+        await manager.start()
+        accepted = await manager.submit([f"B{i:04d}" for i in range(symbols)], [Dataset(dataset)])
+        while True:
+            job = await manager.get(accepted.id)
+            if job.status not in (JobStatus.PENDING, JobStatus.RUNNING):
+                break
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+    finally:
+        await manager.shutdown()
+        await http_client.aclose()
+
+    rows = job.inserted + job.updated
+    return {
+        "seconds": round(elapsed, 3),
+        "rows": rows,
+        "rows_per_second": round(rows / elapsed, 1),
+        "commits": commits[0],
+        "failed_items": job.failed_items,
+        "stages": {
+            stage: {f"p{q}": percentile(samples[stage], q) for q in PERCENTILES}
+            for stage in STAGES
+            if samples[stage]
+        },
+    }
+
+
+def child(config: Dict[str, Any]) -> None:
+    from src.database import create_db_and_tables, shutdown_db_executor
+    from src.logging_config import setup_logging
+
+    setup_logging()
+    create_db_and_tables()
+    try:
+        result = asyncio.run(_run_job(config["dataset"], config["symbols"], config["mode"] == "pipeline"))
+    finally:
+        shutdown_db_executor()
+    result["peak_rss_mb"] = peak_rss_mb()
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ─────────────────────────────── parent run ───────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    port = args.port or _free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_alphavantage", "--port", str(port),
+        "--days", str(args.days), "--years", str(args.years), "--latency-ms", str(args.latency_ms),
+        "--error-rate", str(args.error_rate), "--throttle-rate", str(args.throttle_rate),
+    ])
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return server, f"http://127.0.0.1:{port}/query"
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("The Alphavantage stand-in server did not start")
+
+
+def run_one(args: argparse.Namespace, base_url: str, dataset: str, concurrency: int, mode: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        env = dict(
+            os.environ,
+            ALPHAVANTAGE_BASE_URL=base_url,
+            ALPHAVANTAGE_API_KEY="bench",
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            BATCH_MAX_CONCURRENCY=str(concurrency),
+            # The stand-in has no quota; throttle Notes still exercise the limiter
+            ALPHAVANTAGE_CALLS_PER_MINUTE="1000000",
+            ALPHAVANTAGE_BURST=str(max(concurrency, 5)),
+            RESPONSE_CACHE_ENABLED="false",
+            JOB_POLL_SECONDS="0.05",
+            JOB_RETRY_BASE_SECONDS="0.1",
+            EXPORT_AFTER_BATCH="false",
+            LOG_LEVEL="ERROR",
+            LOG_FILE=os.path.join(tmp, "bench.log"),
+        )
+        config = {"dataset": dataset, "symbols": args.symbols, "mode": mode}
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_e2e", "--child", json.dumps(config)],
+            env=env, capture_output=True, text=True,
+        )
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return {"dataset": dataset, "concurrency": concurrency, "mode": mode, **json.loads(line[len(RESULT_PREFIX):])}
+    raise RuntimeError(f"Benchmark run {dataset}/{concurrency}/{mode} failed:\n{proc.stderr[-2000:]}")
+
+
+def git_revision() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT, capture_output=True, text=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return sha.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:.1f}" if value is not None else "-"
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'dataset':>16} {'conc':>4} {'mode':>8} {'rows':>8} {'rows/s':>9} {'commits':>7} {'failed':>6} "
+        f"{'total p50/p95/p99 ms':>22} {'fetch p50':>9} {'upsert p50':>10} {'RSS MB':>7}"
+    )
+    for r in results:
+        total = r["stages"].get("total", {})
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+        print(
+            f"{r['dataset']:>16} {r['concurrency']:>4} {r['mode']:>8} {r['rows']:>8} {r['rows_per_second']:>9.0f} "
+            f"{r['commits']:>7} {r['failed_items']:>6} "
+            f"{'/'.join(_ms(total.get(f'p{q}')) for q in PERCENTILES):>22} "
+            f"{_ms(r['stages'].get('fetch', {}).get('p50')):>9} {_ms(r['stages'].get('upsert', {}).get('p50')):>10} "
+            f"{rss:>7}"
+        )
+
+
+def print_comparison(results: List[Dict[str, Any]], path: str) -> None:
+    with open(path) as f:
+        earlier = json.load(f)
+    def key(r: Dict[str, Any]) -> Tuple[str, int, str]:
+        return r["dataset"], r["concurrency"], r["mode"]
+
+    before = {key(r): r for r in earlier["results"]}
+    print(f"\nCompared with {earlier['revision']} ({path}):")
+    for r in results:
+        old = before.get(key(r))
+        if old is None or not old["rows_per_second"]:
+            continue
+        change = (r["rows_per_second"] - old["rows_per_second"]) / old["rows_per_second"] * 100
+        old_p95 = old["stages"].get("total", {}).get("p95")
+        new_p95 = r["stages"].get("total", {}).get("p95")
+        print(
+            f"{r['dataset']:>16} {r['concurrency']:>4} {r['mode']:>8}  rows/s {old['rows_per_second']:>9.0f} -> "
+            f"{r['rows_per_second']:>9.0f} ({change:+.1f}%)  total p95 ms {_ms(old_p95)} -> {_ms(new_p95)}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=DATASETS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--modes", nargs="+", choices=["direct", "pipeline"], default=["direct"])
+    parser.add_argument("--symbols", type=int, default=20, help="symbols per job")
+    parser.add_argument("--days", type=int, default=5000, help="sessions per full daily series")
+    parser.add_argument("--years", type=int, default=20, help="annual reports per fundamentals payload")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mean stand-in response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=0, help="stand-in server port (default: any free port)")
+    parser.add_argument("--dir", default=".", help="where to create the databases (avoid tmpfs: fsync cost matters)")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results"), help="directory for result files")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(json.loads(args.child))
+        return
+
+    server, base_url = start_server(args)
+    try:
+        results = [
+            run_one(args, base_url, dataset, concurrency, mode)
+            for dataset in args.datasets
+            for concurrency in args.concurrency
+            for mode in args.modes
+        ]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_results(results)
+    revision = git_revision()
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now():%Y%m%d-%H%M%S}-{revision}.json")
+    config = {k: v for k, v in vars(args).items() if k not in ("child", "compare", "output")}
+    with open(path, "w") as f:
+        json.dump({"revision": revision, "created_at": datetime.now().isoformat(), "config": config, "results": results}, f, indent=2)
+    print(f"\nSaved {path}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
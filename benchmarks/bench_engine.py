@@ -0,0 +1,132 @@
+"""
+Concurrent ingest against SQLite with SQLAlchemy's default engine and with
+the tuned profile from src.database.build_engine (WAL, synchronous=NORMAL,
+cache_size, mmap_size, busy_timeout).
+
+Writer threads upsert daily prices for their own symbols in committed
+batches, as streamed full-history ingests do. A reader thread pages
+through the table at the same time.
+
+    python -m benchmarks.bench_engine --writers 1 4 8 --symbols 4 --days 2500
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, build_engine
+from src.models import daily_price  # noqa: F401  (registers the table)
+from src.repositories.data_repository import DailyPriceRepository
+from src.schemas.batch import get_batch_validator
+from src.schemas.price import DailyPriceIn
+
+
+def price_batches(symbol: str, days: int, batch_size: int) -> List[list]:
+    start = date(1990, 1, 1)
+    rows = [
+        {
+            "symbol": symbol,
+            "date": (start + timedelta(days=i)).isoformat(),
+            "open_price": 100.0 + i % 7,
+            "high_price": 101.0 + i % 7,
+            "low_price": 99.0 + i % 7,
+            "close_price": 100.5 + i % 7,
+            "volume": 1_000_000 + i,
+        }
+        for i in range(days)
+    ]
+    validator = get_batch_validator(DailyPriceIn)
+    return [validator.validate(rows[i:i + batch_size]) for i in range(0, days, batch_size)]
+
+
+def run(tuned: bool, writers: int, symbols: int, days: int, batch_size: int, directory: str) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", tuned=tuned)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+        work = {
+            w: [price_batches(f"W{w}S{s}", days, batch_size) for s in range(symbols)]
+            for w in range(writers)
+        }
+        counts = {"rows": 0, "commits": 0, "lock_errors": 0, "pages": 0}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def writer(w: int) -> None:
+            for batches in work[w]:
+                for batch in batches:
+                    try:
+                        with Session() as db:
+                            result = DailyPriceRepository(db).upsert_many(batch)
+                    except OperationalError:
+                        with lock:
+                            counts["lock_errors"] += 1
+                        continue
+                    with lock:
+                        counts["rows"] += result.total
+                        counts["commits"] += 1
+
+        def reader() -> None:
+            after = None
+            while not done.is_set():
+                try:
+                    with Session() as db:
+                        rows = DailyPriceRepository(db).page(after=after, limit=500)
+                except OperationalError:
+                    continue
+                after = (rows[-1]["symbol"], rows[-1]["trade_date"]) if rows else None
+                counts["pages"] += 1
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+        read_thread = threading.Thread(target=reader)
+        started = time.perf_counter()
+        read_thread.start()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        read_thread.join()
+        engine.dispose()
+
+    return {
+        "seconds": elapsed,
+        "rows_per_second": counts["rows"] / elapsed,
+        "commits": counts["commits"],
+        "lock_errors": counts["lock_errors"],
+        "reader_pages": counts["pages"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--symbols", type=int, default=4, help="symbols per writer")
+    parser.add_argument("--days", type=int, default=2500, help="price rows per symbol")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dir", default=".", help="where to create the databases (avoid tmpfs: fsync cost matters)")
+    args = parser.parse_args()
+    # Lock failures are counted below; the repositories' error logs would drown the table
+    logging.getLogger("ingestion_service").setLevel(logging.CRITICAL)
+
+    print(f"{'writers':>7} {'profile':>8} {'seconds':>8} {'rows/s':>10} {'commits':>8} {'locked':>7} {'pages':>7}")
+    for writers in args.writers:
+        for tuned in (False, True):
+            r = run(tuned, writers, args.symbols, args.days, args.batch_size, args.dir)
+            print(
+                f"{writers:>7} {'tuned' if tuned else 'default':>8} {r['seconds']:>8.2f} "
+                f"{r['rows_per_second']:>10.0f} {r['commits']:>8} {r['lock_errors']:>7} {r['reader_pages']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
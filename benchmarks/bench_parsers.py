@@ -0,0 +1,141 @@
+"""
+Compare the previous hand-written connector parsers with the current ones,
+on synthetic payloads shaped like the Alphavantage stand-in's. Daily prices
+go through a declarative field mapping and are timed through batch
+validation, since the mapping hands them over column by column rather
+than as row dicts. Fundamentals keep written-out parsers, which now skip
+malformed reports instead of failing the payload.
+
+    python -m benchmarks.bench_parsers --days 5000 20000 --years 20 200 --repeat 5
+"""
+import argparse
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.mock_alphavantage import BALANCE_FIELDS, INCOME_FIELDS, annual_reports, daily_series
+from src.connectors.alphavantage import AlphavantageBalanceSheetConnector, AlphavantageDailyPriceConnector
+from src.connectors.alphavantage_income import AlphavantageIncomeStatementConnector
+from src.schemas.batch import get_batch_validator
+from src.schemas.price import DailyPriceIn
+
+
+def _to_float(value):
+    if value and value != "None":
+        return float(value)
+    return None
+
+
+def _parse_day(symbol: str, day: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "date": day,
+        "open_price": float(values["1. open"]),
+        "high_price": float(values["2. high"]),
+        "low_price": float(values["3. low"]),
+        "close_price": float(values["4. close"]),
+        "volume": int(values["5. volume"]),
+    }
+
+
+def handwritten_prices(raw: Dict[str, Any], since: Optional[date] = None) -> List[dict]:
+    """Previous parser: a _parse_day call inside a try/except per series entry."""
+    symbol = raw["Meta Data"]["2. Symbol"]
+    cutoff = since.isoformat() if since else None
+    parsed = []
+    for day, values in raw["Time Series (Daily)"].items():
+        if cutoff and day <= cutoff:
+            continue
+        try:
+            parsed.append(_parse_day(symbol, day, values))
+        except (ValueError, TypeError, KeyError):
+            continue
+    return parsed
+
+
+def handwritten_balance(raw: Dict[str, Any]) -> List[dict]:
+    symbol = raw.get("symbol")
+    result = []
+    for rep in raw.get("annualReports", []):
+        if "fiscalDateEnding" not in rep:
+            continue
+        try:
+            result.append({
+                "symbol": symbol,
+                "fiscal_date_ending": date.fromisoformat(rep["fiscalDateEnding"]),
+                "reported_currency": rep.get("reportedCurrency", "USD"),
+                "total_assets": float(rep["totalAssets"]) if rep.get("totalAssets") and rep["totalAssets"] != "None" else None,
+                "total_liabilities": float(rep["totalLiabilities"]) if rep.get("totalLiabilities") and rep["totalLiabilities"] != "None" else None,
+                "total_shareholder_equity": float(rep["totalShareholderEquity"]) if rep.get("totalShareholderEquity") and rep["totalShareholderEquity"] != "None" else None,
+            })
+        except (ValueError, TypeError):
+            continue
+    return result
+
+
+def handwritten_income(raw: Dict[str, Any]) -> List[dict]:
+    symbol = raw.get("symbol")
+    return [
+        {
+            "symbol": symbol,
+            "fiscal_date_ending": date.fromisoformat(row["fiscalDateEnding"]),
+            "reported_currency": row.get("reportedCurrency", "USD"),
+            "total_revenue": _to_float(row.get("totalRevenue")),
+            "gross_profit": _to_float(row.get("grossProfit")),
+            "operating_income": _to_float(row.get("operatingIncome")),
+            "ebit": _to_float(row.get("ebit")),
+            "ebitda": _to_float(row.get("ebitda")),
+            "net_income": _to_float(row.get("netIncome")),
+        }
+        for row in raw.get("annualReports", [])
+    ]
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[100, 5000, 20000], help="sessions per daily series")
+    parser.add_argument("--years", type=int, nargs="+", default=[20, 200], help="annual reports per payload")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    prices = AlphavantageDailyPriceConnector()
+    balance = AlphavantageBalanceSheetConnector()
+    income = AlphavantageIncomeStatementConnector()
+
+    validator = get_batch_validator(DailyPriceIn)
+
+    def old_prices(raw):
+        return validator.validate(handwritten_prices(raw))
+
+    def new_prices(raw):
+        return validator.validate_columns(prices.parse_columns(raw))
+
+    cases = []
+    for n in args.days:
+        raw = {"Meta Data": {"2. Symbol": "BENCH"}, "Time Series (Daily)": daily_series("BENCH", n)}
+        cases.append(("daily_prices", n, raw, old_prices, new_prices))
+    for n in args.years:
+        raw = {"symbol": "BENCH", "annualReports": annual_reports("BENCH", n, BALANCE_FIELDS)}
+        cases.append(("balance_sheet", n, raw, handwritten_balance, balance.parse))
+        raw = {"symbol": "BENCH", "annualReports": annual_reports("BENCH", n, INCOME_FIELDS)}
+        cases.append(("income_statement", n, raw, handwritten_income, income.parse))
+
+    print(f"{'dataset':<17} {'rows':>7} {'hand-written ms':>16} {'current ms':>11} {'speedup':>8}")
+    for label, n, raw, old_parse, new_parse in cases:
+        assert old_parse(raw) == new_parse(raw)
+        old = best_of(lambda: old_parse(raw), args.repeat)
+        new = best_of(lambda: new_parse(raw), args.repeat)
+        print(f"{label:<17} {n:>7} {old * 1e3:>16.2f} {new * 1e3:>11.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Compare the daily_prices storage layouts (DAILY_PRICE_STORAGE): numeric,
+scaled and float. Each layout runs in its own process on a fresh SQLite
+database, since the model is built from the setting at import time.
+
+Reported per layout: first-load and re-upsert rows/s through
+DailyPriceRepository, per-symbol range scans through the keyset reader
+and the database size on disk.
+
+    python -m benchmarks.bench_price_storage --symbols 20 --days 5000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+STORAGES = ["numeric", "scaled", "float"]
+RESULT_PREFIX = "BENCH-RESULT "
+
+
+def price_batches(symbol: str, days: int, batch_size: int, drift: float) -> List[Any]:
+    from src.schemas.batch import get_batch_validator
+    from src.schemas.price import DailyPriceIn
+
+    start = date(1990, 1, 1)
+    rows = [
+        {
+            "symbol": symbol,
+            "date": (start + timedelta(days=i)).isoformat(),
+            "open_price": 100.1234 + i % 97 + drift,
+            "high_price": 101.5678 + i % 97 + drift,
+            "low_price": 99.9012 + i % 97 + drift,
+            "close_price": 100.3456 + i % 97 + drift,
+            "volume": 1_000_000 + i,
+        }
+        for i in range(days)
+    ]
+    validator = get_batch_validator(DailyPriceIn)
+    return [validator.validate(rows[i:i + batch_size]) for i in range(0, days, batch_size)]
+
+
+def child(config: Dict[str, Any]) -> None:
+    from src.database import SessionLocal, create_db_and_tables, engine
+    from src.repositories.data_repository import DailyPriceRepository
+
+    create_db_and_tables()
+    symbols = [f"S{i:04d}" for i in range(config["symbols"])]
+    result: Dict[str, Any] = {}
+
+    for phase, drift in (("load", 0.0), ("update", 0.5)):
+        work = [price_batches(s, config["days"], config["batch_size"], drift) for s in symbols]
+        started = time.perf_counter()
+        rows = 0
+        for batches in work:
+            for batch in batches:
+                with SessionLocal() as db:
+                    rows += DailyPriceRepository(db).upsert_many(batch).total
+        result[f"{phase}_rows_per_second"] = round(rows / (time.perf_counter() - started))
+
+    # A year of sessions per symbol, read the way the read API pages
+    started = time.perf_counter()
+    read = 0
+    with SessionLocal() as db:
+        repo = DailyPriceRepository(db)
+        for symbol in symbols:
+            after = None
+            while True:
+                page = repo.page(symbol, date(2000, 1, 1), date(2000, 12, 31), after, 500)
+                read += len(page)
+                if len(page) < 500:
+                    break
+                after = (symbol, page[-1]["trade_date"])
+    result["scan_rows_per_second"] = round(read / (time.perf_counter() - started))
+
+    engine.dispose()
+    result["size_mb"] = round(os.path.getsize(config["path"]) / 1e6, 2)
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def run_one(args: argparse.Namespace, storage: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, "bench.db")
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{path}",
+            DAILY_PRICE_STORAGE=storage,
+            LOG_LEVEL="ERROR",
+            LOG_FILE=os.path.join(tmp, "bench.log"),
+        )
+        config = {"symbols": args.symbols, "days": args.days, "batch_size": args.batch_size, "path": path}
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_price_storage", "--child", json.dumps(config)],
+            env=env, capture_output=True, text=True,
+        )
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return {"storage": storage, **json.loads(line[len(RESULT_PREFIX):])}
+    raise RuntimeError(f"Benchmark run for {storage} failed:\n{proc.stderr[-2000:]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storages", nargs="+", choices=STORAGES, default=STORAGES)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--days", type=int, default=5000, help="sessions per symbol")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per upsert_many call")
+    parser.add_argument("--dir", default=".", help="where to create the databases (avoid tmpfs: fsync cost matters)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(json.loads(args.child))
+        return
+
+    print(f"{'storage':<8} {'load rows/s':>12} {'update rows/s':>14} {'scan rows/s':>12} {'size MB':>8}")
+    for storage in args.storages:
+        r = run_one(args, storage)
+        print(
+            f"{r['storage']:<8} {r['load_rows_per_second']:>12} {r['update_rows_per_second']:>14} "
+            f"{r['scan_rows_per_second']:>12} {r['size_mb']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare per-row Pydantic validation (the previous IngestionService path)
+with the column-wise BatchValidator on synthetic parsed payloads.
+
+    python -m benchmarks.bench_validation --rows 5000 20000 --repeat 5
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from pydantic import ValidationError
+
+from src.schemas.balance_sheet import BalanceSheetIn
+from src.schemas.batch import BatchValidator
+from src.schemas.price import DailyPriceIn
+
+
+def price_rows(n: int) -> List[dict]:
+    start = date(1990, 1, 1)
+    return [
+        {
+            "symbol": "BENCH",
+            "date": (start + timedelta(days=i)).isoformat(),
+            "open_price": 100.0 + i % 7,
+            "high_price": 101.0 + i % 7,
+            "low_price": 99.0 + i % 7,
+            "close_price": 100.5 + i % 7,
+            "volume": 1_000_000 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def balance_rows(n: int) -> List[dict]:
+    return [
+        {
+            "symbol": f"BENCH{i // 40}",
+            "fiscal_date_ending": date(1985 + i % 40, 12, 31),
+            "reported_currency": "USD",
+            "total_assets": 1e9 + i,
+            "total_liabilities": None if i % 5 == 0 else 5e8 + i,
+            "total_shareholder_equity": 4e8 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def per_row(model_cls, parsed: List[dict]) -> List[dict]:
+    """Previous path: one model per row, then dumped to row dicts for the upsert."""
+    models = []
+    for item in parsed:
+        try:
+            models.append(model_cls(**item))
+        except ValidationError:
+            pass
+    return [m.model_dump() for m in models]
+
+
+def columnar(validator: BatchValidator, parsed: List[dict]) -> List[dict]:
+    return validator.validate(parsed).rows()
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("daily_prices", DailyPriceIn, price_rows),
+        ("balance_sheet", BalanceSheetIn, balance_rows),
+    ]
+    print(f"{'dataset':<14} {'rows':>7} {'per-row ms':>11} {'columnar ms':>12} {'speedup':>8}")
+    for label, model_cls, make_rows in cases:
+        validator = BatchValidator(model_cls)
+        for n in args.rows:
+            parsed = make_rows(n)
+            assert per_row(model_cls, parsed) == columnar(validator, parsed)
+            old = best_of(lambda: per_row(model_cls, parsed), args.repeat)
+            new = best_of(lambda: columnar(validator, parsed), args.repeat)
+            print(f"{label:<14} {n:>7} {old * 1e3:>11.2f} {new * 1e3:>12.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
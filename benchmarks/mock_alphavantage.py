@@ -0,0 +1,158 @@
+"""
+Local stand-in for https://www.alphavantage.co/query serving synthetic
+BALANCE_SHEET, INCOME_STATEMENT and TIME_SERIES_DAILY payloads.
+
+Payloads are deterministic per symbol. Latency, HTTP 500 errors and
+throttle ``Note`` responses can be injected to exercise the retry and
+rate-limiter paths. Point the service at it with
+ALPHAVANTAGE_BASE_URL=http://127.0.0.1:8765/query.
+
+    python -m benchmarks.mock_alphavantage --port 8765 --days 5000 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import zlib
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, Response
+
+COMPACT_SESSIONS = 100
+THROTTLE_NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+    "and 500 calls per day. (stand-in server)"
+)
+
+
+def _seed(symbol: str) -> int:
+    return zlib.crc32(symbol.encode())
+
+
+def trading_days(days: int, end: Optional[date] = None) -> List[date]:
+    """The last ``days`` weekdays up to ``end`` (default today), newest first."""
+    day = end or date.today()
+    sessions = []
+    while len(sessions) < days:
+        if day.weekday() < 5:
+            sessions.append(day)
+        day -= timedelta(days=1)
+    return sessions
+
+
+def daily_series(symbol: str, days: int) -> Dict[str, Dict[str, str]]:
+    rng = random.Random(_seed(symbol))
+    price = rng.uniform(10, 500)
+    series = {}
+    for day in trading_days(days):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.015)))
+        high = price * (1 + rng.uniform(0, 0.02))
+        low = price * (1 - rng.uniform(0, 0.02))
+        series[day.isoformat()] = {
+            "1. open": f"{rng.uniform(low, high):.4f}",
+            "2. high": f"{high:.4f}",
+            "3. low": f"{low:.4f}",
+            "4. close": f"{price:.4f}",
+            "5. volume": str(rng.randint(10_000, 50_000_000)),
+        }
+    return series
+
+
+def annual_reports(symbol: str, years: int, fields: List[str]) -> List[Dict[str, str]]:
+    rng = random.Random(_seed(symbol + fields[0]))
+    last = date.today().year - 1
+    reports = []
+    for year in range(last, last - years, -1):
+        report = {"fiscalDateEnding": f"{year}-12-31", "reportedCurrency": "USD"}
+        for field in fields:
+            # Alphavantage reports missing values as the string "None"
+            report[field] = "None" if rng.random() < 0.05 else str(rng.randint(10 ** 6, 10 ** 12))
+        reports.append(report)
+    return reports
+
+
+BALANCE_FIELDS = ["totalAssets", "totalLiabilities", "totalShareholderEquity"]
+INCOME_FIELDS = ["totalRevenue", "grossProfit", "operatingIncome", "ebit", "ebitda", "netIncome"]
+
+
+def create_app(
+    days: int = 5000,
+    years: int = 20,
+    latency_ms: float = 0.0,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="Alphavantage stand-in")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0, "throttled": 0}
+
+    @lru_cache(maxsize=4096)
+    def body(function: str, symbol: str, output_size: str) -> bytes:
+        if function == "TIME_SERIES_DAILY":
+            sessions = COMPACT_SESSIONS if output_size == "compact" else days
+            payload = {
+                "Meta Data": {
+                    "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+                    "2. Symbol": symbol,
+                    "3. Last Refreshed": trading_days(1)[0].isoformat(),
+                    "4. Output Size": "Compact" if output_size == "compact" else "Full size",
+                    "5. Time Zone": "US/Eastern",
+                },
+                "Time Series (Daily)": daily_series(symbol, sessions),
+            }
+        elif function == "BALANCE_SHEET":
+            payload = {"symbol": symbol, "annualReports": annual_reports(symbol, years, BALANCE_FIELDS)}
+        else:
+            payload = {"symbol": symbol, "annualReports": annual_reports(symbol, years, INCOME_FIELDS)}
+        return json.dumps(payload).encode()
+
+    @app.get("/query")
+    async def query(
+        function: str,
+        symbol: str,
+        outputsize: str = Query("compact"),
+        apikey: str = Query(""),
+    ) -> Response:
+        stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * latency_ms / 1000)
+        if function not in ("TIME_SERIES_DAILY", "BALANCE_SHEET", "INCOME_STATEMENT"):
+            return JSONResponse({"Error Message": f"Invalid API call: unknown function {function}"})
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"detail": "injected error"}, status_code=500)
+        if rng.random() < throttle_rate:
+            stats["throttled"] += 1
+            return JSONResponse({"Note": THROTTLE_NOTE})
+        return Response(body(function, symbol.upper(), outputsize), media_type="application/json")
+
+    @app.get("/stats")
+    def get_stats() -> Dict[str, int]:
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--days", type=int, default=5000, help="sessions in a full daily series")
+    parser.add_argument("--years", type=int, default=20, help="annual reports per fundamentals payload")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean injected response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction answered with a throttle Note")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(args.days, args.years, args.latency_ms, args.error_rate, args.throttle_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,45 +2,53 @@
 import asyncio
 import csv
 import httpx
-import time
-from pathlib import Path
 
-API_BASE = "http://localhost:8000/api/ingest"
+API_BASE = "http://localhost:8000/api"
 CSV_PATH = "symbols.csv"
-RATE_LIMIT_PER_MIN = 20
-SECONDS_BETWEEN_CALLS = 60 / RATE_LIMIT_PER_MIN
+POLL_SECONDS = 10
 
 def load_symbols(csv_file: str) -> list[str]:
     with open(csv_file, newline="") as f:
         reader = csv.DictReader(f)
         return [row["symbol"].strip().upper() for row in reader]
 
-async def call_endpoint(session: httpx.AsyncClient, url: str) -> dict:
-    try:
-        response = await session.post(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"⚠️  Error calling {url}: {e}")
-        return {}
+async def submit_batch(session: httpx.AsyncClient, symbols: list[str]) -> str:
+    # The service fans the work out itself and paces it within the Alphavantage quota
+    response = await session.post(f"{API_BASE}/ingest/batch", json={"symbols": symbols})
+    response.raise_for_status()
+    job = response.json()
+    print(f"→ Submitted job {job['id']} ({job['total_items']} work items)")
+    return job["id"]
 
-async def ingest_symbol(session: httpx.AsyncClient, symbol: str) -> None:
-    endpoints = [
-        f"{API_BASE}/{symbol}",           # balance sheet
-        f"{API_BASE}/daily/{symbol}",     # daily prices
-        f"{API_BASE}/income/{symbol}",    # income statement
-    ]
-    for endpoint in endpoints:
-        print(f"→ Calling {endpoint}")
-        result = await call_endpoint(session, endpoint)
-        print(f"✔ {symbol} → {endpoint.split('/')[-2]} inserted: {result.get('inserted', '?')}")
-        await asyncio.sleep(SECONDS_BETWEEN_CALLS)
+async def wait_for_job(session: httpx.AsyncClient, job_id: str) -> dict:
+    while True:
+        try:
+            response = await session.get(f"{API_BASE}/jobs/{job_id}")
+        except httpx.TransportError as exc:
+            # The queue lives in the service database: a restart resumes the job
+            print(f"… service unavailable ({exc}), still waiting for job {job_id}")
+            await asyncio.sleep(POLL_SECONDS)
+            continue
+        response.raise_for_status()
+        job = response.json()
+        print(
+            f"… {job['status']}: {job['completed_items']}/{job['total_items']} done, "
+            f"{job['failed_items']} failed, {job['rows_per_second']} rows/s"
+        )
+        if job["status"] not in ("pending", "running"):
+            return job
+        await asyncio.sleep(POLL_SECONDS)
 
 async def main():
     symbols = load_symbols(CSV_PATH)
     async with httpx.AsyncClient(timeout=60) as session:
-        for symbol in symbols:
-            await ingest_symbol(session, symbol)
+        job_id = await submit_batch(session, symbols)
+        job = await wait_for_job(session, job_id)
+    for symbol, datasets in job["progress"].items():
+        for dataset, progress in datasets.items():
+            if progress["status"] == "failed":
+                print(f"⚠️  {symbol} → {dataset} after {progress['attempts']} attempts: {progress['error']}")
+    print(f"✔ Job {job_id} {job['status']}: inserted {job['inserted']}, updated {job['updated']}")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,24 @@
+"""
+Shared pytest setup. Settings are read when ``src`` is first imported, so
+the test database is chosen here, before any test module imports it.
+"""
+import os
+import tempfile
+
+import pytest
+
+# A throwaway SQLite file, never the configured database
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="ingestion-tests-"), "test.db")
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+
+@pytest.fixture
+def db_tables():
+    """Create the service tables, and empty them again after the test."""
+    from src.database import Base, create_db_and_tables, engine
+
+    create_db_and_tables()
+    yield engine
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
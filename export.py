@@ -0,0 +1,30 @@
+# export.py
+import argparse
+
+from src.database import create_db_and_tables
+from src.logging_config import setup_logging
+from src.schemas.jobs import Dataset
+from src.services.export import ParquetExporter
+from src.settings import settings
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write stored datasets to Parquet, partitioned by symbol and year."
+    )
+    parser.add_argument("--dir", default=settings.EXPORT_DIR, help="export directory")
+    parser.add_argument(
+        "--datasets", nargs="+", choices=[d.value for d in Dataset], default=[d.value for d in Dataset],
+    )
+    parser.add_argument("--full", action="store_true", help="ignore the watermarks and rewrite every partition")
+    args = parser.parse_args()
+
+    setup_logging()
+    create_db_and_tables()
+    exporter = ParquetExporter(args.dir)
+    summary = exporter.export([Dataset(d) for d in args.datasets], full=args.full)
+
+    for dataset, counts in summary.items():
+        print(f"✔ {dataset.value}: {counts['partitions']} partitions rewritten, {counts['rows']} rows")
+
+if __name__ == "__main__":
+    main()
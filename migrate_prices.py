@@ -0,0 +1,27 @@
+# migrate_prices.py
+import argparse
+
+from src.database import create_db_and_tables, engine
+from src.logging_config import setup_logging
+from src.repositories.price_storage import migrate_daily_prices, stored_layout
+from src.settings import settings
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the daily_prices table to the layout set by DAILY_PRICE_STORAGE."
+    )
+    parser.add_argument("--no-vacuum", action="store_true", help="skip the SQLite VACUUM after the copy")
+    args = parser.parse_args()
+
+    setup_logging()
+    source = stored_layout(engine)
+    copied = migrate_daily_prices(engine, vacuum=not args.no_vacuum)
+    create_db_and_tables()
+
+    if source not in (None, settings.DAILY_PRICE_STORAGE):
+        print(f"✔ daily_prices: {copied} rows converted from '{source}' to '{settings.DAILY_PRICE_STORAGE}'")
+    else:
+        print(f"✔ daily_prices already uses the '{settings.DAILY_PRICE_STORAGE}' layout")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,21 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from .routes.ingest import router as ingest_router
-from .database import create_db_and_tables
+from .routes.jobs import router as jobs_router
+from .routes.cache import router as cache_router
+from .routes.data import router as data_router
+from .routes.profiles import router as profiles_router
+from .database import create_db_and_tables, run_in_db_thread, shutdown_db_executor
+from .connectors.http_client import create_http_client
+from .services.export import ParquetExporter
+from .services.ingestion import IngestionService
+from .services.jobs import JobManager
+from .services.pipeline import WritePipeline
+from .services.profiling import RequestProfiler
+from .services.read_cache import ReadCache
+from .repositories.symbol_state import load_symbol_state
+from .settings import settings
+from .metrics import REGISTRY
 from .logging_config import setup_logging, get_logger
 
 logger = get_logger("app")
@@ -10,15 +25,51 @@ def create_app() -> FastAPI:
     logger.info("Creating FastAPI application")
     
     app = FastAPI(title="API Ingestion Service", version="0.1.0")
+    # Jobs first: POST /ingest/batch would otherwise match /ingest/{symbol}
+    app.include_router(jobs_router, prefix="/api")
     app.include_router(ingest_router, prefix="/api")
+    app.include_router(cache_router, prefix="/api")
+    app.include_router(data_router, prefix="/api")
+    app.include_router(profiles_router, prefix="/api")
     
     logger.info("Router included successfully")
 
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        """Prometheus text exposition of the ingestion and upstream metrics."""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
     @app.on_event("startup")
     async def on_startup():
         logger.info("Starting up application - creating database and tables")
         create_db_and_tables()
         logger.info("Database and tables created successfully")
+        # What each symbol already has, so ingests can plan without asking the database
+        await run_in_db_thread(load_symbol_state)
+
+        app.state.http_client = create_http_client()
+        app.state.read_cache = ReadCache(settings.READ_CACHE_MAX_ENTRIES)
+        app.state.profiler = RequestProfiler()
+        app.state.ingestion_service = IngestionService(
+            http_client=app.state.http_client, read_cache=app.state.read_cache
+        )
+        exporter = None
+        if settings.EXPORT_AFTER_BATCH:
+            try:
+                exporter = ParquetExporter(settings.EXPORT_DIR)
+            except RuntimeError as exc:
+                logger.warning(f"{exc}; Parquet export after batch jobs is disabled")
+        pipeline = WritePipeline(app.state.ingestion_service) if settings.INGEST_PIPELINE_ENABLED else None
+        app.state.job_manager = JobManager(app.state.ingestion_service, exporter=exporter, pipeline=pipeline)
+        await app.state.job_manager.start()
+        logger.info("Shared HTTP client, read cache, ingestion service and job manager ready")
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        logger.info("Shutting down application - cancelling jobs and closing HTTP client")
+        await app.state.job_manager.shutdown()
+        await app.state.http_client.aclose()
+        shutdown_db_executor()
 
     return app
 
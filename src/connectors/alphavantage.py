@@ -1,16 +1,39 @@
+import asyncio
+import gzip
+import time
 import httpx
+from contextlib import aclosing
 from datetime import date
-from typing import List, Dict, Any
-from .base import BaseAPIConnector
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from .base import AlphavantageAPIError, AlphavantageThrottleError, BaseAPIConnector, throttle_message
+from .cache import CacheMissError, ResponseCache, ttl_for
+from .mapping import ROW_ERRORS, Field, RowMapping
+from .streaming import DailySeriesStreamParser
+from .rate_limiter import AdaptiveRateLimiter
+from ..metrics import CACHE_HITS, THROTTLE_EVENTS, UPSTREAM_BYTES, UPSTREAM_SECONDS
 from ..settings import settings
 from ..logging_config import get_logger
 
 logger = get_logger("connectors.alphavantage")
 
-class AlphavantageBalanceSheetConnector(BaseAPIConnector):
-    BASE_URL = "https://www.alphavantage.co/query"
+DAILY_PRICE_MAPPING = RowMapping("daily price", [
+    Field("symbol", arg="symbol"),
+    Field("date", arg="key"),                     # alias in schema
+    Field("open_price", "1. open", "float", required=True),
+    Field("high_price", "2. high", "float", required=True),
+    Field("low_price", "3. low", "float", required=True),
+    Field("close_price", "4. close", "float", required=True),
+    Field("volume", "5. volume", "int", required=True),
+], keyed=True)
 
-    def __init__(self):
+class AlphavantageBalanceSheetConnector(BaseAPIConnector):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        super().__init__(client, rate_limiter, cache)
         logger.info("Initializing AlphavantageBalanceSheetConnector")
 
     async def fetch(self, symbol: str) -> Dict[str, Any]:
@@ -25,23 +48,20 @@ class AlphavantageBalanceSheetConnector(BaseAPIConnector):
         logger.debug(f"Making API request to {self.BASE_URL} with params: {params}")
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.BASE_URL, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
-                # Check for API error responses
-                if "Error Message" in data:
-                    error_msg = data["Error Message"]
-                    logger.error(f"Alphavantage API error for {symbol}: {error_msg}")
-                    raise ValueError(f"API Error: {error_msg}")
-                
-                if "Note" in data:
-                    note = data["Note"]
-                    logger.warning(f"Alphavantage API note for {symbol}: {note}")
-                
-                logger.info(f"Successfully fetched balance sheet data from Alphavantage for {symbol}")
-                return data
+            data = await self._request_json(params)
+            
+            # Check for API error responses
+            if "Error Message" in data:
+                error_msg = data["Error Message"]
+                logger.error(f"Alphavantage API error for {symbol}: {error_msg}")
+                raise AlphavantageAPIError(f"API Error: {error_msg}")
+            
+            if "Note" in data:
+                note = data["Note"]
+                logger.warning(f"Alphavantage API note for {symbol}: {note}")
+            
+            logger.info(f"Successfully fetched balance sheet data from Alphavantage for {symbol}")
+            return data
                 
         except httpx.RequestError as e:
             logger.error(f"Request error while fetching balance sheet for {symbol}: {str(e)}")
@@ -58,37 +78,36 @@ class AlphavantageBalanceSheetConnector(BaseAPIConnector):
         logger.debug(f"Found {len(reports)} annual reports for {symbol}")
         
         result: List[Dict[str, Any]] = []
-        
         for i, rep in enumerate(reports):
-            # Skip rows without mandatory fields
-            if "fiscalDateEnding" not in rep:
-                logger.warning(f"Skipping report {i+1} for {symbol}: missing fiscalDateEnding field")
-                continue
-                
+            # Written out rather than declared as a RowMapping: per-row
+            # mappings ran at about 0.6x this loop
             try:
-                parsed_record = {
+                result.append({
                     "symbol": symbol,
                     "fiscal_date_ending": date.fromisoformat(rep["fiscalDateEnding"]),
                     "reported_currency": rep.get("reportedCurrency", "USD"),
-                    "total_assets": float(rep["totalAssets"]) if rep.get("totalAssets") and rep["totalAssets"] != "None" else None,
-                    "total_liabilities": float(rep["totalLiabilities"]) if rep.get("totalLiabilities") and rep["totalLiabilities"] != "None" else None,
-                    "total_shareholder_equity": float(rep["totalShareholderEquity"]) if rep.get("totalShareholderEquity") and rep["totalShareholderEquity"] != "None" else None,
-                }
-                result.append(parsed_record)
-                logger.debug(f"Successfully parsed balance sheet record {i+1} for {symbol} - fiscal date: {rep['fiscalDateEnding']}")
-                
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Error parsing balance sheet record {i+1} for {symbol}: {str(e)}")
-                continue
+                    "total_assets": float(v) if (v := rep.get("totalAssets")) and v != "None" else None,
+                    "total_liabilities": float(v) if (v := rep.get("totalLiabilities")) and v != "None" else None,
+                    "total_shareholder_equity": float(v) if (v := rep.get("totalShareholderEquity")) and v != "None" else None,
+                })
+            except ROW_ERRORS as e:
+                logger.warning(f"Error parsing balance sheet record {i + 1} for {symbol}: {e!r}")
         
-        logger.info(f"Successfully parsed {len(result)} balance sheet records for {symbol}")
+        logger.info(f"Successfully parsed {len(result)} of {len(reports)} balance sheet records for {symbol}")
         return result
 
 
 class AlphavantageDailyPriceConnector(BaseAPIConnector):
-    BASE_URL = "https://www.alphavantage.co/query"
+    # Number of most recent sessions returned with outputsize=compact
+    COMPACT_SESSIONS = 100
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        super().__init__(client, rate_limiter, cache)
         logger.info("Initializing AlphavantageDailyPriceConnector")
 
     async def fetch(self, symbol: str, output_size: str = "full") -> Dict[str, Any]:
@@ -104,23 +123,20 @@ class AlphavantageDailyPriceConnector(BaseAPIConnector):
         logger.debug(f"Making API request to {self.BASE_URL} with params: {params}")
         
         try:
-            async with httpx.AsyncClient() as client:
-                r = await client.get(self.BASE_URL, params=params, timeout=30)
-                r.raise_for_status()
-                data = r.json()
-                
-                # Check for API error responses
-                if "Error Message" in data:
-                    error_msg = data["Error Message"]
-                    logger.error(f"Alphavantage API error for {symbol}: {error_msg}")
-                    raise ValueError(f"API Error: {error_msg}")
-                
-                if "Note" in data:
-                    note = data["Note"]
-                    logger.warning(f"Alphavantage API note for {symbol}: {note}")
-                
-                logger.info(f"Successfully fetched daily price data from Alphavantage for {symbol}")
-                return data
+            data = await self._request_json(params)
+            
+            # Check for API error responses
+            if "Error Message" in data:
+                error_msg = data["Error Message"]
+                logger.error(f"Alphavantage API error for {symbol}: {error_msg}")
+                raise AlphavantageAPIError(f"API Error: {error_msg}")
+            
+            if "Note" in data:
+                note = data["Note"]
+                logger.warning(f"Alphavantage API note for {symbol}: {note}")
+            
+            logger.info(f"Successfully fetched daily price data from Alphavantage for {symbol}")
+            return data
                 
         except httpx.RequestError as e:
             logger.error(f"Request error while fetching daily prices for {symbol}: {str(e)}")
@@ -129,7 +145,166 @@ class AlphavantageDailyPriceConnector(BaseAPIConnector):
             logger.error(f"HTTP status error while fetching daily prices for {symbol}: {e.response.status_code}")
             raise
 
-    def parse(self, raw: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def stream(
+        self,
+        symbol: str,
+        output_size: str = "full",
+        since: Optional[date] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, List[Any]]]:
+        """
+        Fetch TIME_SERIES_DAILY and yield parsed rows in batches of
+        ``batch_size`` while the body is still downloading.
+
+        Batches are columns shaped like :meth:`parse_columns` output and
+        filtered by ``since`` the same way. The body is never held in memory
+        as a whole.
+        """
+        batch_size = batch_size or settings.STREAM_BATCH_SIZE
+        cutoff = since.isoformat() if since else None
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol":   symbol,
+            "outputsize": output_size,
+            "apikey":   settings.ALPHAVANTAGE_API_KEY,
+        }
+        logger.info(f"Streaming daily price data from Alphavantage for symbol: {symbol} (output_size: {output_size})")
+
+        batch: Dict[str, List[Any]] = {}
+        buffered = 0
+        skipped = 0
+        parser = None
+        async with aclosing(self._stream_series(params)) as chunks:
+            async for parser, entries in chunks:
+                columns, bad = DAILY_PRICE_MAPPING.parse_columns(entries, parser.symbol or symbol, since=cutoff)
+                skipped += bad
+                for name, values in columns.items():
+                    batch.setdefault(name, []).extend(values)
+                buffered += len(next(iter(columns.values()), ()))
+                while buffered >= batch_size:
+                    yield {name: values[:batch_size] for name, values in batch.items()}
+                    batch = {name: values[batch_size:] for name, values in batch.items()}
+                    buffered -= batch_size
+        if buffered:
+            yield batch
+
+        total = parser.entries if parser else 0
+        logger.info(f"Streamed {total} daily price records for {symbol} ({skipped} unparseable)")
+
+    async def _stream_series(
+        self, params: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[DailySeriesStreamParser, List[Tuple[str, Dict[str, Any]]]]]:
+        """
+        Yield ``(parser, entries)`` as series entries are decoded, from the
+        response cache when fresh or else from the network. Throttle
+        responses are retried through the shared rate limiter.
+        """
+        symbol = params["symbol"]
+        function = params["function"]
+        label = f"{function} {symbol}"
+        offline = settings.ALPHAVANTAGE_OFFLINE
+        cache = self.cache
+
+        if cache is not None:
+            ttl = None if offline else ttl_for(params["function"])
+            path = await asyncio.to_thread(cache.lookup, params, ttl)
+            if path is not None:
+                CACHE_HITS.inc(function=function)
+                logger.debug(f"Streaming {label} from the response cache")
+                parser = DailySeriesStreamParser()
+                with gzip.open(path, "rb") as f:
+                    while chunk := await asyncio.to_thread(f.read, settings.STREAM_CHUNK_BYTES):
+                        yield parser, parser.feed(chunk)
+                parser.close()
+                if not parser.found_series:
+                    raise ValueError("Invalid response format: missing 'Time Series (Daily)'")
+                return
+        if offline:
+            raise CacheMissError(f"No cached response for {label} in offline mode")
+
+        message = None
+        for attempt in range(settings.ALPHAVANTAGE_THROTTLE_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            parser = DailySeriesStreamParser()
+            writer = cache.writer(params) if cache is not None else None
+            # Latency covers the download only, not time the consumer spends on batches
+            elapsed = 0.0
+            received = 0
+            try:
+                async with self._http_client() as client:
+                    started = time.perf_counter()
+                    async with client.stream("GET", self.BASE_URL, params=params) as response:
+                        response.raise_for_status()
+                        async for chunk in response.aiter_bytes(settings.STREAM_CHUNK_BYTES):
+                            received += len(chunk)
+                            if writer is not None:
+                                writer.write(chunk)
+                            entries = parser.feed(chunk)
+                            if entries:
+                                elapsed += time.perf_counter() - started
+                                yield parser, entries
+                                started = time.perf_counter()
+                    elapsed += time.perf_counter() - started
+                parser.close()
+
+                if parser.found_series:
+                    self.rate_limiter.on_success()
+                    if writer is not None:
+                        writer.commit()
+                    return
+            finally:
+                UPSTREAM_SECONDS.observe(elapsed, function=function)
+                UPSTREAM_BYTES.inc(received, function=function)
+                if writer is not None:
+                    writer.abort()
+
+            data = parser.payload or {}
+            message = throttle_message(data)
+            if message is None:
+                self.rate_limiter.on_success()
+                if "Error Message" in data:
+                    logger.error(f"Alphavantage API error for {symbol}: {data['Error Message']}")
+                    raise AlphavantageAPIError(f"API Error: {data['Error Message']}")
+                raise ValueError("Invalid response format: missing 'Time Series (Daily)'")
+
+            THROTTLE_EVENTS.inc(function=function)
+            self.rate_limiter.on_throttle()
+            logger.warning(f"Throttled on {label} (attempt {attempt + 1}): {message}")
+
+        raise AlphavantageThrottleError(f"Alphavantage throttled {label}: {message}")
+
+    @staticmethod
+    def earliest_date(raw: Dict[str, Any]) -> Optional[date]:
+        """Return the oldest trading day present in a TIME_SERIES_DAILY payload."""
+        series = raw.get("Time Series (Daily)") or {}
+        if not series:
+            return None
+        return date.fromisoformat(min(series))
+
+    def parse_columns(self, raw: Dict[str, Any], since: Optional[date] = None) -> Dict[str, List[Any]]:
+        """
+        Like :meth:`parse`, but return the rows column by column, for
+        :meth:`BatchValidator.validate_columns`. Much cheaper on long series
+        than building a dict per session.
+        """
+        try:
+            symbol = raw["Meta Data"]["2. Symbol"]
+            series = raw["Time Series (Daily)"]
+        except KeyError as e:
+            logger.error(f"Missing expected field in daily price response: {str(e)}")
+            raise ValueError(f"Invalid response format: missing {str(e)}")
+
+        cutoff = since.isoformat() if since else None
+        columns, skipped = DAILY_PRICE_MAPPING.parse_columns(series.items(), symbol, since=cutoff)
+        parsed = len(next(iter(columns.values()), ()))
+        logger.info(f"Successfully parsed {parsed} of {len(series)} daily price records for {symbol}")
+        return columns
+
+    def parse(self, raw: Dict[str, Any], since: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Parse a TIME_SERIES_DAILY payload. When ``since`` is given, only days
+        strictly after it are returned.
+        """
         try:
             symbol = raw["Meta Data"]["2. Symbol"]
             logger.debug(f"Parsing daily price data for symbol: {symbol}")
@@ -137,26 +312,11 @@ class AlphavantageDailyPriceConnector(BaseAPIConnector):
             series = raw["Time Series (Daily)"]
             logger.debug(f"Found {len(series)} daily price records for {symbol}")
             
-            parsed = []
-            for day, values in series.items():
-                try:
-                    parsed_record = {
-                        "symbol":      symbol,
-                        "date":        day,                       # alias in schema
-                        "open_price":  float(values["1. open"]),
-                        "high_price":  float(values["2. high"]),
-                        "low_price":   float(values["3. low"]),
-                        "close_price": float(values["4. close"]),
-                        "volume":      int(values["5. volume"]),
-                    }
-                    parsed.append(parsed_record)
-                    logger.debug(f"Successfully parsed daily price record for {symbol} on {day}")
-                    
-                except (ValueError, TypeError, KeyError) as e:
-                    logger.warning(f"Error parsing daily price record for {symbol} on {day}: {str(e)}")
-                    continue
+            # ISO dates compare lexicographically, so filter before converting
+            cutoff = since.isoformat() if since else None
+            parsed, _ = DAILY_PRICE_MAPPING.parse(series.items(), symbol, since=cutoff)
             
-            logger.info(f"Successfully parsed {len(parsed)} daily price records for {symbol}")
+            logger.info(f"Successfully parsed {len(parsed)} of {len(series)} daily price records for {symbol}")
             return parsed
             
         except KeyError as e:
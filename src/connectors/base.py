@@ -1,7 +1,135 @@
+import asyncio
+import json
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Any, Optional
+
+import httpx
+
+from .cache import CacheMissError, ResponseCache, get_response_cache, ttl_for
+from .http_client import create_http_client
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+from ..metrics import CACHE_HITS, THROTTLE_EVENTS, UPSTREAM_BYTES, UPSTREAM_SECONDS
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("connectors.base")
+
+# Alphavantage signals throttling with a 200 response whose only key is one of
+# these, worded as below. The same keys also carry other notices, such as the
+# one for premium-only endpoints, which waiting does not fix.
+THROTTLE_KEYS = ("Note", "Information")
+THROTTLE_WORDING = re.compile(
+    r"call frequency|rate limit|(?:calls|requests) per (?:second|minute|day)", re.IGNORECASE
+)
+
+
+class AlphavantageThrottleError(RuntimeError):
+    """Raised when Alphavantage keeps throttling a call after all retries."""
+
+
+class AlphavantageAPIError(ValueError):
+    """Raised for an "Error Message" response, e.g. an unknown symbol; retrying will not help."""
+
+
+def throttle_message(data: Dict[str, Any]) -> Optional[str]:
+    """Return the throttle message if ``data`` is a throttle response, else None."""
+    if isinstance(data, dict) and len(data) == 1:
+        for key in THROTTLE_KEYS:
+            if key in data and THROTTLE_WORDING.search(str(data[key])):
+                return str(data[key])
+    return None
+
 
 class BaseAPIConnector(ABC):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        # Shared, long-lived client owned by the application. When absent,
+        # each fetch opens a short-lived client of its own.
+        self.client = client
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # When absent, the cache of the endpoint in use is looked up per request
+        self._cache = cache
+
+    @property
+    def BASE_URL(self) -> str:
+        # Read on every request, so a stand-in server can be configured at runtime
+        return settings.ALPHAVANTAGE_BASE_URL
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        # Follows BASE_URL: each endpoint has a cache of its own
+        return self._cache if self._cache is not None else get_response_cache()
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.client is not None:
+            yield self.client
+        else:
+            async with create_http_client() as client:
+                yield client
+
+    async def _request_json(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET ``BASE_URL`` through the shared rate limiter and decode the JSON
+        body. Throttle responses feed back into the limiter and are retried
+        up to ``ALPHAVANTAGE_THROTTLE_RETRIES`` times.
+
+        Fresh cached responses are returned without a request; in offline
+        mode only the cache is consulted.
+        """
+        function = str(params.get("function"))
+        label = f"{function} {params.get('symbol')}"
+        offline = settings.ALPHAVANTAGE_OFFLINE
+        cache = self.cache
+        if cache is not None:
+            ttl = None if offline else ttl_for(params["function"])
+            body = await asyncio.to_thread(cache.get, params, ttl)
+            if body is not None:
+                CACHE_HITS.inc(function=function)
+                logger.debug(f"Serving {label} from the response cache")
+                return json.loads(body)
+        if offline:
+            raise CacheMissError(f"No cached response for {label} in offline mode")
+
+        message = None
+        for attempt in range(settings.ALPHAVANTAGE_THROTTLE_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            started = time.perf_counter()
+            async with self._http_client() as client:
+                response = await client.get(self.BASE_URL, params=params)
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, function=function)
+            UPSTREAM_BYTES.inc(len(response.content), function=function)
+            response.raise_for_status()
+
+            try:
+                data = response.json()
+            except json.JSONDecodeError:
+                logger.error(
+                    f"Failed to decode JSON response for {label}. "
+                    f"Status: {response.status_code}. Raw response text: {response.text[:500]}"
+                )
+                raise
+
+            message = throttle_message(data)
+            if message is None:
+                self.rate_limiter.on_success()
+                if cache is not None and "Error Message" not in data:
+                    await asyncio.to_thread(cache.put, params, response.content)
+                return data
+
+            THROTTLE_EVENTS.inc(function=function)
+            self.rate_limiter.on_throttle()
+            logger.warning(f"Throttled on {label} (attempt {attempt + 1}): {message}")
+
+        raise AlphavantageThrottleError(f"Alphavantage throttled {label}: {message}")
+
     @abstractmethod
     async def fetch(self, **kwargs) -> Dict[str, Any]:
         ...
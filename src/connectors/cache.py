@@ -0,0 +1,212 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from ..settings import ALPHAVANTAGE_URL, settings
+from ..logging_config import get_logger
+
+logger = get_logger("connectors.cache")
+
+# Request parameters that do not change the response and must not be stored
+_EXCLUDED_PARAMS = ("apikey",)
+
+
+class CacheMissError(LookupError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+@dataclass
+class CacheEntry:
+    function: str
+    symbol: str
+    path: Path
+    fetched_at: float
+    size: int
+
+
+def ttl_for(function: str) -> float:
+    """Freshness window in seconds for an Alphavantage function (0 = never serve)."""
+    return {
+        "BALANCE_SHEET": settings.CACHE_TTL_BALANCE_SHEET_SECONDS,
+        "INCOME_STATEMENT": settings.CACHE_TTL_INCOME_STATEMENT_SECONDS,
+        "TIME_SERIES_DAILY": settings.CACHE_TTL_DAILY_PRICES_SECONDS,
+    }.get(function, 0)
+
+
+class ResponseCache:
+    """
+    Gzip-compressed store of raw Alphavantage response bodies.
+
+    Entries live at ``<root>/<FUNCTION>/<SYMBOL>/<sha256>.json.gz``, where the
+    hash covers the function, symbol and remaining request parameters. The
+    file's mtime is the fetch time; it drives both the TTL check and the
+    oldest-first eviction once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Puts run on worker threads: size accounting and eviction are serialized
+        self._lock = threading.Lock()
+        self._size = sum(entry.size for entry in self.entries())
+        logger.info(f"Response cache at {self.root} ({self._size} bytes)")
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        canonical = {k: str(v) for k, v in params.items() if k not in _EXCLUDED_PARAMS}
+        return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, params: Dict[str, Any]) -> Path:
+        return (
+            self.root
+            / str(params["function"])
+            / str(params.get("symbol", "_")).upper()
+            / f"{self.key(params)}.json.gz"
+        )
+
+    def lookup(self, params: Dict[str, Any], ttl: Optional[float]) -> Optional[Path]:
+        """Return the entry path if present and younger than ``ttl`` (None = any age)."""
+        path = self._path(params)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if ttl is not None and age >= ttl:
+            return None
+        return path
+
+    def get(self, params: Dict[str, Any], ttl: Optional[float]) -> Optional[bytes]:
+        """Return the cached body if present and younger than ``ttl`` (None = any age)."""
+        path = self.lookup(params, ttl)
+        if path is None:
+            return None
+        try:
+            return gzip.decompress(path.read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def writer(self, params: Dict[str, Any]) -> "CacheWriter":
+        """Open an incremental writer for a body that arrives in chunks."""
+        return CacheWriter(self, params)
+
+    def put(self, params: Dict[str, Any], body: bytes) -> None:
+        path = self._path(params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = gzip.compress(body, compresslevel=settings.RESPONSE_CACHE_COMPRESSLEVEL)
+
+        # Write then rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        self._install(Path(tmp), path)
+        logger.debug(f"Cached {params['function']} {params.get('symbol')}: {len(body)} -> {len(compressed)} bytes")
+
+    def _install(self, tmp: Path, path: Path) -> None:
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size += path.stat().st_size - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def read(self, entry: CacheEntry) -> bytes:
+        return gzip.decompress(entry.path.read_bytes())
+
+    def entries(self) -> Iterator[CacheEntry]:
+        for path in self.root.glob("*/*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield CacheEntry(
+                function=path.parent.parent.name,
+                symbol=path.parent.name,
+                path=path,
+                fetched_at=stat.st_mtime,
+                size=stat.st_size,
+            )
+
+    def _evict(self) -> None:
+        # Runs under self._lock. Trim to 90% of the limit so eviction does not
+        # run on every put
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for entry in sorted(self.entries(), key=lambda e: e.fetched_at):
+            if self._size <= target:
+                break
+            try:
+                entry.path.unlink()
+            except FileNotFoundError:
+                continue
+            self._size -= entry.size
+            removed += 1
+        logger.info(f"Evicted {removed} cached responses, cache now {self._size} bytes")
+
+
+class CacheWriter:
+    """Streams a response body into a gzip temp file, installed on commit."""
+
+    def __init__(self, cache: ResponseCache, params: Dict[str, Any]) -> None:
+        self.cache = cache
+        self.path = cache._path(params)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        self._tmp = Path(tmp)
+        self._raw = os.fdopen(fd, "wb")
+        self._gzip = gzip.GzipFile(
+            fileobj=self._raw, mode="wb", compresslevel=settings.RESPONSE_CACHE_COMPRESSLEVEL
+        )
+        self._closed = False
+
+    def write(self, chunk: bytes) -> None:
+        self._gzip.write(chunk)
+
+    def _close(self) -> None:
+        if not self._closed:
+            self._gzip.close()
+            self._raw.close()
+            self._closed = True
+
+    def commit(self) -> None:
+        self._close()
+        self.cache._install(self._tmp, self.path)
+
+    def abort(self) -> None:
+        # No-op after commit: the temp file has already been renamed
+        self._close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def cache_root() -> Path:
+    """
+    Cache directory for the configured ALPHAVANTAGE_BASE_URL. Responses of
+    any other endpoint than Alphavantage's, such as a stand-in server, live
+    under ``<RESPONSE_CACHE_DIR>/endpoints/<url hash>``, so they are never
+    served, listed or replayed as real data.
+    """
+    root = Path(settings.RESPONSE_CACHE_DIR)
+    if settings.ALPHAVANTAGE_BASE_URL == ALPHAVANTAGE_URL:
+        return root
+    return root / "endpoints" / hashlib.sha256(settings.ALPHAVANTAGE_BASE_URL.encode()).hexdigest()[:16]
+
+
+_caches: Dict[Path, ResponseCache] = {}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide cache of the configured endpoint, or None when caching is disabled."""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    root = cache_root()
+    cache = _caches.get(root)
+    if cache is None:
+        cache = _caches[root] = ResponseCache(str(root), settings.RESPONSE_CACHE_MAX_BYTES)
+    return cache
@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from datetime import date
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..logging_config import get_logger
+
+logger = get_logger("connectors.mapping")
+
+Converter = Union[str, Callable[[Any], Any]]
+
+# Errors a converter may raise on a malformed value; the row is then skipped
+ROW_ERRORS = (ValueError, TypeError, KeyError, AttributeError)
+
+# Built-in converters by name; "str" keeps the value as it is
+_CONVERTERS: Dict[str, Optional[Callable[[Any], Any]]] = {
+    "str": None,
+    "date": date.fromisoformat,
+    "float": float,
+    "int": int,
+    "number": float,
+}
+_ARGS = ("symbol", "key")
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    One column of a parsed row.
+
+    ``key`` is the Alphavantage field read from each report or series entry;
+    ``arg`` takes the value from the call instead (``"symbol"``, or ``"key"``
+    for the series key of keyed mappings). ``convert`` is one of ``"str"``,
+    ``"date"``, ``"float"``, ``"int"`` or ``"number"`` -- a float for which a
+    missing value, an empty string or Alphavantage's ``"None"`` become
+    ``default`` -- or any callable. A ``required`` field that is missing
+    makes the row unparseable; others fall back to ``default``.
+    """
+
+    column: str
+    key: Optional[str] = None
+    convert: Converter = "str"
+    default: Any = None
+    required: bool = False
+    arg: Optional[str] = None
+
+
+def _optional_reader(f: Field, func: Optional[Callable[[Any], Any]]) -> Callable[[Dict[str, Any]], Any]:
+    """Read ``f`` from a row, falling back to its default as described on :class:`Field`."""
+    key, default = f.key, f.default
+    if f.convert == "number":
+        # Alphavantage reports missing figures as the string "None"
+        if f.required:
+            def read(row: Dict[str, Any]) -> Any:
+                value = row[key]
+                return func(value) if value and value != "None" else default
+        else:
+            def read(row: Dict[str, Any]) -> Any:
+                value = row.get(key)
+                return func(value) if value and value != "None" else default
+    elif func is None:
+        def read(row: Dict[str, Any]) -> Any:
+            return row.get(key, default)
+    else:
+        def read(row: Dict[str, Any]) -> Any:
+            value = row.get(key)
+            return func(value) if value is not None else default
+    return read
+
+
+class RowMapping:
+    """
+    Declarative mapping from Alphavantage payload rows to parsed records.
+
+    The fields are sorted once into call arguments, required fields read
+    with a direct lookup and conversion, and readers for the fields that
+    fall back to a default. Payloads convert to records, or column by
+    column for large ones that go straight to batch validation. A
+    malformed row is skipped and logged, not the payload.
+
+    Keyed mappings convert ``(key, entry)`` pairs, such as the items of a
+    ``Time Series (Daily)`` object, and can drop keys at or before a cutoff.
+    """
+
+    def __init__(self, name: str, fields: Sequence[Field], keyed: bool = False) -> None:
+        self.name = name
+        self.fields = tuple(fields)
+        self.keyed = keyed
+
+        columns = [f.column for f in self.fields]
+        if len(set(columns)) != len(columns):
+            raise ValueError(f"Mapping {name}: duplicate columns")
+        args: List[Tuple[str, str]] = []
+        direct: List[Tuple[str, str, Optional[Callable[[Any], Any]]]] = []
+        readers: List[Tuple[str, Callable[[Dict[str, Any]], Any]]] = []
+        for f in self.fields:
+            if f.arg is not None:
+                if f.arg not in _ARGS or (f.arg == "key" and not keyed):
+                    raise ValueError(f"Mapping {name}: unknown argument {f.arg!r} for {f.column}")
+                args.append((f.column, f.arg))
+                continue
+            if f.key is None:
+                raise ValueError(f"Mapping {name}: field {f.column} needs a key or an arg")
+            if callable(f.convert):
+                func = f.convert
+            elif f.convert in _CONVERTERS:
+                func = _CONVERTERS[f.convert]
+            else:
+                raise ValueError(f"Mapping {name}: unknown converter {f.convert!r} for {f.column}")
+            if f.required and f.convert != "number":
+                direct.append((f.column, f.key, func))
+            else:
+                readers.append((f.column, _optional_reader(f, func)))
+        self._args = tuple(args)
+        self._direct = tuple(direct)
+        self._readers = tuple(readers)
+
+    def convert(self, row: Dict[str, Any], symbol: Optional[str], key: Optional[str] = None) -> Dict[str, Any]:
+        """Convert one row; raises one of ``ROW_ERRORS`` if it is malformed."""
+        record = {column: symbol if arg == "symbol" else key for column, arg in self._args}
+        for column, name, func in self._direct:
+            record[column] = row[name] if func is None else func(row[name])
+        for column, read in self._readers:
+            record[column] = read(row)
+        return record
+
+    def parse(
+        self, rows: Iterable[Any], symbol: Optional[str], since: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Convert ``rows`` (report dicts, or ``(key, entry)`` pairs for keyed
+        mappings, keeping keys after ``since``). Returns the records and the
+        number of rows skipped as malformed.
+        """
+        convert = self.convert
+        parsed: List[Dict[str, Any]] = []
+        skipped = 0
+        if self.keyed:
+            cutoff = since or ""
+            for key, row in rows:
+                if key <= cutoff:
+                    continue
+                try:
+                    parsed.append(convert(row, symbol, key))
+                except ROW_ERRORS as e:
+                    skipped += 1
+                    logger.warning(f"Error parsing {self.name} record for {symbol} on {key}: {e!r}")
+        else:
+            for i, row in enumerate(rows):
+                try:
+                    parsed.append(convert(row, symbol))
+                except ROW_ERRORS as e:
+                    skipped += 1
+                    logger.warning(f"Error parsing {self.name} record {i + 1} for {symbol}: {e!r}")
+        return parsed, skipped
+
+    def parse_columns(
+        self, rows: Iterable[Any], symbol: Optional[str], since: Optional[str] = None
+    ) -> Tuple[Dict[str, List[Any]], int]:
+        """
+        Like :meth:`parse`, but return the records column by column, as
+        :meth:`BatchValidator.validate_columns` takes them. Each field is
+        converted for the whole payload at once, without building a dict
+        per row. A payload holding a malformed row is converted again by
+        :meth:`parse`, which skips and logs the bad rows.
+        """
+        if self.keyed:
+            cutoff = since or ""
+            rows = [(key, row) for key, row in rows if key > cutoff]
+            keys = [key for key, _ in rows]
+            entries = [row for _, row in rows]
+        else:
+            rows = entries = list(rows)
+            keys = []
+
+        columns: Dict[str, List[Any]] = {}
+        try:
+            for column, arg in self._args:
+                columns[column] = [symbol] * len(entries) if arg == "symbol" else keys
+            for column, name, func in self._direct:
+                values = map(itemgetter(name), entries)
+                columns[column] = list(values if func is None else map(func, values))
+            for column, read in self._readers:
+                columns[column] = list(map(read, entries))
+        except ROW_ERRORS:
+            parsed, skipped = self.parse(rows, symbol, since)
+            return {f.column: [record[f.column] for record in parsed] for f in self.fields}, skipped
+        return columns, 0
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Optional, Tuple
+
+from ..metrics import RATE_LIMIT
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("connectors.rate_limiter")
+
+
+def next_quota_reset(now: Optional[datetime] = None) -> datetime:
+    """Next UTC midnight after ``now``, when the daily quota starts over, as a naive UTC datetime."""
+    now = now or datetime.utcnow()
+    return datetime.combine(now.date() + timedelta(days=1), dt_time.min)
+
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when the configured daily Alphavantage quota has been used up."""
+
+    def __init__(self, message: str, resets_at: datetime) -> None:
+        super().__init__(message)
+        self.resets_at = resets_at
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every Alphavantage call in the process.
+
+    The refill rate adapts with AIMD: each throttled response multiplies it
+    by ``backoff_factor`` and each successful one adds ``recovery_step``
+    calls/minute back, up to ``calls_per_minute``. Tokens may go negative;
+    a negative balance is a queue of reservations, so ``acquire`` needs no
+    lock and concurrent callers are spaced out in arrival order. Waiting
+    callers re-check their turn when they wake, so a throttle also slows
+    the reservations already queued, and a caller cancelled while waiting
+    hands its token and daily call back.
+    """
+
+    def __init__(
+        self,
+        calls_per_minute: float,
+        calls_per_day: int = 0,
+        burst: int = 1,
+        min_calls_per_minute: float = 1.0,
+        backoff_factor: float = 0.5,
+        recovery_step: float = 1.0,
+    ) -> None:
+        self.max_rate = float(calls_per_minute)
+        self.min_rate = min(float(min_calls_per_minute), self.max_rate)
+        self.calls_per_day = calls_per_day
+        self.capacity = float(max(1, burst))
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+
+        self.rate = self.max_rate
+        RATE_LIMIT.set(self.rate)
+        self._tokens = self.capacity
+        # Tokens handed out so far; each caller's running count is its ticket
+        self._issued = 0
+        self._updated = time.monotonic()
+        self._day = self._today()
+        self._calls_today = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate / 60.0)
+
+    def _reserve(self) -> Tuple[int, float]:
+        """Take one token; return its ticket and how long the caller must wait for it."""
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._calls_today = 0
+        if self.calls_per_day and self._calls_today >= self.calls_per_day:
+            raise QuotaExhaustedError(
+                f"Daily Alphavantage quota of {self.calls_per_day} calls exhausted", next_quota_reset()
+            )
+        self._calls_today += 1
+
+        self._refill(time.monotonic())
+        self._tokens -= 1.0
+        self._issued += 1
+        return self._issued, self._wait(self._issued)
+
+    def _wait(self, ticket: int) -> float:
+        """
+        Seconds until the token for ``ticket`` has been refilled, at the
+        current rate. Tokens ever refilled are ``_tokens + _issued``, so a
+        ticket is due once that reaches it.
+        """
+        self._refill(time.monotonic())
+        owed = ticket - (self._tokens + self._issued)
+        return owed * 60.0 / self.rate if owed > 1e-9 else 0.0
+
+    def _refund(self, day: str) -> None:
+        """Give back the token and the daily call of a caller that gave up waiting."""
+        self._refill(time.monotonic())
+        self._tokens = min(self.capacity, self._tokens + 1.0)
+        if day == self._day and self._calls_today > 0:
+            self._calls_today -= 1
+
+    async def acquire(self) -> None:
+        ticket, wait = self._reserve()
+        day = self._day
+        try:
+            # Re-checked after each sleep: a throttle while waiting lowers the
+            # rate, and with it every reservation still queued
+            while wait > 0:
+                logger.debug(f"Rate limiter delaying call by {wait:.2f}s (rate {self.rate:.1f}/min)")
+                await asyncio.sleep(wait)
+                wait = self._wait(ticket)
+        except asyncio.CancelledError:
+            self._refund(day)
+            raise
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+            RATE_LIMIT.set(self.rate)
+
+    def on_throttle(self) -> None:
+        self._refill(time.monotonic())
+        self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+        RATE_LIMIT.set(self.rate)
+        # Drop any accumulated burst so the retry waits a full interval
+        self._tokens = min(self._tokens, 0.0)
+        logger.warning(f"Alphavantage throttled the service, rate reduced to {self.rate:.1f} calls/min")
+
+
+_default_limiter: Optional[AdaptiveRateLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Return the process-wide limiter, creating it from Settings on first use."""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = AdaptiveRateLimiter(
+            calls_per_minute=settings.ALPHAVANTAGE_CALLS_PER_MINUTE,
+            calls_per_day=settings.ALPHAVANTAGE_CALLS_PER_DAY,
+            burst=settings.ALPHAVANTAGE_BURST,
+            min_calls_per_minute=settings.ALPHAVANTAGE_MIN_CALLS_PER_MINUTE,
+            backoff_factor=settings.ALPHAVANTAGE_BACKOFF_FACTOR,
+            recovery_step=settings.ALPHAVANTAGE_RECOVERY_STEP,
+        )
+    return _default_limiter
@@ -0,0 +1,129 @@
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+SERIES_KEY = '"Time Series (Daily)"'
+_SYMBOL_RE = re.compile(r'"2\. Symbol"\s*:\s*"([^"]*)"')
+_WHITESPACE = " \t\r\n"
+
+# Consumed text is dropped from the buffer once this many characters pile up
+_COMPACT_THRESHOLD = 1 << 16
+
+_HEADER, _SERIES, _DONE = "header", "series", "done"
+
+
+class DailySeriesStreamParser:
+    """
+    Incremental parser for TIME_SERIES_DAILY bodies.
+
+    Feed raw byte chunks as they arrive; each call returns the
+    ``(day, values)`` entries of ``Time Series (Daily)`` completed so far.
+    Only the unconsumed tail of the body is buffered, so memory stays
+    bounded by the chunk size rather than by the length of the series.
+
+    Bodies without a series (error and throttle payloads) are buffered in
+    full and decoded on :meth:`close`; they are then available as
+    ``payload``.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = _HEADER
+        self.symbol: Optional[str] = None
+        self.payload: Optional[Dict[str, Any]] = None
+        self.entries = 0
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Dict[str, Any]]]:
+        self._buf += self._decoder.decode(chunk)
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        if self._state == _HEADER:
+            self._scan_header()
+        if self._state == _SERIES:
+            self._scan_series(out)
+        if self._pos > _COMPACT_THRESHOLD:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        return out
+
+    def close(self) -> None:
+        self._buf += self._decoder.decode(b"", final=True)
+        if self._state == _HEADER:
+            self.payload = json.loads(self._buf)
+            self._buf = ""
+        elif self._state == _SERIES:
+            raise ValueError("Truncated TIME_SERIES_DAILY response: series object not closed")
+
+    @property
+    def found_series(self) -> bool:
+        return self._state != _HEADER
+
+    def _skip_ws(self, pos: int) -> int:
+        buf = self._buf
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def _scan_header(self) -> None:
+        idx = self._buf.find(SERIES_KEY)
+        if idx < 0:
+            return
+        pos = self._skip_ws(idx + len(SERIES_KEY))
+        if pos >= len(self._buf):
+            return
+        if self._buf[pos] != ":":
+            raise ValueError("Malformed TIME_SERIES_DAILY response after series key")
+        pos = self._skip_ws(pos + 1)
+        if pos >= len(self._buf):
+            return
+        if self._buf[pos] != "{":
+            raise ValueError("Malformed TIME_SERIES_DAILY response: series is not an object")
+
+        # Meta Data precedes the series in Alphavantage responses
+        match = _SYMBOL_RE.search(self._buf, 0, idx)
+        if match:
+            self.symbol = match.group(1)
+        self._pos = pos + 1
+        self._state = _SERIES
+
+    def _scan_series(self, out: List[Tuple[str, Dict[str, Any]]]) -> None:
+        buf = self._buf
+        end = len(buf)
+        decode = self._json.raw_decode
+        pos = self._pos
+        while True:
+            pos = self._skip_ws(pos)
+            if pos >= end:
+                break
+            ch = buf[pos]
+            if ch == "}":
+                self._state = _DONE
+                pos += 1
+                break
+            if ch == ",":
+                pos += 1
+                continue
+            start = pos
+            try:
+                day, pos = decode(buf, pos)
+                pos = self._skip_ws(pos)
+                if pos >= end or buf[pos] != ":":
+                    raise ValueError
+                values, pos = decode(buf, self._skip_ws(pos + 1))
+            except ValueError as exc:
+                # An entry ends with its values' closing brace. Once that and
+                # more input are buffered, the entry is complete and malformed;
+                # otherwise resume from its start on the next chunk
+                close = buf.find("}", start)
+                if close >= 0 and self._skip_ws(close + 1) < end:
+                    raise ValueError(
+                        f"Malformed TIME_SERIES_DAILY entry {buf[start:close + 1]!r}: {exc}"
+                    ) from None
+                pos = start
+                break
+            out.append((day, values))
+            self.entries += 1
+        self._pos = pos
@@ -1,15 +1,103 @@
-from sqlalchemy import create_engine
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .settings import settings
 from .logging_config import get_logger
 
 logger = get_logger("database")
 
-logger.info(f"Creating database engine with URL: {settings.DATABASE_URL}")
-engine = create_engine(settings.DATABASE_URL, echo=False, future=True)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    WAL lets readers proceed while a writer commits, and synchronous=NORMAL
+    only fsyncs at checkpoints, which is safe under WAL. The busy timeout
+    makes a second writer wait for the lock instead of failing.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: str, tuned: bool = True) -> Engine:
+    """
+    Create an engine for ``url`` with the tuning profile from Settings.
+
+    ``tuned=False`` returns an engine with SQLAlchemy's defaults, which the
+    benchmarks use as their baseline.
+    """
+    options: Dict[str, Any] = {"echo": False, "future": True}
+    if not tuned:
+        return create_engine(url, **options)
+
+    options["query_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    parsed = make_url(url)
+    is_sqlite = parsed.get_backend_name() == "sqlite"
+    if not is_sqlite:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    if parsed.get_backend_name() == "postgresql" and parsed.get_driver_name() == "psycopg":
+        # psycopg 3 prepares repeated statements on the server once they
+        # have run prepare_threshold times on a connection
+        options["connect_args"] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD}
+    tuned_engine = create_engine(url, **options)
+    if is_sqlite:
+        event.listen(tuned_engine, "connect", _apply_sqlite_pragmas)
+    return tuned_engine
+
+
+logger.info(f"Creating database engine for {make_url(settings.DATABASE_URL).render_as_string(hide_password=True)}")
+engine = build_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 Base = declarative_base()
 
+T = TypeVar("T")
+
+# Sessions are synchronous; async code hands database work to this bounded
+# pool so commits never run on the event loop. Each task opens its own
+# SessionLocal() inside the worker thread.
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        logger.info(f"Starting database worker pool with {settings.DB_WORKER_THREADS} threads")
+        _db_executor = ThreadPoolExecutor(
+            max_workers=settings.DB_WORKER_THREADS, thread_name_prefix="db-worker"
+        )
+    return _db_executor
+
+
+async def run_in_db_thread(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking database function in the worker pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_db_executor() -> None:
+    global _db_executor
+    if _db_executor is not None:
+        logger.info("Shutting down database worker pool")
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
+
 def get_session():
     logger.debug("Creating new database session")
     db = SessionLocal()
@@ -23,9 +111,51 @@ def create_db_and_tables():
     logger.info("Creating database tables")
     try:
         # Import models so they are registered before create_all
-        from . import models  # noqa
+        from .models import balance_sheet, daily_price, data_version, export_partition, income_statement, job, report_hash  # noqa
+        from .repositories.price_storage import check_layout
+        check_layout(engine)
         Base.metadata.create_all(bind=engine)
+        ensure_indexes(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {str(e)}", exc_info=True)
         raise
+
+
+# Single-column symbol indexes from earlier schema versions. Each is a prefix
+# of its table's (symbol, date) unique index, so they only cost writes.
+REDUNDANT_INDEXES = (
+    "ix_balance_sheets_id",
+    "ix_balance_sheets_symbol",
+    "ix_income_statements_id",
+    "ix_income_statements_symbol",
+    "ix_daily_prices_symbol",
+)
+
+
+def ensure_indexes(bind: Engine) -> None:
+    """
+    Bring indexes on existing tables in line with the models: create the
+    missing ones (create_all only creates indexes together with new tables)
+    and drop REDUNDANT_INDEXES. Existing indexes are read first, so this
+    runs its DDL once; later startups find nothing to change.
+    """
+    inspector = inspect(bind)
+    existing = {
+        index["name"]
+        for table_name in inspector.get_table_names()
+        for index in inspector.get_indexes(table_name)
+    }
+    missing = [
+        index for table in Base.metadata.sorted_tables for index in table.indexes if index.name not in existing
+    ]
+    redundant = [name for name in REDUNDANT_INDEXES if name in existing]
+    if not missing and not redundant:
+        return
+    with bind.begin() as conn:
+        for index in missing:
+            logger.info(f"Creating index {index.name}")
+            index.create(conn, checkfirst=True)
+        for name in redundant:
+            logger.info(f"Dropping redundant index {name}")
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
@@ -0,0 +1,26 @@
+from fastapi import Request
+
+from .services.ingestion import IngestionService
+from .services.jobs import JobManager
+from .services.profiling import RequestProfiler
+from .services.read_cache import ReadCache
+
+
+def get_ingestion_service(request: Request) -> IngestionService:
+    """Return the IngestionService created during application startup."""
+    return request.app.state.ingestion_service
+
+
+def get_job_manager(request: Request) -> JobManager:
+    """Return the JobManager created during application startup."""
+    return request.app.state.job_manager
+
+
+def get_read_cache(request: Request) -> ReadCache:
+    """Return the read-API response cache created during application startup."""
+    return request.app.state.read_cache
+
+
+def get_profiler(request: Request) -> RequestProfiler:
+    """Return the request profiler created during application startup."""
+    return request.app.state.profiler
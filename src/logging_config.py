@@ -1,10 +1,103 @@
+import atexit
+import json
 import logging
 import logging.config
-from typing import Dict, Any
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Dict, Any, List, Tuple
+
+from .settings import settings
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.filename,
+            "line": record.lineno,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class CallSiteRateLimitFilter(logging.Filter):
+    """
+    Lets at most ``limit`` records per ``window`` seconds through from each
+    call site (logger, file, line) below ERROR. The first record after a
+    window with drops carries a ``suppressed`` count.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._sites: Dict[Tuple[str, str, int], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.ERROR:
+            return True
+        site = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            # [window start, emitted, suppressed]
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                suppressed = int(state[2]) if state else 0
+                self._sites[site] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                    record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+def _stop_listeners() -> None:
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def _route_through_queue(logger: logging.Logger, rate_filter: logging.Filter) -> None:
+    """Replace ``logger``'s handlers with a QueueHandler drained by a background listener."""
+    handlers = list(logger.handlers)
+    if not handlers:
+        return
+    for handler in handlers:
+        logger.removeHandler(handler)
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(rate_filter)
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
 
 def setup_logging() -> None:
     """Configure logging for the entire application."""
-    
+    _stop_listeners()
+
+    formatter = "json" if settings.LOG_FORMAT == "json" else "detailed"
     logging_config: Dict[str, Any] = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -15,26 +108,30 @@ def setup_logging() -> None:
             },
             "simple": {
                 "format": "%(levelname)s - %(name)s - %(message)s"
+            },
+            "json": {
+                "()": JsonFormatter,
+                "datefmt": "%Y-%m-%dT%H:%M:%S%z"
             }
         },
         "handlers": {
             "console": {
                 "class": "logging.StreamHandler",
                 "level": "INFO",
-                "formatter": "detailed",
+                "formatter": formatter,
                 "stream": "ext://sys.stdout"
             },
             "file": {
                 "class": "logging.FileHandler",
-                "level": "DEBUG",
-                "formatter": "detailed",
-                "filename": "ingestion_service.log",
+                "level": settings.LOG_FILE_LEVEL,
+                "formatter": formatter,
+                "filename": settings.LOG_FILE,
                 "mode": "a"
             }
         },
         "loggers": {
             "ingestion_service": {
-                "level": "DEBUG",
+                "level": settings.LOG_LEVEL,
                 "handlers": ["console", "file"],
                 "propagate": False
             },
@@ -44,7 +141,7 @@ def setup_logging() -> None:
                 "propagate": False
             },
             "sqlalchemy.engine": {
-                "level": "INFO",
+                "level": settings.SQL_LOG_LEVEL,
                 "handlers": ["file"],
                 "propagate": False
             }
@@ -54,9 +151,19 @@ def setup_logging() -> None:
             "handlers": ["console", "file"]
         }
     }
-    
+
     logging.config.dictConfig(logging_config)
 
+    if settings.LOG_QUEUE_ENABLED:
+        # Formatting and I/O happen on listener threads, never on the event loop
+        rate_filter = CallSiteRateLimitFilter(
+            settings.LOG_RATE_LIMIT_PER_SITE, settings.LOG_RATE_LIMIT_WINDOW_SECONDS
+        )
+        for name in ("ingestion_service", "uvicorn", "sqlalchemy.engine", ""):
+            _route_through_queue(logging.getLogger(name), rate_filter)
+
+atexit.register(_stop_listeners)
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance for the given name."""
     return logging.getLogger(f"ingestion_service.{name}")
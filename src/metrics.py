@@ -0,0 +1,242 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond commits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = self._labels(key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {_format_value(state[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ───────────────────────────── service metrics ─────────────────────────────
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "ingestion_stage_seconds",
+    "Time spent per ingestion stage (fetch, parse, validate, upsert, total).",
+    ("dataset", "stage"),
+))
+INGESTIONS = REGISTRY.register(Counter(
+    "ingestion_runs_total",
+    "Completed ingestion runs by outcome.",
+    ("dataset", "outcome"),
+))
+INGESTIONS_COALESCED = REGISTRY.register(Counter(
+    "ingestion_coalesced_total",
+    "Ingest calls served by an identical in-flight (joined) or just-finished (reused) run.",
+    ("dataset", "outcome"),
+))
+ROWS_PARSED = REGISTRY.register(Counter(
+    "ingestion_rows_parsed_total", "Rows produced by connector parsers.", ("dataset",)
+))
+ROWS_REJECTED = REGISTRY.register(Counter(
+    "ingestion_rows_rejected_total", "Rows rejected by validation.", ("dataset",)
+))
+ROWS_INSERTED = REGISTRY.register(Counter(
+    "ingestion_rows_inserted_total", "Rows inserted by repository upserts.", ("dataset",)
+))
+ROWS_UPDATED = REGISTRY.register(Counter(
+    "ingestion_rows_updated_total", "Rows updated by repository upserts.", ("dataset",)
+))
+ROWS_UNCHANGED = REGISTRY.register(Counter(
+    "ingestion_rows_unchanged_total", "Reports skipped because their content hash matched.", ("dataset",)
+))
+COMMIT_SECONDS = REGISTRY.register(Histogram(
+    "db_commit_seconds", "Time spent in session.commit() per table.", ("table",)
+))
+PIPELINE_FLUSHES = REGISTRY.register(Counter(
+    "pipeline_flushes_total", "Writer-stage transactions by flush trigger (rows, time, stop).", ("reason",)
+))
+PIPELINE_FLUSH_ROWS = REGISTRY.register(Histogram(
+    "pipeline_flush_rows",
+    "Rows per writer-stage transaction.",
+    buckets=(100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+))
+PIPELINE_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "pipeline_queue_depth", "Validated payloads waiting for the writer stage."
+))
+SYMBOL_STATE_ENTRIES = REGISTRY.register(Gauge(
+    "symbol_state_entries", "(table, symbol) pairs held by the in-process symbol state index."
+))
+SYMBOL_STATE_LOOKUPS = REGISTRY.register(Counter(
+    "symbol_state_lookups_total",
+    "Symbol state lookups: hit, or miss (asked the database).",
+    ("outcome",),
+))
+
+# ──────────────────────────── upstream metrics ─────────────────────────────
+UPSTREAM_SECONDS = REGISTRY.register(Histogram(
+    "alphavantage_request_seconds",
+    "Alphavantage request latency until the body is fully received.",
+    ("function",),
+))
+UPSTREAM_BYTES = REGISTRY.register(Counter(
+    "alphavantage_response_bytes_total", "Response body bytes downloaded.", ("function",)
+))
+THROTTLE_EVENTS = REGISTRY.register(Counter(
+    "alphavantage_throttle_events_total", "Note/Information throttle responses.", ("function",)
+))
+CACHE_HITS = REGISTRY.register(Counter(
+    "response_cache_hits_total", "Requests served from the raw-response cache.", ("function",)
+))
+RATE_LIMIT = REGISTRY.register(Gauge(
+    "alphavantage_rate_limit_per_minute", "Current adaptive rate limit in calls per minute."
+))
+
+
+@contextmanager
+def track_ingestion(dataset: str) -> Iterator[None]:
+    """Record an ingestion run's total duration and its success/error outcome."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, dataset=dataset, stage="total")
+        INGESTIONS.inc(dataset=dataset, outcome=outcome)
@@ -1,12 +1,12 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Numeric, Date, Index, UniqueConstraint
 from datetime import datetime, date
 from ..database import Base
 
 class BalanceSheet(Base):
     __tablename__ = "balance_sheets"
 
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
     fiscal_date_ending = Column(Date, nullable=False)
     reported_currency = Column(String, nullable=False)
 
@@ -18,5 +18,6 @@ class BalanceSheet(Base):
 
     __table_args__ = (
         UniqueConstraint("symbol", "fiscal_date_ending", name="uq_symbol_date"),
+        Index("ix_balance_sheets_fiscal_date_symbol", "fiscal_date_ending", "symbol"),
     )
 
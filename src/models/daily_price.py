@@ -1,20 +1,64 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, UniqueConstraint
+from sqlalchemy import BigInteger, Column, Integer, String, Numeric, Float, Date, Index, UniqueConstraint
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime, date
 from ..database import Base
+from ..settings import settings
 
-class DailyPrice(Base):
-    __tablename__ = "daily_prices"
-
-    id            = Column(Integer, primary_key=True)
-    symbol        = Column(String, index=True, nullable=False)
-    trade_date    = Column(Date,   nullable=False)
-    open_price    = Column(Numeric)
-    high_price    = Column(Numeric)
-    low_price     = Column(Numeric)
-    close_price   = Column(Numeric)
-    volume        = Column(Integer)
-    created_at = Column(Date, default=datetime.utcnow)
-
-    __table_args__ = (
-        UniqueConstraint("symbol", "trade_date", name="uq_symbol_date_price"),
-    )
+# Scaled storage keeps prices as integer multiples of 1e-4
+PRICE_SCALE = 10_000
+
+
+class ScaledPrice(TypeDecorator):
+    """A price stored as a 64-bit integer count of 1/PRICE_SCALE ticks, read back as a float."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else round(value * PRICE_SCALE)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value / PRICE_SCALE
+
+
+if settings.DAILY_PRICE_STORAGE == "numeric":
+    class DailyPrice(Base):
+        __tablename__ = "daily_prices"
+
+        id            = Column(Integer, primary_key=True)
+        symbol        = Column(String, nullable=False)
+        trade_date    = Column(Date,   nullable=False)
+        open_price    = Column(Numeric)
+        high_price    = Column(Numeric)
+        low_price     = Column(Numeric)
+        close_price   = Column(Numeric)
+        volume        = Column(Integer)
+        created_at = Column(Date, default=datetime.utcnow)
+
+        __table_args__ = (
+            # Serves upsert conflicts, per-symbol range scans and the read keyset
+            UniqueConstraint("symbol", "trade_date", name="uq_symbol_date_price"),
+            # Cross-sectional reads: every symbol over a date range
+            Index("ix_daily_prices_trade_date_symbol", "trade_date", "symbol"),
+        )
+else:
+    _Price = ScaledPrice if settings.DAILY_PRICE_STORAGE == "scaled" else Float
+
+    class DailyPrice(Base):
+        __tablename__ = "daily_prices"
+
+        # The natural key is the primary key: on SQLite, WITHOUT ROWID stores
+        # rows in its b-tree, so there is no separate rowid table or unique index
+        symbol        = Column(String, primary_key=True)
+        trade_date    = Column(Date,   primary_key=True)
+        open_price    = Column(_Price)
+        high_price    = Column(_Price)
+        low_price     = Column(_Price)
+        close_price   = Column(_Price)
+        volume        = Column(BigInteger)
+
+        __table_args__ = (
+            # Cross-sectional reads: every symbol over a date range
+            Index("ix_daily_prices_trade_date_symbol", "trade_date", "symbol"),
+            {"sqlite_with_rowid": False},
+        )
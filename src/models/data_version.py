@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, String
+from ..database import Base
+
+
+class DataVersion(Base):
+    """
+    Write counter per (dataset, symbol), bumped in the transaction that
+    writes the symbol's rows. The row lock taken by the bump orders
+    concurrent writers, so a version only becomes visible together with the
+    rows written under it. Drives the read API's ETags.
+    """
+
+    __tablename__ = "data_versions"
+
+    dataset = Column(String, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index, UniqueConstraint
+from ..database import Base
+
+
+class ExportPartition(Base):
+    """
+    Last time ingestion wrote to a (dataset, symbol, year) partition. Drives
+    incremental exports.
+    """
+
+    __tablename__ = "export_partitions"
+
+    id = Column(Integer, primary_key=True)
+    dataset = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("dataset", "symbol", "year", name="uq_export_partition"),
+        # Partitions changed since an export watermark
+        Index("ix_export_partitions_dataset_changed_at", "dataset", "changed_at"),
+    )
@@ -1,13 +1,13 @@
 from datetime import date, datetime
-from sqlalchemy import Column, Integer, String, Numeric, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Numeric, Date, Index, UniqueConstraint
 from ..database import Base
 
 
 class IncomeStatement(Base):
     __tablename__ = "income_statements"
 
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
     fiscal_date_ending = Column(Date, nullable=False)
     reported_currency = Column(String, nullable=False)
 
@@ -22,4 +22,5 @@ class IncomeStatement(Base):
 
     __table_args__ = (
         UniqueConstraint("symbol", "fiscal_date_ending", name="uq_income_symbol_date"),
+        Index("ix_income_statements_fiscal_date_symbol", "fiscal_date_ending", "symbol"),
     )
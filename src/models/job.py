@@ -0,0 +1,45 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from ..database import Base
+
+
+class Job(Base):
+    """A batch ingestion job; its work lives in ``ingestion_job_items``."""
+
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String, nullable=False)
+    # Comma-separated Dataset values, in request order
+    datasets = Column(String, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class JobItem(Base):
+    """One (symbol, dataset) unit of a job, claimed and retried independently."""
+
+    __tablename__ = "ingestion_job_items"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(32), ForeignKey("ingestion_jobs.id", ondelete="CASCADE"), nullable=False)
+    symbol = Column(String, nullable=False)
+    dataset = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    error = Column(Text)
+    seconds = Column(Float)
+
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "symbol", "dataset", name="uq_job_item"),
+        # Workers claim the oldest due pending item
+        Index("ix_ingestion_job_items_status_due", "status", "next_attempt_at"),
+    )
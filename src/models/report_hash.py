@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from ..database import Base
+
+
+class ReportHash(Base):
+    """Content hash of the last stored version of each fundamental report."""
+
+    __tablename__ = "report_hashes"
+
+    id = Column(Integer, primary_key=True)
+    dataset = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    fiscal_date_ending = Column(Date, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("dataset", "symbol", "fiscal_date_ending", name="uq_report_hash"),
+    )
@@ -0,0 +1,179 @@
+import csv
+import io
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Column, Integer, MetaData, Table, and_, func, insert, select
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session
+
+from ..schemas.batch import ColumnBatch
+from ..settings import settings
+from .bulk import _INSERT_FACTORIES, UnsupportedDialectError, UpsertResult
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.backfill")
+
+# NULL marker in the COPY stream, so that empty strings stay empty strings
+_COPY_NULL = "\\N"
+
+
+def copy_buffer(table: Table, names: Sequence[str], columns: Sequence[List[Any]], dialect: Dialect) -> io.StringIO:
+    """
+    Encode ``columns`` of ``table`` as CSV for ``COPY ... FROM STDIN``.
+
+    COPY bypasses SQLAlchemy's parameter binding, so every value first goes
+    through its column type's bind processor, as it would in an INSERT:
+    scaled prices, for one, must arrive as integer ticks rather than floats.
+    """
+    processors = [table.c[name].type.bind_processor(dialect) for name in names]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+    for values in zip(*columns):
+        writer.writerow([
+            _COPY_NULL if v is None else v
+            for v in (v if p is None else p(v) for p, v in zip(processors, values))
+        ])
+    buffer.seek(0)
+    return buffer
+
+
+@dataclass
+class _Target:
+    table: Table
+    staging: Table
+    key_columns: Sequence[str]
+    update_columns: Sequence[str]
+    staged: int = 0
+
+
+class BackfillLoader:
+    """
+    Set-based loader for first-time and full-universe backfills.
+
+    Validated batches are appended to a temporary staging table per target:
+    with ``COPY ... FROM STDIN`` on PostgreSQL and chunked ``executemany``
+    elsewhere. :meth:`merge` then moves each staging table into its target
+    with a single ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``, keeping
+    the last staged version of every key.
+
+    Staging tables live on the session's connection, so one loader must be
+    used from one thread and inside one transaction. Nothing is committed
+    here.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+        if self.dialect not in _INSERT_FACTORIES:
+            raise UnsupportedDialectError(
+                f"Backfill needs INSERT ... ON CONFLICT; the '{self.dialect}' database is not supported "
+                f"(use one of: {', '.join(_INSERT_FACTORIES)})"
+            )
+        self._metadata = MetaData()
+        self._targets: Dict[str, _Target] = {}
+        self._seq = itertools.count()
+
+    def _target(
+        self, model: Any, batch: ColumnBatch, key_columns: Sequence[str], update_columns: Sequence[str]
+    ) -> _Target:
+        table = model.__table__
+        target = self._targets.get(table.name)
+        if target is None:
+            # Every validated column: insert-only ones are needed for new rows
+            columns = [c for c in table.c if c.name in batch.columns]
+            staging = Table(
+                f"backfill_{table.name}",
+                self._metadata,
+                Column("_seq", Integer, nullable=False),
+                *[Column(c.name, c.type) for c in columns],
+                prefixes=["TEMPORARY"],
+            )
+            # A failed earlier run on this pooled connection may have left it behind
+            staging.drop(self.db.connection(), checkfirst=True)
+            staging.create(self.db.connection())
+            target = self._targets[table.name] = _Target(table, staging, key_columns, update_columns)
+        return target
+
+    def stage(
+        self,
+        model: Any,
+        batch: ColumnBatch,
+        key_columns: Sequence[str],
+        update_columns: Sequence[str],
+    ) -> int:
+        """Append ``batch`` to ``model``'s staging table and return the rows staged."""
+        n = len(batch)
+        if not n:
+            return 0
+        target = self._target(model, batch, key_columns, update_columns)
+        names = [c.name for c in target.staging.c if c.name != "_seq"]
+        seqs = [next(self._seq) for _ in range(n)]
+        columns = [seqs] + [batch.columns[name] for name in names]
+
+        if self.dialect == "postgresql":
+            self._copy(target.staging, ["_seq", *names], columns)
+        else:
+            size = max(1, settings.UPSERT_CHUNK_SIZE)
+            stmt = insert(target.staging)
+            keys = ["_seq", *names]
+            for start in range(0, n, size):
+                rows = [dict(zip(keys, values)) for values in zip(*(c[start:start + size] for c in columns))]
+                self.db.execute(stmt, rows)
+
+        target.staged += n
+        return n
+
+    def _copy(self, staging: Table, names: List[str], columns: List[List[Any]]) -> None:
+        buffer = copy_buffer(staging, names, columns, self.db.get_bind().dialect)
+
+        sql = (
+            f"COPY {staging.name} ({', '.join(names)}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{_COPY_NULL}')"
+        )
+        cursor = self.db.connection().connection.dbapi_connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+    def merge(self) -> Dict[str, UpsertResult]:
+        """Upsert every staging table into its target, one statement per table."""
+        results: Dict[str, UpsertResult] = {}
+        insert_factory = _INSERT_FACTORIES[self.dialect]
+        for name, target in self._targets.items():
+            stage, table = target.staging, target.table
+            names = [c.name for c in stage.c if c.name != "_seq"]
+
+            # Latest staged version of each key
+            latest = select(func.max(stage.c._seq)).group_by(*[stage.c[k] for k in target.key_columns])
+            source = select(*[stage.c[n] for n in names]).where(stage.c._seq.in_(latest))
+
+            distinct = self.db.execute(select(func.count()).select_from(source.subquery())).scalar_one()
+            existing = self.db.execute(
+                select(func.count())
+                .select_from(stage)
+                .join(table, and_(*[table.c[k] == stage.c[k] for k in target.key_columns]))
+                .where(stage.c._seq.in_(latest))
+            ).scalar_one()
+
+            stmt = insert_factory(table).from_select(names, source)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c[k] for k in target.key_columns],
+                set_={col: stmt.excluded[col] for col in target.update_columns},
+            )
+            self.db.execute(stmt)
+
+            results[name] = UpsertResult(inserted=distinct - existing, updated=existing)
+            logger.info(
+                f"Merged {target.staged} staged rows into {name}: "
+                f"{results[name].inserted} inserted, {results[name].updated} updated"
+            )
+            stage.drop(self.db.connection())
+        self._targets.clear()
+        return results
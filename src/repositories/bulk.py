@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..schemas.batch import ColumnBatch
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.bulk")
+
+# SQLite builds since 3.32 accept 32766 bound parameters per statement,
+# PostgreSQL accepts 65535. Stay below the smaller of the two.
+MAX_BIND_PARAMS = 32000
+
+_INSERT_FACTORIES = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    # Records skipped before the write because their content was unchanged
+    unchanged: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated
+
+    def __iadd__(self, other: "UpsertResult") -> "UpsertResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+
+def as_rows(records: Union[ColumnBatch, List[Any]]) -> Union[ColumnBatch, List[Dict[str, Any]]]:
+    """Pass column batches through; dump Pydantic models to row dictionaries."""
+    if isinstance(records, ColumnBatch):
+        return records
+    return [record.model_dump() for record in records]
+
+
+class UnsupportedDialectError(RuntimeError):
+    """Raised when the configured database has no INSERT ... ON CONFLICT support here."""
+
+
+def _last_per_key(
+    rows: Union[ColumnBatch, List[Dict[str, Any]]], key_columns: Sequence[str]
+) -> Union[ColumnBatch, List[Dict[str, Any]]]:
+    """``rows`` without the earlier rows of repeated keys; returned as is when no key repeats."""
+    if isinstance(rows, ColumnBatch):
+        keys = zip(*(rows.columns[k] for k in key_columns))
+    else:
+        keys = (tuple(r[k] for k in key_columns) for r in rows)
+    last = {key: i for i, key in enumerate(keys)}
+    if len(last) == len(rows):
+        return rows
+    kept = sorted(last.values())
+    if isinstance(rows, ColumnBatch):
+        return ColumnBatch(columns={name: [values[i] for i in kept] for name, values in rows.columns.items()})
+    return [rows[i] for i in kept]
+
+
+def _chunk_size(n_columns: int) -> int:
+    return max(1, min(settings.UPSERT_CHUNK_SIZE, MAX_BIND_PARAMS // max(1, n_columns)))
+
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    rows: Union[ColumnBatch, List[Dict[str, Any]]],
+    key_columns: Sequence[str],
+    update_columns: Sequence[str],
+    new_after: Optional[date] = None,
+) -> UpsertResult:
+    """
+    Upsert ``rows`` into ``model``'s table with chunked
+    ``INSERT ... ON CONFLICT (key_columns) DO UPDATE`` statements.
+
+    ``rows`` may be a ColumnBatch, in which case row dictionaries are only
+    materialized one chunk at a time. Existing keys are looked up once per
+    chunk so that the returned counts distinguish inserted rows from
+    updated ones; keys dated after ``new_after``, which the caller knows are
+    not stored (see SymbolStateIndex.new_after), are not looked up. The
+    caller owns the transaction: nothing is committed here.
+    """
+    result = UpsertResult()
+    if not len(rows):
+        return result
+
+    dialect = db.get_bind().dialect.name
+    insert_factory = _INSERT_FACTORIES.get(dialect)
+    if insert_factory is None:
+        raise UnsupportedDialectError(
+            f"Bulk upsert needs INSERT ... ON CONFLICT; the '{dialect}' database is not supported "
+            f"(use one of: {', '.join(_INSERT_FACTORIES)})"
+        )
+
+    # ON CONFLICT cannot touch the same key twice in one statement, and a key
+    # repeated in a later chunk would be counted as inserted and then as
+    # updated: keep the last row of each key, across the whole batch
+    rows = _last_per_key(rows, key_columns)
+
+    table = model.__table__
+    key_cols = [table.c[name] for name in key_columns]
+    n_columns = len(rows.columns) if isinstance(rows, ColumnBatch) else len(rows[0])
+    size = _chunk_size(n_columns + 1)  # +1 for the created_at default
+
+    for start in range(0, len(rows), size):
+        if isinstance(rows, ColumnBatch):
+            chunk = rows.rows(start, start + size)
+        else:
+            chunk = rows[start:start + size]
+        keys = [tuple(r[k] for k in key_columns) for r in chunk]
+
+        if new_after is not None:
+            keys = [k for k in keys if k[-1] <= new_after]
+        n_existing = len(db.execute(
+            select(*key_cols).where(tuple_(*key_cols).in_(keys))
+        ).all()) if keys else 0
+
+        stmt = insert_factory(table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_cols,
+            set_={name: stmt.excluded[name] for name in update_columns},
+        )
+        db.execute(stmt)
+
+        result.inserted += len(chunk) - n_existing
+        result.updated += n_existing
+
+    logger.debug(
+        f"Bulk upsert into {table.name}: {result.inserted} inserted, "
+        f"{result.updated} updated ({len(rows)} rows, chunk size {size})"
+    )
+    return result
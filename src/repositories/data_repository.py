@@ -1,5 +1,7 @@
+from datetime import date
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from ..models.balance_sheet import BalanceSheet
 from ..schemas.balance_sheet import BalanceSheetIn
@@ -7,107 +9,118 @@ from ..schemas.balance_sheet import BalanceSheetIn
 from ..models.daily_price import DailyPrice
 from ..schemas.price import DailyPriceIn
 
+from .bulk import UpsertResult, as_rows, bulk_upsert
+from .pagination import keyset_page
+from .symbol_state import get_symbol_state
+from ..metrics import COMMIT_SECONDS
+from ..schemas.batch import ColumnBatch
 from ..logging_config import get_logger
 
 logger = get_logger("repositories.data_repository")
 
 
 class BalanceSheetRepository:
+    KEY_COLUMNS = ("symbol", "fiscal_date_ending")
+    DATE_COLUMN = "fiscal_date_ending"
+    UPDATE_COLUMNS = ("total_assets", "total_liabilities", "total_shareholder_equity")
+
     def __init__(self, db: Session):
         self.db = db
         logger.debug("BalanceSheetRepository initialized")
 
-    def upsert_many(self, sheets: List[BalanceSheetIn]) -> None:
+    def page(
+        self,
+        symbol: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        after: Optional[Tuple[str, date]] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page ordered by (symbol, fiscal_date_ending)."""
+        return keyset_page(self.db, BalanceSheet, "fiscal_date_ending", symbol, start, end, after, limit)
+
+    def upsert_many(self, sheets: Union[ColumnBatch, List[BalanceSheetIn]]) -> UpsertResult:
         logger.info(f"Starting upsert operation for {len(sheets)} balance sheet records")
-        
-        updated_count = 0
-        inserted_count = 0
-        
+
+        rows = as_rows(sheets)
+        state = get_symbol_state()
         try:
-            for i, sheet in enumerate(sheets):
-                logger.debug(f"Processing balance sheet record {i+1}/{len(sheets)} for {sheet.symbol}")
-                
-                existing = (
-                    self.db.query(BalanceSheet)
-                    .filter(
-                        BalanceSheet.symbol == sheet.symbol,
-                        BalanceSheet.fiscal_date_ending == sheet.fiscal_date_ending,
-                    )
-                    .one_or_none()
-                )
-                
-                if existing:
-                    # Update existing fields
-                    existing.total_assets = sheet.total_assets
-                    existing.total_liabilities = sheet.total_liabilities
-                    existing.total_shareholder_equity = sheet.total_shareholder_equity
-                    updated_count += 1
-                    logger.debug(f"Updated existing balance sheet record for {sheet.symbol} - {sheet.fiscal_date_ending}")
-                else:
-                    # Insert new record
-                    new_record = BalanceSheet(
-                        symbol=sheet.symbol,
-                        fiscal_date_ending=sheet.fiscal_date_ending,
-                        reported_currency=sheet.reported_currency,
-                        total_assets=sheet.total_assets,
-                        total_liabilities=sheet.total_liabilities,
-                        total_shareholder_equity=sheet.total_shareholder_equity,
-                    )
-                    self.db.add(new_record)
-                    inserted_count += 1
-                    logger.debug(f"Inserted new balance sheet record for {sheet.symbol} - {sheet.fiscal_date_ending}")
-            
-            self.db.commit()
-            logger.info(f"Successfully completed balance sheet upsert: {inserted_count} inserted, {updated_count} updated")
-            
+            result = bulk_upsert(
+                self.db,
+                BalanceSheet,
+                rows,
+                self.KEY_COLUMNS,
+                self.UPDATE_COLUMNS,
+                new_after=state.new_after(self.db, BalanceSheet.__tablename__, rows) if state is not None else None,
+            )
+            if state is not None:
+                state.record(BalanceSheet.__tablename__, rows, result)
+            with COMMIT_SECONDS.time(table=BalanceSheet.__tablename__):
+                self.db.commit()
+            logger.info(f"Successfully completed balance sheet upsert: {result.inserted} inserted, {result.updated} updated")
+            return result
+
         except Exception as e:
             logger.error(f"Error during balance sheet upsert operation: {str(e)}", exc_info=True)
             self.db.rollback()
+            if state is not None:
+                state.discard(BalanceSheet.__tablename__, rows)
             raise
 
 
 class DailyPriceRepository:
+    KEY_COLUMNS = ("symbol", "trade_date")
+    DATE_COLUMN = "trade_date"
+    UPDATE_COLUMNS = ("open_price", "high_price", "low_price", "close_price", "volume")
+
     def __init__(self, db: Session):
         self.db = db
         logger.debug("DailyPriceRepository initialized")
 
-    def upsert_many(self, prices: List[DailyPriceIn]) -> None:
+    def page(
+        self,
+        symbol: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        after: Optional[Tuple[str, date]] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page ordered by (symbol, trade_date)."""
+        return keyset_page(self.db, DailyPrice, "trade_date", symbol, start, end, after, limit)
+
+    def latest_trade_date(self, symbol: str) -> Optional[date]:
+        """Return the most recent stored trade_date for ``symbol``, if any."""
+        state = get_symbol_state()
+        if state is not None:
+            return state.latest(self.db, DailyPrice.__tablename__, symbol)
+        return self.db.execute(
+            select(func.max(DailyPrice.trade_date)).where(DailyPrice.symbol == symbol)
+        ).scalar_one_or_none()
+
+    def upsert_many(self, prices: Union[ColumnBatch, List[DailyPriceIn]]) -> UpsertResult:
         logger.info(f"Starting upsert operation for {len(prices)} daily price records")
-        
-        updated_count = 0
-        inserted_count = 0
-        
+
+        rows = as_rows(prices)
+        state = get_symbol_state()
         try:
-            for i, p in enumerate(prices):
-                logger.debug(f"Processing daily price record {i+1}/{len(prices)} for {p.symbol}")
-                
-                row = (
-                    self.db.query(DailyPrice)
-                    .filter(DailyPrice.symbol == p.symbol,
-                            DailyPrice.trade_date == p.trade_date)
-                    .one_or_none()
-                )
-                
-                if row:
-                    # Update existing record
-                    row.open_price  = p.open_price
-                    row.high_price  = p.high_price
-                    row.low_price   = p.low_price
-                    row.close_price = p.close_price
-                    row.volume      = p.volume
-                    updated_count += 1
-                    logger.debug(f"Updated existing daily price record for {p.symbol} - {p.trade_date}")
-                else:
-                    # Insert new record
-                    new_record = DailyPrice(**p.dict())
-                    self.db.add(new_record)
-                    inserted_count += 1
-                    logger.debug(f"Inserted new daily price record for {p.symbol} - {p.trade_date}")
-            
-            self.db.commit()
-            logger.info(f"Successfully completed daily price upsert: {inserted_count} inserted, {updated_count} updated")
-            
+            result = bulk_upsert(
+                self.db,
+                DailyPrice,
+                rows,
+                self.KEY_COLUMNS,
+                self.UPDATE_COLUMNS,
+                new_after=state.new_after(self.db, DailyPrice.__tablename__, rows) if state is not None else None,
+            )
+            if state is not None:
+                state.record(DailyPrice.__tablename__, rows, result)
+            with COMMIT_SECONDS.time(table=DailyPrice.__tablename__):
+                self.db.commit()
+            logger.info(f"Successfully completed daily price upsert: {result.inserted} inserted, {result.updated} updated")
+            return result
+
         except Exception as e:
             logger.error(f"Error during daily price upsert operation: {str(e)}", exc_info=True)
             self.db.rollback()
+            if state is not None:
+                state.discard(DailyPrice.__tablename__, rows)
             raise
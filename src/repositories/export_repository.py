@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.data_version import DataVersion
+from ..models.export_partition import ExportPartition
+from ..schemas.batch import ColumnBatch
+from .bulk import _INSERT_FACTORIES, bulk_upsert
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.export_repository")
+
+
+def batch_partitions(batch: ColumnBatch, date_column: str) -> Set[Tuple[str, int]]:
+    """``(symbol, year)`` partitions covered by the rows of ``batch``."""
+    symbols = batch.columns.get("symbol", ())
+    days = batch.columns.get(date_column, ())
+    return {(symbol, day.year) for symbol, day in zip(symbols, days)}
+
+
+class ExportPartitionRepository:
+    KEY_COLUMNS = ("dataset", "symbol", "year")
+    UPDATE_COLUMNS = ("changed_at",)
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def stage(self, dataset: str, partitions: Iterable[Tuple[str, int]]) -> None:
+        """
+        Mark partitions as changed and bump their symbols' versions without
+        committing, so both land in the same transaction as the rows that
+        changed them.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {"dataset": dataset, "symbol": symbol, "year": year, "changed_at": now}
+            for symbol, year in sorted(set(partitions))
+        ]
+        if rows:
+            bulk_upsert(self.db, ExportPartition, rows, self.KEY_COLUMNS, self.UPDATE_COLUMNS)
+            self._bump_versions(dataset, sorted({row["symbol"] for row in rows}))
+            logger.debug(f"Marked {len(rows)} {dataset} export partitions as changed")
+
+    def _bump_versions(self, dataset: str, symbols: List[str]) -> None:
+        """
+        Increment each symbol's version. Symbols are bumped in sorted order
+        so that concurrent writers take the row locks in the same order.
+        """
+        insert_factory = _INSERT_FACTORIES[self.db.get_bind().dialect.name]
+        stmt = insert_factory(DataVersion).values(
+            [{"dataset": dataset, "symbol": symbol, "version": 1} for symbol in symbols]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DataVersion.dataset, DataVersion.symbol],
+            set_={"version": DataVersion.version + 1},
+        )
+        self.db.execute(stmt)
+
+    def changed_since(self, dataset: str, watermark: Optional[datetime]) -> List[Tuple[str, int]]:
+        """Partitions marked after ``watermark`` (all marked ones if it is None)."""
+        stmt = select(ExportPartition.symbol, ExportPartition.year).where(ExportPartition.dataset == dataset)
+        if watermark is not None:
+            stmt = stmt.where(ExportPartition.changed_at > watermark)
+        return [(symbol, year) for symbol, year in self.db.execute(stmt).all()]
+
+    def version(self, dataset: str, symbol: Optional[str] = None) -> Optional[int]:
+        """
+        Committed write count of ``symbol`` in ``dataset`` (of the whole
+        dataset if None), from any process; None before the first write.
+
+        Unlike ``changed_at``, which is stamped when a write is staged, a
+        version only rises when its transaction commits, so writers that
+        commit out of order still change it. Version rows are never
+        deleted, so the dataset-wide sum rises with every commit too.
+        """
+        if symbol is not None:
+            stmt = select(DataVersion.version).where(
+                DataVersion.dataset == dataset, DataVersion.symbol == symbol
+            )
+        else:
+            stmt = select(func.sum(DataVersion.version)).where(DataVersion.dataset == dataset)
+        version = self.db.execute(stmt).scalar_one_or_none()
+        return int(version) if version is not None else None
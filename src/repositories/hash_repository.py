@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..models.report_hash import ReportHash
+from .bulk import bulk_upsert
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.hash_repository")
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """SHA-256 of a parsed record, independent of key order."""
+    canonical = json.dumps(record, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ReportHashRepository:
+    KEY_COLUMNS = ("dataset", "symbol", "fiscal_date_ending")
+    UPDATE_COLUMNS = ("content_hash", "updated_at")
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get_hashes(self, dataset: str, symbols: Iterable[str]) -> Dict[Tuple[str, date], str]:
+        """Stored hashes keyed by ``(symbol, fiscal_date_ending)``."""
+        rows = self.db.execute(
+            select(ReportHash.symbol, ReportHash.fiscal_date_ending, ReportHash.content_hash)
+            .where(ReportHash.dataset == dataset, ReportHash.symbol.in_(list(symbols)))
+        ).all()
+        return {(symbol, fiscal): digest for symbol, fiscal, digest in rows}
+
+    def stage(self, dataset: str, hashes: List[Tuple[str, date, str]]) -> None:
+        """
+        Upsert ``(symbol, fiscal_date_ending, hash)`` entries without
+        committing, so they land in the same transaction as the reports.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "dataset": dataset,
+                "symbol": symbol,
+                "fiscal_date_ending": fiscal,
+                "content_hash": digest,
+                "updated_at": now,
+            }
+            for symbol, fiscal, digest in hashes
+        ]
+        bulk_upsert(self.db, ReportHash, rows, self.KEY_COLUMNS, self.UPDATE_COLUMNS)
+        logger.debug(f"Staged {len(rows)} {dataset} report hashes")
+
+    def clear(self, dataset: str, symbols: Iterable[str]) -> None:
+        """Forget stored hashes for ``symbols``; the next ingest rewrites their reports."""
+        self.db.execute(
+            delete(ReportHash).where(ReportHash.dataset == dataset, ReportHash.symbol.in_(list(symbols)))
+        )
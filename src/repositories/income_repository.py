@@ -1,30 +1,60 @@
-from typing import List
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, Union
 from sqlalchemy.orm import Session
 from ..models.income_statement import IncomeStatement
 from ..schemas.income_statement import IncomeStatementIn
+from ..schemas.batch import ColumnBatch
+from .bulk import UpsertResult, as_rows, bulk_upsert
+from .pagination import keyset_page
+from .symbol_state import get_symbol_state
+from ..metrics import COMMIT_SECONDS
 
 
 class IncomeStatementRepository:
+    KEY_COLUMNS = ("symbol", "fiscal_date_ending")
+    DATE_COLUMN = "fiscal_date_ending"
+    UPDATE_COLUMNS = (
+        "total_revenue",
+        "gross_profit",
+        "operating_income",
+        "ebit",
+        "ebitda",
+        "net_income",
+    )
+
     def __init__(self, db: Session) -> None:
         self.db = db
 
-    def upsert_many(self, statements: List[IncomeStatementIn]) -> None:
-        for stmt in statements:
-            existing = (
-                self.db.query(IncomeStatement)
-                .filter(
-                    IncomeStatement.symbol == stmt.symbol,
-                    IncomeStatement.fiscal_date_ending == stmt.fiscal_date_ending,
-                )
-                .one_or_none()
+    def page(
+        self,
+        symbol: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        after: Optional[Tuple[str, date]] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page ordered by (symbol, fiscal_date_ending)."""
+        return keyset_page(self.db, IncomeStatement, "fiscal_date_ending", symbol, start, end, after, limit)
+
+    def upsert_many(self, statements: Union[ColumnBatch, List[IncomeStatementIn]]) -> UpsertResult:
+        rows = as_rows(statements)
+        state = get_symbol_state()
+        try:
+            result = bulk_upsert(
+                self.db,
+                IncomeStatement,
+                rows,
+                self.KEY_COLUMNS,
+                self.UPDATE_COLUMNS,
+                new_after=state.new_after(self.db, IncomeStatement.__tablename__, rows) if state is not None else None,
             )
-            if existing:
-                existing.total_revenue = stmt.total_revenue
-                existing.gross_profit = stmt.gross_profit
-                existing.operating_income = stmt.operating_income
-                existing.ebit = stmt.ebit
-                existing.ebitda = stmt.ebitda
-                existing.net_income = stmt.net_income
-            else:
-                self.db.add(IncomeStatement(**stmt.dict()))
-        self.db.commit()
+            if state is not None:
+                state.record(IncomeStatement.__tablename__, rows, result)
+            with COMMIT_SECONDS.time(table=IncomeStatement.__tablename__):
+                self.db.commit()
+            return result
+        except Exception:
+            self.db.rollback()
+            if state is not None:
+                state.discard(IncomeStatement.__tablename__, rows)
+            raise
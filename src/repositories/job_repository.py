@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models.job import Job, JobItem
+from ..schemas.jobs import JobStatus
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.job_repository")
+
+_UNFINISHED = (JobStatus.PENDING.value, JobStatus.RUNNING.value)
+
+
+@dataclass
+class ClaimedItem:
+    id: int
+    job_id: str
+    symbol: str
+    dataset: str
+    attempts: int
+
+
+class JobRepository:
+    """
+    Durable job queue. Every method runs and commits its own short
+    transaction, so progress survives a crash between any two calls.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def create(self, job_id: str, symbols: Sequence[str], datasets: Sequence[str]) -> None:
+        now = datetime.utcnow()
+        self.db.add(Job(id=job_id, status=JobStatus.PENDING.value, datasets=",".join(datasets), created_at=now))
+        self.db.flush()
+        rows = [
+            {
+                "job_id": job_id,
+                "symbol": symbol,
+                "dataset": dataset,
+                "status": JobStatus.PENDING.value,
+                "attempts": 0,
+                "next_attempt_at": now,
+            }
+            for symbol in symbols
+            for dataset in datasets
+        ]
+        self.db.execute(insert(JobItem), rows)
+        self.db.commit()
+
+    def requeue_running(self) -> int:
+        """Return items left running by a previous process to the queue."""
+        result = self.db.execute(
+            update(JobItem).where(JobItem.status == JobStatus.RUNNING.value).values(status=JobStatus.PENDING.value)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def claim(self, now: datetime) -> Optional[ClaimedItem]:
+        """Mark the oldest due pending item as running and return it."""
+        row = self.db.execute(
+            select(JobItem.id, JobItem.job_id, JobItem.symbol, JobItem.dataset, JobItem.attempts)
+            .where(JobItem.status == JobStatus.PENDING.value, JobItem.next_attempt_at <= now)
+            .order_by(JobItem.next_attempt_at, JobItem.id)
+            .limit(1)
+        ).first()
+        if row is None:
+            self.db.rollback()
+            return None
+
+        # Conditional on the status, so two workers cannot claim the same item,
+        # and on the attempt count, so an item another worker claimed, failed
+        # and requeued since the select above is not claimed with stale attempts
+        claimed = self.db.execute(
+            update(JobItem)
+            .where(
+                JobItem.id == row.id,
+                JobItem.status == JobStatus.PENDING.value,
+                JobItem.attempts == row.attempts,
+            )
+            .values(status=JobStatus.RUNNING.value)
+        ).rowcount
+        if not claimed:
+            self.db.rollback()
+            return None
+        self.db.execute(
+            update(Job)
+            .where(Job.id == row.job_id, Job.status == JobStatus.PENDING.value)
+            .values(status=JobStatus.RUNNING.value, started_at=now)
+        )
+        self.db.commit()
+        return ClaimedItem(row.id, row.job_id, row.symbol, row.dataset, row.attempts)
+
+    def release(self, item_id: int) -> None:
+        """Put an interrupted item back without counting an attempt."""
+        self.db.execute(
+            update(JobItem)
+            .where(JobItem.id == item_id, JobItem.status == JobStatus.RUNNING.value)
+            .values(status=JobStatus.PENDING.value)
+        )
+        self.db.commit()
+
+    def complete(self, item_id: int, inserted: int, updated: int, unchanged: int, seconds: float) -> None:
+        self.db.execute(
+            update(JobItem)
+            .where(JobItem.id == item_id)
+            .values(
+                status=JobStatus.COMPLETED.value,
+                inserted=inserted,
+                updated=updated,
+                unchanged=unchanged,
+                seconds=seconds,
+                error=None,
+            )
+        )
+        self.db.commit()
+
+    def fail(self, item_id: int, error: str, seconds: float, retry_at: Optional[datetime]) -> None:
+        """Count a failed attempt; requeue it at ``retry_at``, or dead-letter it if None."""
+        values = {"error": error, "seconds": seconds, "attempts": JobItem.attempts + 1}
+        if retry_at is None:
+            values["status"] = JobStatus.FAILED.value
+        else:
+            values.update(status=JobStatus.PENDING.value, next_attempt_at=retry_at)
+        self.db.execute(update(JobItem).where(JobItem.id == item_id).values(**values))
+        self.db.commit()
+
+    def postpone(self, item_id: int, error: str, retry_at: datetime) -> None:
+        """Requeue an item at ``retry_at`` without counting an attempt."""
+        self.db.execute(
+            update(JobItem)
+            .where(JobItem.id == item_id)
+            .values(status=JobStatus.PENDING.value, error=error, next_attempt_at=retry_at)
+        )
+        self.db.commit()
+
+    def finish_if_done(self, job_id: str, now: datetime) -> Optional[Tuple[JobStatus, int]]:
+        """
+        Close the job once none of its items is pending or running. Returns
+        the final status and the rows it wrote, or None while work remains.
+        """
+        counts: Dict[str, Tuple[int, int]] = {
+            status: (n, written or 0)
+            for status, n, written in self.db.execute(
+                select(JobItem.status, func.count(), func.sum(JobItem.inserted + JobItem.updated))
+                .where(JobItem.job_id == job_id)
+                .group_by(JobItem.status)
+            ).all()
+        }
+        if any(status in counts for status in _UNFINISHED):
+            self.db.rollback()
+            return None
+
+        status = JobStatus.FAILED if set(counts) == {JobStatus.FAILED.value} else JobStatus.COMPLETED
+        finished = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status.in_(_UNFINISHED))
+            .values(status=status.value, finished_at=now)
+        ).rowcount
+        self.db.commit()
+        if not finished:
+            return None
+        return status, sum(written for _, written in counts.values())
+
+    def get(self, job_id: str) -> Optional[Tuple[Job, List[JobItem]]]:
+        job = self.db.get(Job, job_id)
+        if job is None:
+            return None
+        items = self.db.execute(
+            select(JobItem).where(JobItem.job_id == job_id).order_by(JobItem.id)
+        ).scalars().all()
+        return job, list(items)
+
+    def recent(self, limit: int) -> List[Tuple[Job, List[JobItem]]]:
+        jobs = self.db.execute(select(Job).order_by(Job.created_at.desc()).limit(limit)).scalars().all()
+        by_job: Dict[str, List[JobItem]] = {job.id: [] for job in jobs}
+        if by_job:
+            for item in self.db.execute(
+                select(JobItem).where(JobItem.job_id.in_(list(by_job))).order_by(JobItem.id)
+            ).scalars():
+                by_job[item.job_id].append(item)
+        return [(job, by_job[job.id]) for job in reversed(jobs)]
+
+    def prune(self, keep: int) -> int:
+        """Delete finished jobs beyond the ``keep`` most recent ones."""
+        stale = self.db.execute(
+            select(Job.id)
+            .where(Job.status.not_in(_UNFINISHED))
+            .order_by(Job.created_at.desc())
+            .offset(keep)
+        ).scalars().all()
+        if stale:
+            self.db.execute(delete(JobItem).where(JobItem.job_id.in_(stale)))
+            self.db.execute(delete(Job).where(Job.id.in_(stale)))
+        self.db.commit()
+        return len(stale)
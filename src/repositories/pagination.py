@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+# Bookkeeping columns left out of read responses
+_HIDDEN_COLUMNS = ("created_at",)
+
+
+def keyset_page(
+    db: Session,
+    model: Any,
+    date_column: str,
+    symbol: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    after: Optional[Tuple[str, date]] = None,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """
+    Return up to ``limit`` rows of ``model`` ordered by ``(symbol, date_column)``
+    and strictly after the ``after`` key.
+
+    The ordering matches the tables' unique ``(symbol, date)`` constraint,
+    so every page is an index range scan regardless of how deep it is.
+    Rows are returned as column mappings rather than ORM instances.
+    """
+    table = model.__table__
+    symbol_col = table.c.symbol
+    date_col = table.c[date_column]
+
+    stmt = select(*[c for c in table.c if c.name not in _HIDDEN_COLUMNS])
+    if symbol is not None:
+        stmt = stmt.where(symbol_col == symbol)
+    if start is not None:
+        stmt = stmt.where(date_col >= start)
+    if end is not None:
+        stmt = stmt.where(date_col <= end)
+    if after is not None:
+        stmt = stmt.where(tuple_(symbol_col, date_col) > tuple_(*after))
+    stmt = stmt.order_by(symbol_col, date_col).limit(limit)
+
+    return [dict(row) for row in db.execute(stmt).mappings()]
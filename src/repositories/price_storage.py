@@ -0,0 +1,103 @@
+from typing import Optional
+
+from sqlalchemy import BigInteger, Float, MetaData, Numeric, UniqueConstraint, cast, column, func, insert, inspect, select, table
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import Integer
+
+from ..models.daily_price import PRICE_SCALE, DailyPrice
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.price_storage")
+
+PRICE_COLUMNS = ("open_price", "high_price", "low_price", "close_price")
+_COPY_COLUMNS = ("symbol", "trade_date", *PRICE_COLUMNS, "volume")
+
+
+class PriceStorageMismatch(RuntimeError):
+    pass
+
+
+def stored_layout(bind: Engine) -> Optional[str]:
+    """Storage layout of the existing daily_prices table, or None if there is none."""
+    inspector = inspect(bind)
+    if not inspector.has_table(DailyPrice.__tablename__):
+        return None
+    columns = {c["name"]: c["type"] for c in inspector.get_columns(DailyPrice.__tablename__)}
+    if "id" in columns:
+        return "numeric"
+    return "scaled" if isinstance(columns["open_price"], Integer) else "float"
+
+
+def check_layout(bind: Engine) -> None:
+    """Refuse to run against a daily_prices table in another layout than DAILY_PRICE_STORAGE."""
+    stored = stored_layout(bind)
+    if stored is not None and stored != settings.DAILY_PRICE_STORAGE:
+        raise PriceStorageMismatch(
+            f"daily_prices is stored in the '{stored}' layout but DAILY_PRICE_STORAGE is "
+            f"'{settings.DAILY_PRICE_STORAGE}'; run `python migrate_prices.py` to convert it"
+        )
+
+
+def migrate_daily_prices(bind: Engine, vacuum: bool = True) -> int:
+    """
+    Rebuild daily_prices in the DAILY_PRICE_STORAGE layout and return the
+    rows copied (0 when it is already in that layout).
+
+    Rows are copied with one INSERT ... SELECT into a new table, converting
+    prices in SQL; the old table is only dropped once the copy succeeded,
+    and the new one then takes its name and indexes. On SQLite the file is
+    vacuumed afterwards to hand the freed pages back to the filesystem.
+    """
+    target = settings.DAILY_PRICE_STORAGE
+    source = stored_layout(bind)
+    if source is None or source == target:
+        logger.info(f"daily_prices is already in the '{target}' layout")
+        return 0
+
+    name = DailyPrice.__tablename__
+    staging_name = f"{name}_migrating"
+    staging = DailyPrice.__table__.to_metadata(MetaData(), name=staging_name)
+    # Index names, and constraint names on PostgreSQL, are schema-wide: create
+    # the indexes after the rename, and build the constraints under temporary
+    # names that take the model's once the old table is gone
+    staging.indexes.clear()
+    renames = []
+    if bind.dialect.name == "postgresql":
+        renames.append((f"{staging_name}_pkey", f"{name}_pkey"))
+        for constraint in staging.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name:
+                renames.append((f"{constraint.name}_migrating", constraint.name))
+                constraint.name = renames[-1][0]
+
+    old = table(name, *[column(c) for c in _COPY_COLUMNS])
+
+    def price(col):
+        value = old.c[col] / float(PRICE_SCALE) if source == "scaled" else cast(old.c[col], Float)
+        if target == "scaled":
+            return cast(func.round(value * PRICE_SCALE), BigInteger)
+        return cast(value, Float if target == "float" else Numeric)
+
+    values = [old.c.symbol, old.c.trade_date, *[price(c) for c in PRICE_COLUMNS], old.c.volume]
+    names = list(_COPY_COLUMNS)
+    if target == "numeric":
+        values.append(func.current_date())
+        names.append("created_at")
+
+    logger.info(f"Migrating {name} from the '{source}' to the '{target}' layout")
+    with bind.begin() as conn:
+        staging.drop(conn, checkfirst=True)
+        staging.create(conn)
+        copied = conn.execute(insert(staging).from_select(names, select(*values))).rowcount
+        DailyPrice.__table__.drop(conn)
+        conn.exec_driver_sql(f"ALTER TABLE {staging_name} RENAME TO {name}")
+        for temporary, final in renames:
+            conn.exec_driver_sql(f"ALTER TABLE {name} RENAME CONSTRAINT {temporary} TO {final}")
+        for index in DailyPrice.__table__.indexes:
+            index.create(conn)
+    logger.info(f"Copied {copied} rows into the '{target}' layout of {name}")
+
+    if vacuum and bind.dialect.name == "sqlite":
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+    return copied
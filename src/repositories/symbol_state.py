@@ -0,0 +1,223 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..models.balance_sheet import BalanceSheet
+from ..models.daily_price import DailyPrice
+from ..models.income_statement import IncomeStatement
+from ..schemas.batch import ColumnBatch
+from ..database import SessionLocal
+from ..metrics import SYMBOL_STATE_ENTRIES, SYMBOL_STATE_LOOKUPS
+from ..settings import settings
+from .bulk import UpsertResult
+from ..logging_config import get_logger
+
+logger = get_logger("repositories.symbol_state")
+
+# Tracked tables and the date column that orders each symbol's rows
+TRACKED = {
+    DailyPrice.__tablename__: (DailyPrice, "trade_date"),
+    BalanceSheet.__tablename__: (BalanceSheet, "fiscal_date_ending"),
+    IncomeStatement.__tablename__: (IncomeStatement, "fiscal_date_ending"),
+}
+
+
+@dataclass
+class SymbolState:
+    """What one table holds for one symbol."""
+
+    latest: Optional[date] = None
+    rows: int = 0
+    # Last successful ingest of the symbol by this process, written or not
+    fetched_at: Optional[datetime] = None
+
+
+def _symbol_dates(rows: Union[ColumnBatch, List[Dict[str, Any]]], date_column: str) -> Tuple[Set[str], Optional[date]]:
+    if isinstance(rows, ColumnBatch):
+        symbols, dates = rows.columns.get("symbol", ()), rows.columns.get(date_column, ())
+    else:
+        symbols = [r["symbol"] for r in rows]
+        dates = [r[date_column] for r in rows]
+    return set(symbols), max(dates, default=None)
+
+
+class SymbolStateIndex:
+    """
+    In-process index of per-table, per-symbol state: latest date, row count
+    and last fetch. It answers "what is stored for this symbol" without a
+    database round trip.
+
+    The index is loaded with one grouped query and then kept current by the
+    writers: each upsert is folded in by :meth:`record` inside its
+    transaction, and :meth:`discard` drops the symbols again if that
+    transaction rolls back. It holds at most ``max_entries`` (table, symbol)
+    pairs and evicts the least recently used; a symbol missing from the
+    index is read from the database once and indexed.
+
+    The index is authoritative for indexed symbols: writes through this
+    process need no extra query. Writes by other processes to an indexed
+    symbol are not seen until its entry is evicted or invalidated. Until
+    then a lookup may return an older latest date, which costs at most a
+    larger refetch, and :meth:`new_after` may call keys they stored new,
+    which overcounts inserts against updates; the rows written are the
+    same either way.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], SymbolState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, db: Session) -> int:
+        """Replace the index with the tables' contents, in one grouped query."""
+        selects = []
+        for name, (model, date_column) in TRACKED.items():
+            table = model.__table__
+            selects.append(
+                select(
+                    literal(name).label("table_name"),
+                    table.c.symbol,
+                    func.max(table.c[date_column]).label("latest"),
+                    func.count().label("row_count"),
+                ).group_by(table.c.symbol)
+            )
+        entries: "OrderedDict[Tuple[str, str], SymbolState]" = OrderedDict()
+        skipped = 0
+        for name, symbol, latest, rows in db.execute(union_all(*selects)):
+            if len(entries) >= self.max_entries:
+                skipped += 1
+                continue
+            if isinstance(latest, str):  # SQLite returns dates from a UNION as text
+                latest = date.fromisoformat(latest)
+            entries[(name, symbol)] = SymbolState(latest=latest, rows=rows)
+        with self._lock:
+            self._entries = entries
+            SYMBOL_STATE_ENTRIES.set(len(entries))
+        logger.info(
+            f"Loaded symbol state for {len(entries)} (table, symbol) pairs"
+            + (f"; {skipped} more over capacity" if skipped else "")
+        )
+        return len(entries)
+
+    def lookup(self, table: str, symbol: str) -> Optional[SymbolState]:
+        """Return a copy of the indexed state, or None when the database has to be asked."""
+        with self._lock:
+            state = self._entries.get((table, symbol))
+            if state is not None:
+                self._entries.move_to_end((table, symbol))
+        SYMBOL_STATE_LOOKUPS.inc(outcome="miss" if state is None else "hit")
+        return None if state is None else replace(state)
+
+    def latest(self, db: Session, table: str, symbol: str) -> Optional[date]:
+        """Latest stored date of ``symbol``, from the index or else the database."""
+        state = self.lookup(table, symbol)
+        if state is None:
+            state = self.fetch(db, table, symbol)
+        return state.latest
+
+    def fetch(self, db: Session, table: str, symbol: str) -> SymbolState:
+        """Read the state of ``symbol`` from the database into the index."""
+        model, date_column = TRACKED[table]
+        latest, rows = db.execute(
+            select(func.max(model.__table__.c[date_column]), func.count())
+            .where(model.__table__.c.symbol == symbol)
+        ).one()
+        with self._lock:
+            current = self._entries.get((table, symbol))
+            fetched_at = current.fetched_at if current is not None else None
+        state = SymbolState(latest=latest, rows=rows, fetched_at=fetched_at)
+        self._put(table, symbol, replace(state))
+        return state
+
+    def new_after(self, db: Session, table: str, rows: Union[ColumnBatch, List[Dict[str, Any]]]) -> Optional[date]:
+        """
+        For a single-symbol batch, the date after which none of its keys are
+        stored (``date.min`` for a symbol without rows); None for a batch of
+        several symbols. Answered from the index, and only read from the
+        database, in the caller's transaction, when the symbol is not indexed.
+        """
+        symbols, _ = _symbol_dates(rows, TRACKED[table][1])
+        if len(symbols) != 1:
+            return None
+        latest = self.latest(db, table, next(iter(symbols)))
+        return latest if latest is not None else date.min
+
+    def record(self, table: str, rows: Union[ColumnBatch, List[Dict[str, Any]]], result: UpsertResult) -> None:
+        """
+        Fold an upsert into the index. Called inside the writing transaction,
+        right after the upsert, so later writes in it see the new state; the
+        caller calls :meth:`discard` if the transaction does not commit.
+        """
+        symbols, latest = _symbol_dates(rows, TRACKED[table][1])
+        if len(symbols) != 1:
+            # Per-symbol insert counts are not known for mixed batches
+            self.invalidate(table, symbols)
+            return
+        symbol = next(iter(symbols))
+        with self._lock:
+            state = self._entries.get((table, symbol))
+            if state is None:
+                return  # evicted since new_after: the rows before this write are unknown
+            if latest is not None and (state.latest is None or latest > state.latest):
+                state.latest = latest
+            state.rows += result.inserted
+            state.fetched_at = datetime.utcnow()
+        self._put(table, symbol, state)
+
+    def discard(self, table: str, rows: Union[ColumnBatch, List[Dict[str, Any]]]) -> None:
+        """Forget the symbols of a write that was rolled back."""
+        symbols, _ = _symbol_dates(rows, TRACKED[table][1])
+        self.invalidate(table, symbols)
+
+    def touch(self, table: str, symbol: str) -> None:
+        """Note a successful ingest of ``symbol`` that had nothing to write."""
+        with self._lock:
+            state = self._entries.get((table, symbol))
+            if state is not None:
+                state.fetched_at = datetime.utcnow()
+                self._entries.move_to_end((table, symbol))
+
+    def invalidate(self, table: str, symbols: Iterable[str]) -> None:
+        """Forget ``symbols``; their next lookup goes to the database."""
+        with self._lock:
+            for symbol in symbols:
+                self._entries.pop((table, symbol), None)
+            SYMBOL_STATE_ENTRIES.set(len(self._entries))
+
+    def _put(self, table: str, symbol: str, state: SymbolState) -> None:
+        with self._lock:
+            self._entries[(table, symbol)] = state
+            self._entries.move_to_end((table, symbol))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            SYMBOL_STATE_ENTRIES.set(len(self._entries))
+
+
+_default_index: Optional[SymbolStateIndex] = None
+
+
+def get_symbol_state() -> Optional[SymbolStateIndex]:
+    """Return the process-wide index, or None when it is disabled."""
+    global _default_index
+    if not settings.SYMBOL_STATE_ENABLED:
+        return None
+    if _default_index is None:
+        _default_index = SymbolStateIndex(settings.SYMBOL_STATE_MAX_ENTRIES)
+    return _default_index
+
+
+def load_symbol_state() -> int:
+    """Load the process-wide index from the database; returns the pairs indexed."""
+    index = get_symbol_state()
+    if index is None:
+        return 0
+    with SessionLocal() as db:
+        return index.load(db)
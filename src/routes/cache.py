@@ -0,0 +1,47 @@
+import asyncio
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from ..connectors.cache import ResponseCache, get_response_cache
+from ..schemas.cache import ReplayRequest
+from ..services.ingestion import IngestionService
+from ..dependencies import get_ingestion_service
+from ..logging_config import get_logger
+
+logger = get_logger("routes.cache")
+router = APIRouter()
+
+
+def _stats(cache: ResponseCache) -> Dict[str, Any]:
+    entries = list(cache.entries())
+    return {
+        "enabled": True,
+        "entries": len(entries),
+        "bytes": sum(e.size for e in entries),
+        "max_bytes": cache.max_bytes,
+        "by_function": dict(Counter(e.function for e in entries)),
+    }
+
+
+@router.get("/cache", response_model=dict)
+async def cache_stats():
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    # Globs and stats every cached file: keep it off the event loop
+    return await asyncio.to_thread(_stats, cache)
+
+
+@router.post("/cache/replay", response_model=dict)
+async def replay_cache(
+    request: Optional[ReplayRequest] = None,
+    service: IngestionService = Depends(get_ingestion_service),
+):
+    request = request or ReplayRequest()
+    logger.info(f"Received cache replay request (datasets={request.datasets}, symbols={request.symbols})")
+    try:
+        summary = await service.replay_from_cache(request.datasets, request.symbols)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {dataset.value: counts for dataset, counts in summary.items()}
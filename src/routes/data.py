@@ -0,0 +1,153 @@
+import base64
+import binascii
+from datetime import date
+from typing import Any, Optional, Tuple, Type
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+from ..database import SessionLocal, run_in_db_thread
+from ..dependencies import get_read_cache
+from ..repositories.data_repository import BalanceSheetRepository, DailyPriceRepository
+from ..repositories.export_repository import ExportPartitionRepository
+from ..repositories.income_repository import IncomeStatementRepository
+from ..schemas.jobs import Dataset
+from ..schemas.read import BalanceSheetPage, DailyPricePage, IncomeStatementPage
+from ..services.read_cache import ReadCache
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("routes.data")
+router = APIRouter()
+
+
+def _encode_cursor(symbol: str, day: date) -> str:
+    return base64.urlsafe_b64encode(f"{symbol}|{day.isoformat()}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, date]:
+    try:
+        symbol, day = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return symbol, date.fromisoformat(day)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _load_version(dataset: Dataset, symbol: Optional[str]) -> Optional[int]:
+    with SessionLocal() as db:
+        return ExportPartitionRepository(db).version(dataset.value, symbol)
+
+
+def _load_page(
+    repository_cls: Type[Any],
+    page_cls: Type[BaseModel],
+    date_column: str,
+    symbol: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+    after: Optional[Tuple[str, date]],
+    limit: int,
+) -> bytes:
+    with SessionLocal() as db:
+        # One extra row tells whether another page follows
+        rows = repository_cls(db).page(symbol, start, end, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]["symbol"], rows[-1][date_column])
+    return page_cls(items=rows, next_cursor=next_cursor).model_dump_json().encode()
+
+
+async def _serve_page(
+    request: Request,
+    cache: ReadCache,
+    dataset: Dataset,
+    repository_cls: Type[Any],
+    page_cls: Type[BaseModel],
+    date_column: str,
+    symbol: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+    cursor: Optional[str],
+    limit: int,
+) -> Response:
+    """
+    Serve one page with an ETag. The ETag comes from the committed version
+    of the symbol (or dataset) and is read before the page. A write that
+    commits mid-query may put newer rows under the older version; that
+    version is already superseded, so the next request with it misses and
+    gets the newer page.
+    """
+    symbol = symbol.upper() if symbol else None
+    after = _decode_cursor(cursor) if cursor else None
+    query = (start, end, after, limit)
+    key = (dataset.value, symbol, query)
+
+    version = await run_in_db_thread(_load_version, dataset, symbol)
+    etag = cache.etag(dataset.value, symbol, version, query)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = cache.get(key, etag)
+    if body is None:
+        body = await run_in_db_thread(
+            _load_page, repository_cls, page_cls, date_column, symbol, start, end, after, limit
+        )
+        cache.put(key, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/daily-prices", response_model=DailyPricePage)
+async def list_daily_prices(
+    request: Request,
+    symbol: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.READ_PAGE_DEFAULT_LIMIT, ge=1, le=settings.READ_PAGE_MAX_LIMIT),
+    cache: ReadCache = Depends(get_read_cache),
+):
+    return await _serve_page(
+        request, cache, Dataset.DAILY_PRICES, DailyPriceRepository, DailyPricePage,
+        "trade_date", symbol, start, end, cursor, limit,
+    )
+
+
+@router.get("/balance-sheets", response_model=BalanceSheetPage)
+async def list_balance_sheets(
+    request: Request,
+    symbol: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.READ_PAGE_DEFAULT_LIMIT, ge=1, le=settings.READ_PAGE_MAX_LIMIT),
+    cache: ReadCache = Depends(get_read_cache),
+):
+    return await _serve_page(
+        request, cache, Dataset.BALANCE_SHEET, BalanceSheetRepository, BalanceSheetPage,
+        "fiscal_date_ending", symbol, start, end, cursor, limit,
+    )
+
+
+@router.get("/income-statements", response_model=IncomeStatementPage)
+async def list_income_statements(
+    request: Request,
+    symbol: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.READ_PAGE_DEFAULT_LIMIT, ge=1, le=settings.READ_PAGE_MAX_LIMIT),
+    cache: ReadCache = Depends(get_read_cache),
+):
+    return await _serve_page(
+        request, cache, Dataset.INCOME_STATEMENT, IncomeStatementRepository, IncomeStatementPage,
+        "fiscal_date_ending", symbol, start, end, cursor, limit,
+    )
@@ -1,40 +1,108 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from ..services.ingestion import IngestionService
+from ..services.profiling import RequestProfiler
+from ..dependencies import get_ingestion_service, get_profiler
+from ..connectors.base import AlphavantageThrottleError
+from ..connectors.rate_limiter import QuotaExhaustedError
+from ..connectors.cache import CacheMissError
 from ..logging_config import get_logger
 
 logger = get_logger("routes.ingest")
 router = APIRouter()
-service = IngestionService()
 
 @router.post("/ingest/{symbol}", response_model=dict)
-async def ingest_symbol(symbol: str):
+async def ingest_symbol(
+    symbol: str,
+    request: Request,
+    response: Response,
+    service: IngestionService = Depends(get_ingestion_service),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
     logger.info(f"Received balance sheet ingestion request for symbol: {symbol}")
     try:
-        count = await service.ingest_balance_sheet(symbol)
-        logger.info(f"Successfully completed balance sheet ingestion for {symbol} - inserted {count} records")
-        return {"inserted": count}
+        async with profiler.profile(request, response, "balance_sheet", symbol):
+            result = await service.ingest_balance_sheet(symbol)
+        logger.info(f"Successfully completed balance sheet ingestion for {symbol} - inserted {result.inserted}, updated {result.updated}, unchanged {result.unchanged} records")
+        return {"inserted": result.inserted, "updated": result.updated, "unchanged": result.unchanged}
+    except CacheMissError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (QuotaExhaustedError, AlphavantageThrottleError) as exc:
+        logger.warning(f"Rate limited while ingesting balance sheet for {symbol}: {str(exc)}")
+        raise HTTPException(status_code=429, detail=str(exc))
     except Exception as exc:
         logger.error(f"Failed to ingest balance sheet for {symbol}: {str(exc)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc))
     
 @router.post("/ingest/daily/{symbol}", response_model=dict)
-async def ingest_daily(symbol: str):
+async def ingest_daily(
+    symbol: str,
+    request: Request,
+    response: Response,
+    incremental: bool = True,
+    service: IngestionService = Depends(get_ingestion_service),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
     logger.info(f"Received daily prices ingestion request for symbol: {symbol}")
     try:
-        count = await service.ingest_daily_prices(symbol)
-        logger.info(f"Successfully completed daily prices ingestion for {symbol} - inserted {count} records")
-        return {"inserted": count}
+        async with profiler.profile(request, response, "daily_prices", symbol):
+            result = await service.ingest_daily_prices(symbol, incremental=incremental)
+        logger.info(f"Successfully completed daily prices ingestion for {symbol} - inserted {result.inserted}, updated {result.updated} records")
+        return {"inserted": result.inserted, "updated": result.updated}
+    except CacheMissError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (QuotaExhaustedError, AlphavantageThrottleError) as exc:
+        logger.warning(f"Rate limited while ingesting daily prices for {symbol}: {str(exc)}")
+        raise HTTPException(status_code=429, detail=str(exc))
     except Exception as exc:
         logger.error(f"Failed to ingest daily prices for {symbol}: {str(exc)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc))
 
 @router.post("/ingest/income/{symbol}", response_model=dict)
-async def ingest_income_statement(symbol: str):
+async def ingest_income_statement(
+    symbol: str,
+    request: Request,
+    response: Response,
+    service: IngestionService = Depends(get_ingestion_service),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
     logger.info(f"Received income statement ingestion request for symbol: {symbol}")
     try:
-        count = await service.ingest_income_statement(symbol)
-        logger.info(f"Successfully completed income statement ingestion for {symbol} - returned {count} records")
-        return {"inserted": count}
+        async with profiler.profile(request, response, "income_statement", symbol):
+            result = await service.ingest_income_statement(symbol)
+        logger.info(f"Successfully completed income statement ingestion for {symbol} - inserted {result.inserted}, updated {result.updated}, unchanged {result.unchanged} records")
+        return {"inserted": result.inserted, "updated": result.updated, "unchanged": result.unchanged}
+    except CacheMissError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (QuotaExhaustedError, AlphavantageThrottleError) as exc:
+        logger.warning(f"Rate limited while ingesting income statement for {symbol}: {str(exc)}")
+        raise HTTPException(status_code=429, detail=str(exc))
     except Exception as exc:
         logger.error(f"Failed to ingest income statement for {symbol}: {str(exc)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc))
+
+@router.post("/ingest/all/{symbol}", response_model=dict)
+async def ingest_all(
+    symbol: str,
+    request: Request,
+    response: Response,
+    incremental: bool = True,
+    service: IngestionService = Depends(get_ingestion_service),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
+    logger.info(f"Received all-dataset ingestion request for symbol: {symbol}")
+    try:
+        async with profiler.profile(request, response, "all", symbol):
+            results = await service.ingest_symbol(symbol, incremental=incremental)
+        logger.info(f"Successfully completed all-dataset ingestion for {symbol}")
+        return {
+            dataset.value: {"inserted": result.inserted, "updated": result.updated, "unchanged": result.unchanged}
+            for dataset, result in results.items()
+        }
+    except CacheMissError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except (QuotaExhaustedError, AlphavantageThrottleError) as exc:
+        logger.warning(f"Rate limited while ingesting all datasets for {symbol}: {str(exc)}")
+        raise HTTPException(status_code=429, detail=str(exc))
+    except Exception as exc:
+        logger.error(f"Failed to ingest all datasets for {symbol}: {str(exc)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(exc))
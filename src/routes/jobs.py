@@ -0,0 +1,52 @@
+import csv
+import io
+from typing import List
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from ..schemas.jobs import BatchIngestRequest, Dataset, JobAccepted, JobOut
+from ..services.jobs import JobManager
+from ..dependencies import get_job_manager
+from ..logging_config import get_logger
+
+logger = get_logger("routes.jobs")
+router = APIRouter()
+
+
+async def _accepted(manager: JobManager, symbols: List[str], datasets: List[Dataset]) -> JobAccepted:
+    if not manager.normalize_symbols(symbols):
+        raise HTTPException(status_code=422, detail="No symbols to ingest")
+    return await manager.submit(symbols, datasets)
+
+
+@router.post("/ingest/batch", response_model=JobAccepted, status_code=202)
+async def ingest_batch(request: BatchIngestRequest, manager: JobManager = Depends(get_job_manager)):
+    logger.info(f"Received batch ingestion request for {len(request.symbols)} symbols")
+    return await _accepted(manager, request.symbols, request.datasets)
+
+
+@router.post("/ingest/batch/csv", response_model=JobAccepted, status_code=202)
+async def ingest_batch_csv(
+    file: UploadFile = File(..., description="CSV with a 'symbol' column, like symbols.csv"),
+    datasets: List[Dataset] = Query(default=list(Dataset)),
+    manager: JobManager = Depends(get_job_manager),
+):
+    content = (await file.read()).decode("utf-8-sig")
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames or "symbol" not in reader.fieldnames:
+        raise HTTPException(status_code=422, detail="CSV must have a 'symbol' column")
+    symbols = [row["symbol"] or "" for row in reader]
+    logger.info(f"Received batch ingestion CSV '{file.filename}' with {len(symbols)} rows")
+    return await _accepted(manager, symbols, datasets)
+
+
+@router.get("/jobs", response_model=List[JobOut])
+async def list_jobs(manager: JobManager = Depends(get_job_manager)):
+    return await manager.list_jobs()
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    job = await manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
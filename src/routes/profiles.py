@@ -0,0 +1,41 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from ..schemas.profiles import ProfileDetail, ProfileInfo
+from ..services.profiling import RequestProfiler
+from ..dependencies import get_profiler
+from ..logging_config import get_logger
+
+logger = get_logger("routes.profiles")
+router = APIRouter()
+
+
+@router.get("/profiles", response_model=List[ProfileInfo])
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=1000),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
+    return await asyncio.to_thread(profiler.store.recent, limit)
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail)
+async def get_profile(
+    profile_id: str,
+    top: int = Query(30, ge=1, le=500, description="functions to return, by cumulative samples"),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
+    try:
+        return await asyncio.to_thread(profiler.store.get, profile_id, top)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_stacks(profile_id: str, profiler: RequestProfiler = Depends(get_profiler)):
+    """Sampled stacks in folded format, for flamegraph.pl or speedscope."""
+    try:
+        return PlainTextResponse(await asyncio.to_thread(profiler.store.folded, profile_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 from typing import Optional
 
@@ -11,7 +11,6 @@ class BalanceSheetIn(BaseModel):
     total_shareholder_equity: Optional[float]
 
 class BalanceSheetOut(BalanceSheetIn):
-    id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    id: int
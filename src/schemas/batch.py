@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Stand-in for a key missing from a parsed record; fails every field type
+_MISSING = object()
+
+
+@dataclass
+class ColumnBatch:
+    """
+    Validated records stored column by column.
+
+    ``columns`` maps model field names to equally long lists of validated
+    values. ``rejected`` lists ``(index, reason)`` for input records that
+    failed validation, indexed against the original parsed list.
+    """
+
+    columns: Dict[str, List[Any]]
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Materialize ``[start:stop]`` as row dictionaries."""
+        names = list(self.columns)
+        sliced = [self.columns[name][start:stop] for name in names]
+        return [dict(zip(names, values)) for values in zip(*sliced)]
+
+
+class BatchValidator:
+    """
+    Validates a whole parsed payload against a Pydantic model's field types,
+    one column at a time.
+
+    Each field gets a list-level ``TypeAdapter``, so pydantic-core checks the
+    entire column in a single call instead of building one model per row.
+    Field-level coercion and aliases match the model; model validators are
+    not run, and the ingestion schemas do not define any.
+    """
+
+    def __init__(self, model_cls: Type[BaseModel]) -> None:
+        self.model_cls = model_cls
+        self._fields = [
+            (name, info.alias or name, TypeAdapter(List[info.annotation]))
+            for name, info in model_cls.model_fields.items()
+        ]
+
+    def validate(self, parsed: List[Dict[str, Any]]) -> ColumnBatch:
+        return self.validate_columns(
+            {key: [item.get(key, _MISSING) for item in parsed] for _, key, _ in self._fields}
+        )
+
+    def validate_columns(self, parsed: Dict[str, List[Any]]) -> ColumnBatch:
+        """
+        Validate records given column by column, keyed like the record
+        dicts :meth:`validate` takes. All columns must be equally long; a
+        missing column fails every record.
+        """
+        n = len(next(iter(parsed.values()), ()))
+        columns: Dict[str, List[Any]] = {}
+        bad: Dict[int, str] = {}
+
+        for name, key, adapter in self._fields:
+            raw = parsed.get(key)
+            if raw is None:
+                raw = [_MISSING] * n
+            try:
+                columns[name] = adapter.validate_python(raw)
+            except ValidationError as exc:
+                errors = {}
+                for err in exc.errors():
+                    errors.setdefault(err["loc"][0], f"{name}: {err['msg']}")
+                for idx, reason in errors.items():
+                    bad.setdefault(idx, reason)
+                keep = [i for i in range(n) if i not in errors]
+                values = adapter.validate_python([raw[i] for i in keep])
+                column: List[Any] = [None] * n
+                for i, value in zip(keep, values):
+                    column[i] = value
+                columns[name] = column
+
+        if bad:
+            keep = [i for i in range(n) if i not in bad]
+            columns = {name: [col[i] for i in keep] for name, col in columns.items()}
+
+        return ColumnBatch(columns=columns, rejected=sorted(bad.items()))
+
+
+@lru_cache(maxsize=None)
+def get_batch_validator(model_cls: Type[BaseModel]) -> BatchValidator:
+    return BatchValidator(model_cls)
@@ -0,0 +1,10 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .jobs import Dataset
+
+
+class ReplayRequest(BaseModel):
+    datasets: Optional[List[Dataset]] = None
+    symbols: Optional[List[str]] = None
@@ -1,6 +1,6 @@
 from typing import Optional
 from datetime import date
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class IncomeStatementIn(BaseModel):
@@ -17,7 +17,6 @@ class IncomeStatementIn(BaseModel):
 
 
 class IncomeStatementOut(IncomeStatementIn):
-    id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    id: int
@@ -0,0 +1,61 @@
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class Dataset(str, Enum):
+    BALANCE_SHEET = "balance_sheet"
+    DAILY_PRICES = "daily_prices"
+    INCOME_STATEMENT = "income_statement"
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BatchIngestRequest(BaseModel):
+    symbols: List[str] = Field(min_length=1)
+    datasets: List[Dataset] = Field(default_factory=lambda: list(Dataset))
+
+
+class DatasetProgress(BaseModel):
+    status: JobStatus = JobStatus.PENDING
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    error: Optional[str] = None
+    seconds: Optional[float] = None
+    # Failed attempts so far, and when a pending retry is due
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+
+
+class JobOut(BaseModel):
+    id: str
+    status: JobStatus
+    datasets: List[Dataset]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    total_items: int
+    completed_items: int
+    failed_items: int
+    inserted: int
+    updated: int
+    unchanged: int
+    rows_per_second: float
+    items_per_second: float
+
+    progress: Dict[str, Dict[Dataset, DatasetProgress]]
+
+
+class JobAccepted(BaseModel):
+    id: str
+    status: JobStatus
+    total_items: int
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime   import date
+from typing     import Optional
 
 class DailyPriceIn(BaseModel):
     symbol: str
@@ -11,6 +12,8 @@ class DailyPriceIn(BaseModel):
     volume:      int
 
 class DailyPriceOut(DailyPriceIn):
-    id: int
-    class Config:
-        orm_mode = True
+    # Rows come from the table, which names the column trade_date, not date
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    # Only the numeric storage layout has a surrogate id
+    id: Optional[int] = None
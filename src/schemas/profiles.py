@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ProfileInfo(BaseModel):
+    id: str
+    endpoint: str
+    symbol: str
+    started_at: datetime
+    seconds: float
+    outcome: str
+    samples: int
+    interval_seconds: float
+    trigger: str
+    error: Optional[str] = None
+
+
+class ProfileFunction(BaseModel):
+    function: str
+    self_samples: int
+    cumulative_samples: int
+    self_seconds: float
+    cumulative_seconds: float
+    cumulative_percent: float
+
+
+class ProfileDetail(ProfileInfo):
+    functions: List[ProfileFunction]
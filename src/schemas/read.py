@@ -0,0 +1,22 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .balance_sheet import BalanceSheetOut
+from .income_statement import IncomeStatementOut
+from .price import DailyPriceOut
+
+
+class DailyPricePage(BaseModel):
+    items: List[DailyPriceOut]
+    next_cursor: Optional[str] = None
+
+
+class BalanceSheetPage(BaseModel):
+    items: List[BalanceSheetOut]
+    next_cursor: Optional[str] = None
+
+
+class IncomeStatementPage(BaseModel):
+    items: List[IncomeStatementOut]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,177 @@
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Date, DateTime, Integer, Numeric, func, select
+from sqlalchemy.orm import Session
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for exports
+    pa = pq = None
+
+from ..database import SessionLocal
+from ..models.balance_sheet import BalanceSheet
+from ..models.daily_price import DailyPrice, ScaledPrice
+from ..models.income_statement import IncomeStatement
+from ..repositories.data_repository import BalanceSheetRepository, DailyPriceRepository
+from ..repositories.export_repository import ExportPartitionRepository
+from ..repositories.income_repository import IncomeStatementRepository
+from ..schemas.jobs import Dataset
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("services.export")
+
+# Exported table and its partitioning date column for each dataset
+EXPORT_TABLES = {
+    Dataset.BALANCE_SHEET: (BalanceSheet, BalanceSheetRepository.DATE_COLUMN),
+    Dataset.DAILY_PRICES: (DailyPrice, DailyPriceRepository.DATE_COLUMN),
+    Dataset.INCOME_STATEMENT: (IncomeStatement, IncomeStatementRepository.DATE_COLUMN),
+}
+
+WATERMARK_FILE = "_watermarks.json"
+
+
+def _arrow_type(column: Any) -> Any:
+    if isinstance(column.type, ScaledPrice):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, Numeric):
+        return pa.float64()
+    return pa.string()
+
+
+class ParquetExporter:
+    """
+    Incremental Parquet snapshot of the stored datasets.
+
+    Files are laid out Hive-style as
+    ``<root>/<table>/symbol=<SYMBOL>/year=<YYYY>/data.parquet``, so readers
+    such as ``pyarrow.dataset`` or DuckDB prune partitions from the path.
+    Ingestion marks the ``(symbol, year)`` partitions it writes in
+    ``export_partitions``; a run rewrites only partitions marked after the
+    dataset's watermark, then advances it. A dataset without a watermark
+    (a new export directory, or ``full=True``) is exported completely.
+    """
+
+    def __init__(self, root: str, overlap_seconds: Optional[float] = None) -> None:
+        if pa is None:
+            raise RuntimeError("Parquet export requires the optional 'pyarrow' package")
+        self.root = Path(root)
+        # Re-export partitions marked shortly before the watermark, so a
+        # transaction that committed after the previous run started is not lost
+        self.overlap = timedelta(
+            seconds=settings.EXPORT_WATERMARK_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        )
+
+    # ───────────────────────────── watermarks ─────────────────────────────
+    def _read_watermarks(self) -> Dict[str, datetime]:
+        try:
+            stored = json.loads((self.root / WATERMARK_FILE).read_text())
+        except FileNotFoundError:
+            return {}
+        return {dataset: datetime.fromisoformat(value) for dataset, value in stored.items()}
+
+    def _write_watermarks(self, watermarks: Dict[str, datetime]) -> None:
+        body = json.dumps({dataset: value.isoformat() for dataset, value in watermarks.items()}, indent=2)
+        self._write_atomic(self.root / WATERMARK_FILE, lambda path: Path(path).write_text(body))
+
+    @staticmethod
+    def _write_atomic(path: Path, write: Any) -> None:
+        # Write then rename so readers never see a partial file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    # ───────────────────────────── partitions ─────────────────────────────
+    def partition_path(self, dataset: Dataset, symbol: str, year: int) -> Path:
+        table = EXPORT_TABLES[dataset][0].__tablename__
+        return self.root / table / f"symbol={symbol}" / f"year={year}" / "data.parquet"
+
+    def _partitions(self, db: Session, dataset: Dataset, watermark: Optional[datetime]) -> List[Tuple[str, int]]:
+        if watermark is not None:
+            changed = ExportPartitionRepository(db).changed_since(dataset.value, watermark - self.overlap)
+            return sorted(set(changed))
+
+        model, date_column = EXPORT_TABLES[dataset]
+        year = func.extract("year", model.__table__.c[date_column])
+        rows = db.execute(select(model.__table__.c.symbol, year).distinct()).all()
+        partitions: Set[Tuple[str, int]] = {(symbol, int(y)) for symbol, y in rows}
+        # Marked partitions whose rows are all gone still need their file removed
+        partitions.update(ExportPartitionRepository(db).changed_since(dataset.value, None))
+        return sorted(partitions)
+
+    def _write_partition(self, db: Session, dataset: Dataset, symbol: str, year: int) -> int:
+        model, date_column = EXPORT_TABLES[dataset]
+        table = model.__table__
+        date_col = table.c[date_column]
+        rows = db.execute(
+            select(table)
+            .where(table.c.symbol == symbol, date_col >= date(year, 1, 1), date_col < date(year + 1, 1, 1))
+            .order_by(date_col)
+        ).all()
+
+        path = self.partition_path(dataset, symbol, year)
+        if not rows:
+            path.unlink(missing_ok=True)
+            return 0
+
+        arrays = []
+        for index, column in enumerate(table.c):
+            values = [row[index] for row in rows]
+            if isinstance(column.type, Numeric):
+                values = [float(v) if isinstance(v, Decimal) else v for v in values]
+            arrays.append(pa.array(values, type=_arrow_type(column)))
+        arrow_table = pa.Table.from_arrays(arrays, names=[c.name for c in table.c])
+
+        self._write_atomic(
+            path,
+            lambda tmp: pq.write_table(arrow_table, tmp, compression=settings.EXPORT_COMPRESSION),
+        )
+        return len(rows)
+
+    # ─────────────────────────────── export ───────────────────────────────
+    def export(self, datasets: Optional[List[Dataset]] = None, full: bool = False) -> Dict[Dataset, Dict[str, int]]:
+        """
+        Rewrite the partitions changed since each dataset's watermark and
+        return per-dataset ``partitions`` and ``rows`` counts. The watermark
+        only advances once every partition of the dataset was written.
+        """
+        wanted = list(dict.fromkeys(datasets)) if datasets else list(Dataset)
+        watermarks = self._read_watermarks()
+        summary: Dict[Dataset, Dict[str, int]] = {}
+
+        for dataset in wanted:
+            started = datetime.utcnow()
+            watermark = None if full else watermarks.get(dataset.value)
+            counts = summary[dataset] = {"partitions": 0, "rows": 0}
+            with SessionLocal() as db:
+                partitions = self._partitions(db, dataset, watermark)
+                for symbol, year in partitions:
+                    counts["rows"] += self._write_partition(db, dataset, symbol, year)
+                    counts["partitions"] += 1
+
+            watermarks[dataset.value] = started
+            self._write_watermarks(watermarks)
+            logger.info(
+                f"Exported {counts['partitions']} {dataset.value} partitions ({counts['rows']} rows) "
+                f"to {self.root} ({'full' if watermark is None else f'since {watermark.isoformat()}'})"
+            )
+        return summary
@@ -0,0 +1,336 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from ..connectors.base import AlphavantageAPIError
+from ..connectors.cache import CacheMissError
+from ..connectors.rate_limiter import QuotaExhaustedError
+from ..database import SessionLocal, run_in_db_thread
+from ..models.job import Job, JobItem
+from ..repositories.job_repository import ClaimedItem, JobRepository
+from ..schemas.jobs import Dataset, DatasetProgress, JobAccepted, JobOut, JobStatus
+from ..services.export import ParquetExporter
+from ..services.ingestion import IngestionService, PendingWrite, Writer
+from ..services.pipeline import WritePipeline
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("services.jobs")
+
+# Failures that no retry can fix; their items are dead-lettered at once
+PERMANENT_ERRORS = (CacheMissError, AlphavantageAPIError)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for an item that has failed ``attempts`` times."""
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def job_out(job: Job, items: List[JobItem]) -> JobOut:
+    progress: Dict[str, Dict[Dataset, DatasetProgress]] = {}
+    for item in items:
+        status = JobStatus(item.status)
+        progress.setdefault(item.symbol, {})[Dataset(item.dataset)] = DatasetProgress(
+            status=status,
+            inserted=item.inserted,
+            updated=item.updated,
+            unchanged=item.unchanged,
+            error=item.error,
+            seconds=round(item.seconds, 3) if item.seconds is not None else None,
+            attempts=item.attempts,
+            next_attempt_at=item.next_attempt_at if status == JobStatus.PENDING and item.attempts else None,
+        )
+
+    inserted = sum(i.inserted for i in items)
+    updated = sum(i.updated for i in items)
+    completed = sum(1 for i in items if i.status == JobStatus.COMPLETED.value)
+    failed = sum(1 for i in items if i.status == JobStatus.FAILED.value)
+
+    elapsed = 0.0
+    if job.started_at is not None:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+
+    return JobOut(
+        id=job.id,
+        status=JobStatus(job.status),
+        datasets=[Dataset(d) for d in job.datasets.split(",")],
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        total_items=len(items),
+        completed_items=completed,
+        failed_items=failed,
+        inserted=inserted,
+        updated=updated,
+        unchanged=sum(i.unchanged for i in items),
+        rows_per_second=round((inserted + updated) / elapsed, 2) if elapsed else 0.0,
+        items_per_second=round((completed + failed) / elapsed, 4) if elapsed else 0.0,
+        progress=progress,
+    )
+
+
+class JobManager:
+    """
+    Runs batch ingestion jobs from a queue stored in the service database.
+
+    Each job is split into (symbol, dataset) items. ``BATCH_MAX_CONCURRENCY``
+    workers claim due items one at a time; the shared rate limiter keeps the
+    fan-out within the Alphavantage quota. A failed item is retried with
+    exponential backoff and dead-lettered (status ``failed``) after
+    ``JOB_MAX_ATTEMPTS`` attempts, or at once when retrying cannot help
+    (see PERMANENT_ERRORS). Items that hit the daily quota wait for its UTC
+    reset without spending an attempt. Items left running by a crash or restart
+    go back to the queue on startup, so jobs resume where they stopped.
+
+    With a WritePipeline the workers only fetch, parse and validate; the
+    pipeline's single writer commits their rows in batched transactions.
+    An item then gives up its fetch slot as soon as its rows are queued,
+    so the next fetch starts while the writer is still buffering them.
+    """
+
+    def __init__(
+        self,
+        service: IngestionService,
+        exporter: Optional[ParquetExporter] = None,
+        pipeline: Optional[WritePipeline] = None,
+    ) -> None:
+        self.service = service
+        # Incremental Parquet export run after each batch job that wrote rows
+        self.exporter = exporter
+        # Pipeline mode: workers hand their rows to a single batched writer
+        self.pipeline = pipeline
+        self._workers: List[asyncio.Task] = []
+        # Pipeline mode: running items, and those of them still fetching
+        self._items: Set[asyncio.Task] = set()
+        self._fetching: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._export_task: Optional[asyncio.Task] = None
+        self._export_pending = False
+
+    @staticmethod
+    def normalize_symbols(symbols: List[str]) -> List[str]:
+        seen: Dict[str, None] = {}
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            if symbol:
+                seen.setdefault(symbol, None)
+        return list(seen)
+
+    @staticmethod
+    def _with_repository(fn, *args):
+        with SessionLocal() as db:
+            return fn(JobRepository(db), *args)
+
+    async def start(self) -> None:
+        """Requeue items interrupted by the last shutdown and start the workers."""
+        resumed = await run_in_db_thread(self._with_repository, JobRepository.requeue_running)
+        if resumed:
+            logger.info(f"Resuming {resumed} job items interrupted by the previous run")
+        if self.pipeline is not None:
+            self.pipeline.start()
+            self._workers = [asyncio.create_task(self._dispatch(), name="ingestion-dispatcher")]
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{n}")
+            for n in range(settings.BATCH_MAX_CONCURRENCY)
+        ]
+
+    async def submit(self, symbols: List[str], datasets: List[Dataset]) -> JobAccepted:
+        symbols = self.normalize_symbols(symbols)
+        datasets = list(dict.fromkeys(datasets))
+        job_id = uuid.uuid4().hex
+        await run_in_db_thread(
+            self._with_repository, JobRepository.create, job_id, symbols, [d.value for d in datasets]
+        )
+        await run_in_db_thread(self._with_repository, JobRepository.prune, settings.JOB_HISTORY_LIMIT)
+        self._wake.set()
+        logger.info(f"Submitted job {job_id}: {len(symbols)} symbols x {len(datasets)} datasets")
+        return JobAccepted(id=job_id, status=JobStatus.PENDING, total_items=len(symbols) * len(datasets))
+
+    @staticmethod
+    def _load(job_id: str) -> Optional[JobOut]:
+        with SessionLocal() as db:
+            found = JobRepository(db).get(job_id)
+            return job_out(*found) if found else None
+
+    @staticmethod
+    def _load_recent() -> List[JobOut]:
+        with SessionLocal() as db:
+            return [job_out(job, items) for job, items in JobRepository(db).recent(settings.JOB_HISTORY_LIMIT)]
+
+    async def get(self, job_id: str) -> Optional[JobOut]:
+        return await run_in_db_thread(self._load, job_id)
+
+    async def list_jobs(self) -> List[JobOut]:
+        return await run_in_db_thread(self._load_recent)
+
+    async def shutdown(self) -> None:
+        """
+        Stop the workers; their in-flight items are released for the next
+        start, and their ingests have ended when this returns. In pipeline
+        mode rows already queued are committed first and their items
+        recorded.
+        """
+        await self._cancel([*self._workers, *self._fetching])
+        self._workers = []
+        # The ingests of the items just cancelled may still be unwinding, and
+        # would otherwise write through a stopped pipeline
+        await self.service.cancel_ingests(abandoned_only=True)
+        if self.pipeline is not None:
+            await self.pipeline.stop()
+            if self._items:
+                await asyncio.gather(*self._items, return_exceptions=True)
+        # Any other run left, e.g. one an API request joined, must not outlive the database threads
+        await self.service.cancel_ingests()
+        # Last, as finishing items may have scheduled one
+        await self._cancel([self._export_task] if self._export_task is not None else [])
+
+    @staticmethod
+    async def _cancel(tasks: List[asyncio.Task]) -> None:
+        tasks = [task for task in tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _claim(self) -> Optional[ClaimedItem]:
+        try:
+            return await run_in_db_thread(self._with_repository, JobRepository.claim, datetime.utcnow())
+        except Exception as exc:
+            logger.error(f"Failed to claim a job item: {exc}", exc_info=True)
+            return None
+
+    async def _idle(self) -> None:
+        # Woken early by submit(); otherwise poll for retries coming due
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), settings.JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, item: ClaimedItem, write: Optional[Writer] = None) -> None:
+        try:
+            await self._run_item(item, write)
+        except Exception as exc:
+            # The item stays running until the next start requeues it
+            logger.error(f"Failed to record the outcome of job item {item.id}: {exc}", exc_info=True)
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._claim()
+            if item is None:
+                await self._idle()
+                continue
+            await self._process(item)
+
+    async def _dispatch(self) -> None:
+        """Pipeline mode: start a due item whenever one of the fetch slots is free."""
+        slots = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+        while True:
+            await slots.acquire()
+            item = await self._claim()
+            if item is None:
+                slots.release()
+                await self._idle()
+                continue
+            self._start_item(item, slots)
+
+    def _start_item(self, item: ClaimedItem, slots: asyncio.Semaphore) -> None:
+        def free(*_) -> None:
+            if task in self._fetching:
+                self._fetching.discard(task)
+                slots.release()
+
+        async def write(pending: PendingWrite) -> "asyncio.Future":
+            # Queued (after any backpressure wait): the fetch slot is no longer needed
+            future = await self.pipeline.write(pending)
+            free()
+            return future
+
+        task = asyncio.create_task(self._process(item, write), name=f"job-item-{item.id}")
+        self._fetching.add(task)
+        self._items.add(task)
+        task.add_done_callback(free)
+        task.add_done_callback(self._items.discard)
+
+    def _schedule_export(self) -> None:
+        """Start an export, or queue one behind the export already running."""
+        if self._export_task is not None and not self._export_task.done():
+            self._export_pending = True
+            return
+        self._export_task = asyncio.create_task(self._export(), name="parquet-export")
+
+    async def _export(self) -> None:
+        while True:
+            self._export_pending = False
+            try:
+                await asyncio.to_thread(self.exporter.export)
+            except Exception as exc:
+                logger.error(f"Parquet export after batch job failed: {exc}", exc_info=True)
+            if not self._export_pending:
+                return
+
+    async def _run_item(self, item: ClaimedItem, write: Optional[Writer] = None) -> None:
+        dataset = Dataset(item.dataset)
+        started = time.monotonic()
+        try:
+            result = await self.service.ingest(dataset, item.symbol, write=write)
+        except asyncio.CancelledError:
+            await asyncio.shield(run_in_db_thread(self._with_repository, JobRepository.release, item.id))
+            raise
+        except QuotaExhaustedError as exc:
+            # Not the item's fault: wait for the daily reset without spending an attempt
+            logger.warning(
+                f"Job {item.job_id}: {dataset.value} ingestion for {item.symbol} "
+                f"postponed until {exc.resets_at.isoformat()} UTC: {exc}"
+            )
+            await run_in_db_thread(
+                self._with_repository, JobRepository.postpone, item.id, str(exc), exc.resets_at
+            )
+            return
+        except Exception as exc:
+            attempts = item.attempts + 1
+            seconds = time.monotonic() - started
+            if isinstance(exc, PERMANENT_ERRORS) or attempts >= settings.JOB_MAX_ATTEMPTS:
+                retry_at = None
+                logger.warning(
+                    f"Job {item.job_id}: {dataset.value} ingestion failed for {item.symbol} "
+                    f"after {attempts} attempts, dead-lettered: {exc}"
+                )
+            else:
+                delay = retry_delay(attempts)
+                retry_at = datetime.utcnow() + timedelta(seconds=delay)
+                logger.warning(
+                    f"Job {item.job_id}: {dataset.value} ingestion failed for {item.symbol} "
+                    f"(attempt {attempts}/{settings.JOB_MAX_ATTEMPTS}), retrying in {delay:.0f}s: {exc}"
+                )
+            await run_in_db_thread(
+                self._with_repository, JobRepository.fail, item.id, str(exc), seconds, retry_at
+            )
+        else:
+            await run_in_db_thread(
+                self._with_repository,
+                JobRepository.complete,
+                item.id,
+                result.inserted,
+                result.updated,
+                result.unchanged,
+                time.monotonic() - started,
+            )
+
+        finished = await run_in_db_thread(
+            self._with_repository, JobRepository.finish_if_done, item.job_id, datetime.utcnow()
+        )
+        if finished is not None:
+            status, written = finished
+            summary = await self.get(item.job_id)
+            logger.info(
+                f"Job {item.job_id} {status.value}: {summary.completed_items} completed, "
+                f"{summary.failed_items} failed, {summary.rows_per_second} rows/s"
+            )
+            if self.exporter is not None and written:
+                self._schedule_export()
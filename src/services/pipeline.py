@@ -0,0 +1,132 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from ..database import run_in_db_thread
+from ..metrics import PIPELINE_FLUSH_ROWS, PIPELINE_FLUSHES, PIPELINE_QUEUE_DEPTH
+from ..repositories.bulk import UpsertResult
+from ..settings import settings
+from .ingestion import IngestionService, PendingWrite
+from ..logging_config import get_logger
+
+logger = get_logger("services.pipeline")
+
+_Entry = Tuple[PendingWrite, "asyncio.Future[UpsertResult]"]
+
+# Queued by stop() to make the writer flush and exit
+_STOP = object()
+
+
+class WritePipeline:
+    """
+    Single writer stage for pipeline mode.
+
+    Fetch workers pass validated payloads to :meth:`write`, which queues
+    them and returns a future for their UpsertResult. The queue holds at
+    most ``PIPELINE_QUEUE_SIZE`` payloads, so fast fetchers wait for the
+    writer instead of piling rows up in memory. One writer task commits
+    payloads of any symbol and dataset together, one transaction per flush:
+    once ``PIPELINE_FLUSH_ROWS`` rows are buffered, or
+    ``PIPELINE_FLUSH_SECONDS`` after the oldest buffered payload arrived.
+
+    If a grouped transaction fails, its payloads are retried one per
+    transaction, so only the payload at fault reports the error.
+    """
+
+    def __init__(
+        self,
+        service: IngestionService,
+        queue_size: Optional[int] = None,
+        flush_rows: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self.service = service
+        self.queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+        self.flush_rows = flush_rows or settings.PIPELINE_FLUSH_ROWS
+        self.flush_seconds = settings.PIPELINE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run(), name="pipeline-writer")
+        logger.info(
+            f"Pipeline writer started (queue {self.queue_size}, flush at {self.flush_rows} rows "
+            f"or {self.flush_seconds}s)"
+        )
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def write(self, pending: PendingWrite) -> "asyncio.Future[UpsertResult]":
+        if self._task is None or self._task.done():
+            raise RuntimeError("The pipeline writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((pending, future))
+        PIPELINE_QUEUE_DEPTH.set(self._queue.qsize())
+        return future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        buffer: List[_Entry] = []
+        rows = 0
+        deadline = 0.0
+        while True:
+            try:
+                if buffer:
+                    entry = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+                else:
+                    entry = await self._queue.get()
+            except asyncio.TimeoutError:
+                await self._flush(buffer, rows, "time")
+                buffer, rows = [], 0
+                continue
+            PIPELINE_QUEUE_DEPTH.set(self._queue.qsize())
+
+            if entry is _STOP:
+                if buffer:
+                    await self._flush(buffer, rows, "stop")
+                return
+            if not buffer:
+                deadline = loop.time() + self.flush_seconds
+            buffer.append(entry)
+            rows += len(entry[0].batch)
+            if rows >= self.flush_rows:
+                await self._flush(buffer, rows, "rows")
+                buffer, rows = [], 0
+
+    async def _flush(self, buffer: List[_Entry], rows: int, reason: str) -> None:
+        PIPELINE_FLUSHES.inc(reason=reason)
+        PIPELINE_FLUSH_ROWS.observe(rows)
+        pendings = [pending for pending, _ in buffer]
+        try:
+            results = await run_in_db_thread(self.service.commit_many, pendings)
+        except Exception as exc:
+            logger.warning(
+                f"Pipeline transaction of {len(buffer)} payloads ({rows} rows) failed, "
+                f"retrying them one by one: {exc}"
+            )
+            for entry in buffer:
+                await self._flush_one(entry)
+            return
+
+        for (_, future), result in zip(buffer, results):
+            if not future.done():
+                future.set_result(result)
+        logger.debug(f"Pipeline committed {len(buffer)} payloads ({rows} rows, trigger {reason})")
+
+    async def _flush_one(self, entry: _Entry) -> None:
+        pending, future = entry
+        try:
+            result = await run_in_db_thread(self.service.commit_many, [pending])
+        except Exception as exc:
+            logger.error(f"Pipeline write of {pending.dataset.value} rows for {pending.symbol} failed: {exc}")
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(result[0])
@@ -0,0 +1,264 @@
+import asyncio
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from ..schemas.profiles import ProfileDetail, ProfileFunction, ProfileInfo
+from ..settings import settings
+from ..logging_config import get_logger
+
+logger = get_logger("services.profiling")
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Worker threads are only sampled while they run code from this package
+_SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROFILE_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+
+def _short_path(filename: str) -> str:
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    if filename.startswith(os.path.dirname(_SRC_ROOT)):
+        return os.path.relpath(filename, os.path.dirname(_SRC_ROOT))
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread records the call stacks of the
+    event-loop thread, and of any other thread currently inside service
+    code (the database workers), every ``interval`` seconds.
+
+    Sampling keeps the overhead low and flat however much Python runs, and
+    unlike cProfile it sees the database threads too. Other requests
+    served during the same window appear in the samples as well.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        labels: Dict[object, str] = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                in_service = ident == self._loop_thread
+                while frame is not None:
+                    code = frame.f_code
+                    in_service = in_service or code.co_filename.startswith(_SRC_ROOT)
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                if not in_service:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                # Root first, as in the folded format flame graph tools read
+                root = "event-loop" if ident == self._loop_thread else names.get(ident, str(ident))
+                self.stacks[";".join([root, *reversed(stack)])] += 1
+
+
+def _common_prefix(stacks: List[List[str]]) -> int:
+    shortest = min(len(frames) for frames in stacks)
+    for depth in range(shortest):
+        if any(frames[depth] != stacks[0][depth] for frames in stacks):
+            return depth
+    return shortest
+
+
+def top_functions(stacks: Dict[str, int], interval: float, limit: int) -> List[ProfileFunction]:
+    """
+    Rank frames by the samples whose stack contains them (cumulative). The
+    frames all of a thread's stacks start with (thread and event-loop
+    bootstrap) are left out, as they would top every profile.
+    """
+    by_thread: Dict[str, List[Tuple[List[str], int]]] = {}
+    for stack, count in stacks.items():
+        root, *frames = stack.split(";")
+        by_thread.setdefault(root, []).append((frames, count))
+
+    own: Counter = Counter()
+    cumulative: Counter = Counter()
+    total = 0
+    for entries in by_thread.values():
+        # Keep at least the innermost frame of every stack
+        skip = min(_common_prefix([frames for frames, _ in entries]), min(len(f) for f, _ in entries) - 1)
+        for frames, count in entries:
+            total += count
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames[max(skip, 0):]):
+                cumulative[frame] += count
+    return [
+        ProfileFunction(
+            function=frame,
+            self_samples=own[frame],
+            cumulative_samples=count,
+            self_seconds=round(own[frame] * interval, 4),
+            cumulative_seconds=round(count * interval, 4),
+            cumulative_percent=round(100 * count / total, 2) if total else 0.0,
+        )
+        for frame, count in cumulative.most_common(limit)
+    ]
+
+
+class ProfileStore:
+    """
+    Profiles on disk: ``<id>.json`` holds the summary and ``<id>.folded``
+    the sampled stacks in the folded format that flamegraph.pl and
+    speedscope read. Only the ``keep`` most recent profiles are kept.
+    """
+
+    def __init__(self, directory: str, keep: int) -> None:
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def _path(self, profile_id: str, suffix: str) -> Path:
+        if not _PROFILE_ID.match(profile_id):
+            raise KeyError(profile_id)
+        return self.directory / f"{profile_id}{suffix}"
+
+    def save(self, info: ProfileInfo, stacks: Dict[str, int]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        folded = "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+        self._path(info.id, ".folded").write_text(folded)
+        # Summary last: a profile is listed only once both files exist
+        self._path(info.id, ".json").write_text(info.model_dump_json())
+        self.prune()
+
+    def prune(self) -> None:
+        summaries = sorted(self.directory.glob("*.json"))
+        for stale in summaries[: max(0, len(summaries) - self.keep)]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".folded").unlink(missing_ok=True)
+
+    def recent(self, limit: int) -> List[ProfileInfo]:
+        if not self.directory.exists():
+            return []
+        # Ids start with the UTC start time, so names sort chronologically
+        paths = sorted(self.directory.glob("*.json"), reverse=True)[:limit]
+        infos = []
+        for path in paths:
+            try:
+                infos.append(ProfileInfo.model_validate_json(path.read_text()))
+            except (OSError, ValueError):
+                continue  # pruned meanwhile, or not a profile
+        return infos
+
+    def folded(self, profile_id: str) -> str:
+        try:
+            return self._path(profile_id, ".folded").read_text()
+        except FileNotFoundError:
+            raise KeyError(profile_id) from None
+
+    def get(self, profile_id: str, limit: int) -> ProfileDetail:
+        try:
+            info = ProfileInfo.model_validate_json(self._path(profile_id, ".json").read_text())
+        except FileNotFoundError:
+            raise KeyError(profile_id) from None
+        stacks: Dict[str, int] = {}
+        for line in self.folded(profile_id).splitlines():
+            stack, _, count = line.rpartition(" ")
+            stacks[stack] = int(count)
+        return ProfileDetail(
+            **info.model_dump(), functions=top_functions(stacks, info.interval_seconds, limit)
+        )
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of ingest requests. A request is profiled when it sends
+    ``X-Profile: 1`` and PROFILE_HEADER_ENABLED is set, or when it is drawn
+    by PROFILE_SAMPLE_RATE. The profile id is returned in ``X-Profile-Id``.
+    """
+
+    def __init__(self, store: Optional[ProfileStore] = None) -> None:
+        self.store = store or ProfileStore(settings.PROFILE_DIR, settings.PROFILE_KEEP)
+
+    @staticmethod
+    def _trigger(request: Request) -> Optional[str]:
+        if settings.PROFILE_HEADER_ENABLED and request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+            return "header"
+        if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    @asynccontextmanager
+    async def profile(
+        self, request: Request, response: Response, endpoint: str, symbol: str
+    ) -> AsyncIterator[None]:
+        trigger = self._trigger(request)
+        if trigger is None:
+            yield
+            return
+
+        started_at = datetime.utcnow()
+        profile_id = f"{started_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        outcome, error = "success", None
+        try:
+            yield
+        except BaseException as exc:
+            outcome, error = "error", str(exc) or type(exc).__name__
+            raise
+        finally:
+            # Joining the sampler waits out its current interval
+            await asyncio.shield(asyncio.to_thread(sampler.stop))
+            info = ProfileInfo(
+                id=profile_id,
+                endpoint=endpoint,
+                symbol=symbol,
+                started_at=started_at,
+                seconds=round(time.perf_counter() - started, 4),
+                outcome=outcome,
+                samples=sampler.samples,
+                interval_seconds=sampler.interval,
+                trigger=trigger,
+                error=error,
+            )
+            try:
+                await asyncio.shield(asyncio.to_thread(self.store.save, info, dict(sampler.stacks)))
+                response.headers[PROFILE_ID_HEADER] = profile_id
+                logger.info(f"Saved profile {profile_id} of {endpoint} for {symbol} ({info.seconds:.3f}s)")
+            except Exception as exc:
+                logger.error(f"Failed to save profile {profile_id}: {exc}")
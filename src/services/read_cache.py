@@ -0,0 +1,65 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional, Tuple
+
+from ..logging_config import get_logger
+
+logger = get_logger("services.read_cache")
+
+CacheKey = Tuple[str, Optional[str], Hashable]
+
+
+class ReadCache:
+    """
+    In-process cache of rendered read-API responses with version-based ETags.
+
+    A response's ETag is derived from the version it depends on (the
+    symbol's last write when the query filters by symbol, otherwise the
+    dataset's) plus the query itself. Versions are write counters bumped in
+    the same transaction as the rows (see ExportPartitionRepository.version),
+    so writes by any process change them: the backfill CLI, other workers, or
+    this one. Cached bodies are only served under the ETag they were
+    rendered with; :meth:`invalidate` merely frees them early.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag(dataset: str, symbol: Optional[str], version: Optional[int], query: Hashable) -> str:
+        stamp = version if version is not None else "-"
+        digest = hashlib.sha1(f"{dataset}:{symbol}:{stamp}:{query!r}".encode())
+        return f'"{digest.hexdigest()}"'
+
+    def get(self, key: CacheKey, etag: str) -> Optional[bytes]:
+        """Return the cached body for ``key`` if it was rendered under ``etag``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: CacheKey, etag: str, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dataset: str, symbols: Iterable[str]) -> None:
+        """Drop cached responses made stale by this process writing to ``symbols`` in ``dataset``."""
+        touched = {s.upper() for s in symbols if s}
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == dataset and (key[1] is None or key[1] in touched)
+            ]
+            for key in stale:
+                del self._entries[key]
+        logger.debug(f"Invalidated {dataset} reads for {len(touched)} symbols ({len(stale)} cached responses)")
@@ -0,0 +1,131 @@
+import asyncio
+import copy
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Set, Tuple, TypeVar
+
+from ..logging_config import get_logger
+
+logger = get_logger("services.single_flight")
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of starting their own. A
+    successful result is also reused for ``reuse_seconds`` after it
+    completes. Failures are never reused: the next caller starts afresh.
+
+    The work is shielded from any single caller's cancellation and is only
+    cancelled once every caller waiting on it has gone. Shared results are
+    shallow copies, so one caller mutating its result cannot affect another.
+    A run may outlive its callers while it unwinds; :meth:`cancel` waits
+    for such runs before shutdown.
+    """
+
+    def __init__(self, reuse_seconds: float = 0.0) -> None:
+        self.reuse_seconds = reuse_seconds
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._recent: Dict[Hashable, Tuple[float, T]] = {}
+        # Every unfinished run, including abandoned ones no longer in _inflight
+        self._running: Set[_Flight] = set()
+
+    def _reused(self, key: Hashable) -> Optional[T]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        finished, result = entry
+        if time.monotonic() - finished >= self.reuse_seconds:
+            del self._recent[key]
+            return None
+        return result
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.reuse_seconds
+        for key in [k for k, (finished, _) in self._recent.items() if finished <= cutoff]:
+            del self._recent[key]
+
+    async def run(
+        self,
+        key: Hashable,
+        work: Callable[[], Awaitable[T]],
+        on_shared: Optional[Callable[[str], Any]] = None,
+    ) -> T:
+        """
+        Return ``work()``'s result for ``key``, running it at most once at a
+        time. ``on_shared`` is called with ``"joined"`` or ``"reused"`` when
+        the result comes from another caller's run.
+        """
+        result = self._reused(key)
+        if result is not None:
+            if on_shared is not None:
+                on_shared("reused")
+            return copy.copy(result)
+
+        flight = self._inflight.get(key)
+        shared = flight is not None
+        if shared:
+            if on_shared is not None:
+                on_shared("joined")
+        else:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(self._lead(key, work)))
+            self._running.add(flight)
+            # A done callback, not a finally: a task cancelled before its
+            # first step never runs its body
+            flight.task.add_done_callback(lambda _, flight=flight: self._finish(key, flight))
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                logger.debug(f"Every caller of {key!r} was cancelled, cancelling the shared run")
+                flight.task.cancel()
+                # Later callers must start afresh rather than join a dying run
+                self._forget(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+        return copy.copy(result) if shared else result
+
+    async def cancel(self, abandoned_only: bool = False) -> int:
+        """
+        Cancel unfinished runs and wait until they have ended; returns how
+        many there were. With ``abandoned_only``, only runs whose callers
+        have all gone are waited for: those are already cancelled but may
+        still be unwinding.
+        """
+        flights = [f for f in self._running if not (abandoned_only and f.waiters)]
+        for flight in flights:
+            # An abandoned run is left to finish its cleanup, not cancelled again
+            if flight.waiters:
+                flight.task.cancel()
+        if flights:
+            await asyncio.gather(*(f.task for f in flights), return_exceptions=True)
+        return len(flights)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        self._running.discard(flight)
+        self._forget(key, flight)
+
+    async def _lead(self, key: Hashable, work: Callable[[], Awaitable[T]]) -> T:
+        result = await work()
+        if self.reuse_seconds > 0:
+            self._prune()
+            self._recent[key] = (time.monotonic(), copy.copy(result))
+        return result
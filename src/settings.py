@@ -1,13 +1,148 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import logging
 
 # Create a basic logger for settings (before our main logging config is loaded)
 logger = logging.getLogger("settings")
 
+# The real Alphavantage endpoint, the default for ALPHAVANTAGE_BASE_URL
+ALPHAVANTAGE_URL = "https://www.alphavantage.co/query"
+
 class Settings(BaseSettings):
     ALPHAVANTAGE_API_KEY: str = "demo"
+    # Point at a stand-in server (see benchmarks/mock_alphavantage.py) to run
+    # offline; its responses are cached apart from Alphavantage's
+    ALPHAVANTAGE_BASE_URL: str = ALPHAVANTAGE_URL
     DATABASE_URL: str = "sqlite:///./data.db"
 
+    # Rows per INSERT ... ON CONFLICT statement in the bulk upsert
+    UPSERT_CHUNK_SIZE: int = 500
+    # Threads running blocking session work off the event loop
+    DB_WORKER_THREADS: int = 4
+
+    # Engine tuning. SQLite pragmas run on every new connection; the pool
+    # settings apply to server databases such as PostgreSQL.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # SQLAlchemy's compiled-statement cache entries per engine. This caches
+    # SQL strings only; the database still plans every statement.
+    DB_STATEMENT_CACHE_SIZE: int = 1000
+    # Server-side prepared statements, with the psycopg 3 driver
+    # (postgresql+psycopg://): a statement is prepared on a connection after
+    # this many executions there; 0 prepares at once, None disables them.
+    # psycopg2 cannot prepare statements server-side.
+    DB_PREPARE_THRESHOLD: Optional[int] = 5
+
+    # Shared Alphavantage HTTP client
+    HTTP_TIMEOUT_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = False  # requires the optional 'h2' package
+
+    # Process-wide Alphavantage quota (0 calls/day means no daily cap)
+    ALPHAVANTAGE_CALLS_PER_MINUTE: float = 20.0
+    ALPHAVANTAGE_CALLS_PER_DAY: int = 0
+    ALPHAVANTAGE_BURST: int = 5
+    ALPHAVANTAGE_MIN_CALLS_PER_MINUTE: float = 1.0
+    ALPHAVANTAGE_BACKOFF_FACTOR: float = 0.5
+    ALPHAVANTAGE_RECOVERY_STEP: float = 1.0
+    ALPHAVANTAGE_THROTTLE_RETRIES: int = 3
+
+    # Compressed raw-response cache. TTLs are in seconds; 0 stores responses
+    # for replay but never serves them. OFFLINE serves only from the cache.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_DIR: str = "./.response_cache"
+    RESPONSE_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    RESPONSE_CACHE_COMPRESSLEVEL: int = 6
+    CACHE_TTL_BALANCE_SHEET_SECONDS: float = 24 * 3600
+    CACHE_TTL_INCOME_STATEMENT_SECONDS: float = 24 * 3600
+    CACHE_TTL_DAILY_PRICES_SECONDS: float = 3600
+    ALPHAVANTAGE_OFFLINE: bool = False
+
+    # Stream outputsize=full daily series instead of buffering the whole body
+    DAILY_PRICE_STREAMING: bool = True
+    STREAM_CHUNK_BYTES: int = 64 * 1024
+    STREAM_BATCH_SIZE: int = 1000
+
+    # Storage layout of daily_prices: "numeric" (arbitrary-precision columns
+    # and a surrogate id), or the compact "scaled" (64-bit integers in 1e-4
+    # ticks) and "float" layouts keyed by (symbol, trade_date), WITHOUT ROWID
+    # on SQLite. Run migrate_prices.py after changing it.
+    DAILY_PRICE_STORAGE: Literal["numeric", "scaled", "float"] = "numeric"
+
+    # In-process index of what each table holds per symbol (latest date, row
+    # count, last fetch), loaded at startup and kept current after commits.
+    # Least recently used symbols beyond the limit are looked up in the database.
+    SYMBOL_STATE_ENABLED: bool = True
+    SYMBOL_STATE_MAX_ENTRIES: int = 100_000
+
+    # Concurrent ingests of the same dataset, symbol and parameters share one
+    # run; a successful result is reused by identical calls for a short window
+    INGEST_COALESCING_ENABLED: bool = True
+    INGEST_RESULT_REUSE_SECONDS: float = 5.0
+
+    # Skip balance-sheet and income-statement reports whose content hash
+    # matches the last stored version
+    REPORT_CHANGE_DETECTION: bool = True
+
+    # Read API: page sizes and rendered responses kept for ETag revalidation
+    READ_PAGE_DEFAULT_LIMIT: int = 500
+    READ_PAGE_MAX_LIMIT: int = 5000
+    READ_CACHE_MAX_ENTRIES: int = 1024
+
+    # Parquet snapshot export (requires the optional 'pyarrow' package).
+    # EXPORT_AFTER_BATCH runs an incremental export when a batch job finishes.
+    EXPORT_DIR: str = "./export"
+    EXPORT_AFTER_BATCH: bool = False
+    EXPORT_COMPRESSION: str = "zstd"
+    EXPORT_WATERMARK_OVERLAP_SECONDS: float = 300.0
+
+    # Background batch jobs, queued in the service database. Failed items
+    # are retried with exponential backoff, then dead-lettered.
+    BATCH_MAX_CONCURRENCY: int = 8
+    JOB_HISTORY_LIMIT: int = 100
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 30.0
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    JOB_POLL_SECONDS: float = 1.0
+
+    # Pipeline mode for batch jobs: job workers only fetch, parse and
+    # validate, and a single writer commits their rows in large transactions
+    INGEST_PIPELINE_ENABLED: bool = False
+    PIPELINE_QUEUE_SIZE: int = 64
+    PIPELINE_FLUSH_ROWS: int = 20000
+    PIPELINE_FLUSH_SECONDS: float = 2.0
+
+    # Opt-in sampling profiler for the ingest routes. Requests sending
+    # "X-Profile: 1" are profiled when PROFILE_HEADER_ENABLED is set, and
+    # PROFILE_SAMPLE_RATE of all ingest requests are profiled regardless.
+    PROFILE_HEADER_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_KEEP: int = 200
+
+    # Logging. Records go through a queue to background writer threads, and
+    # each call site is limited to LOG_RATE_LIMIT_PER_SITE records per window.
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "ingestion_service.log"
+    LOG_FILE_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" or "json"
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_RATE_LIMIT_PER_SITE: int = 20
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = 10.0
+    SQL_LOG_LEVEL: str = "WARNING"
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     def __init__(self, **kwargs):
@@ -0,0 +1,89 @@
+"""
+Tests for BackfillLoader with the scaled daily-price layout: prices must be
+staged as integer ticks on both the COPY (PostgreSQL) and the executemany
+(SQLite) paths.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import BigInteger, Column, Date, Float, MetaData, String, Table, text
+from sqlalchemy.dialects import postgresql
+
+from src.database import SessionLocal
+from src.models.daily_price import PRICE_SCALE, ScaledPrice
+from src.repositories.backfill import BackfillLoader, copy_buffer
+from src.repositories.bulk import UnsupportedDialectError
+from src.schemas.batch import ColumnBatch
+
+KEY_COLUMNS = ("symbol", "trade_date")
+UPDATE_COLUMNS = ("close_price", "volume")
+
+
+def _scaled_table(metadata=None):
+    return Table(
+        "scaled_prices",
+        metadata or MetaData(),
+        Column("symbol", String, primary_key=True),
+        Column("trade_date", Date, primary_key=True),
+        Column("close_price", ScaledPrice),
+        Column("volume", BigInteger),
+    )
+
+
+def _batch(closes, volume=100):
+    days = [date(2024, 1, 2 + i) for i in range(len(closes))]
+    return ColumnBatch(columns={
+        "symbol": ["AAA"] * len(days),
+        "trade_date": days,
+        "close_price": list(closes),
+        "volume": [volume] * len(days),
+    })
+
+
+def test_copy_rows_go_through_bind_processors():
+    table = _scaled_table()
+    names = ["symbol", "trade_date", "close_price", "volume"]
+    batch = _batch([123.45678, None, 0.0001])
+    for dialect in (postgresql.psycopg2.dialect(), postgresql.psycopg.dialect()):
+        lines = copy_buffer(table, names, [batch.columns[n] for n in names], dialect).read().splitlines()
+        assert lines == [
+            "AAA,2024-01-02,1234568,100",
+            "AAA,2024-01-03,\\N,100",
+            "AAA,2024-01-04,1,100",
+        ]
+
+
+def test_copy_leaves_plain_columns_alone():
+    table = Table("plain", MetaData(), Column("symbol", String), Column("close_price", Float))
+    buffer = copy_buffer(table, ["symbol", "close_price"], [["A,B", ""], [1.5, None]], postgresql.psycopg2.dialect())
+    # With NULL '\N', an unquoted empty field is read back as an empty string
+    assert buffer.read().splitlines() == ['"A,B",1.5', ",\\N"]
+
+
+def test_scaled_backfill_on_sqlite(db_tables):
+    metadata = MetaData()
+    table = _scaled_table(metadata)
+    metadata.create_all(db_tables)
+    target = SimpleNamespace(__table__=table)
+    try:
+        with SessionLocal() as db:
+            loader = BackfillLoader(db)
+            loader.stage(target, _batch([10.5, 11.25]), KEY_COLUMNS, UPDATE_COLUMNS)
+            # Restaged keys keep their last version
+            loader.stage(target, _batch([10.75], volume=200), KEY_COLUMNS, UPDATE_COLUMNS)
+            result = loader.merge()["scaled_prices"]
+            db.commit()
+            assert (result.inserted, result.updated) == (2, 0)
+
+            stored = db.execute(text("SELECT close_price, volume FROM scaled_prices ORDER BY trade_date")).all()
+            assert [tuple(row) for row in stored] == [(107500, 200), (112500, 100)]
+            assert db.execute(table.select().order_by(table.c.trade_date)).first().close_price == 107500 / PRICE_SCALE
+    finally:
+        metadata.drop_all(db_tables)
+
+
+def test_unsupported_dialect_names_the_database():
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="oracle")))
+    with pytest.raises(UnsupportedDialectError, match="'oracle'"):
+        BackfillLoader(db)
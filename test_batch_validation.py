@@ -0,0 +1,65 @@
+"""
+Tests for column-wise batch validation: rejected records are reported by
+their index in the parsed input, and only valid records reach the columns.
+"""
+from datetime import date
+
+from src.schemas.balance_sheet import BalanceSheetIn
+from src.schemas.batch import BatchValidator
+from src.schemas.price import DailyPriceIn
+
+
+def _price(day, close="1.5", **overrides):
+    record = {"symbol": "AAA", "date": day, "open_price": "1.0", "high_price": "2.0",
+              "low_price": "0.5", "close_price": close, "volume": "100"}
+    record.update(overrides)
+    return record
+
+
+def test_rejected_records_keep_their_input_index():
+    parsed = [
+        _price("2024-01-01"),
+        _price("2024-01-02", close="n/a"),
+        _price("2024-01-03"),
+        _price("not-a-date", volume="many"),
+        {k: v for k, v in _price("2024-01-05").items() if k != "volume"},
+        _price("2024-01-06", close="2.5"),
+    ]
+    batch = BatchValidator(DailyPriceIn).validate(parsed)
+
+    assert [idx for idx, _ in batch.rejected] == [1, 3, 4]
+    reasons = dict(batch.rejected)
+    assert reasons[1].startswith("close_price:")
+    # A record failing several fields is reported once, for its first field
+    assert reasons[3].startswith("trade_date:")
+    assert reasons[4].startswith("volume:")
+
+    assert len(batch) == 3
+    assert batch.columns["trade_date"] == [date(2024, 1, 1), date(2024, 1, 3), date(2024, 1, 6)]
+    assert batch.columns["close_price"] == [1.5, 1.5, 2.5]
+    assert batch.rows(2) == [{
+        "symbol": "AAA", "trade_date": date(2024, 1, 6), "open_price": 1.0, "high_price": 2.0,
+        "low_price": 0.5, "close_price": 2.5, "volume": 100,
+    }]
+
+
+def test_columns_input_matches_record_input():
+    records = [
+        {"symbol": "AAA", "fiscal_date_ending": "2023-12-31", "reported_currency": "USD",
+         "total_assets": "10", "total_liabilities": None, "total_shareholder_equity": "4"},
+        {"symbol": "AAA", "fiscal_date_ending": "2022-12-31", "reported_currency": "USD",
+         "total_assets": "lots", "total_liabilities": "3", "total_shareholder_equity": None},
+    ]
+    validator = BatchValidator(BalanceSheetIn)
+    by_record = validator.validate(records)
+    by_column = validator.validate_columns({key: [r[key] for r in records] for key in records[0]})
+
+    assert by_record == by_column
+    assert [idx for idx, _ in by_record.rejected] == [1]
+    assert by_record.columns["total_liabilities"] == [None]
+
+
+def test_missing_column_rejects_every_record():
+    batch = BatchValidator(DailyPriceIn).validate_columns({"symbol": ["AAA", "BBB"], "date": ["2024-01-01"] * 2})
+    assert [idx for idx, _ in batch.rejected] == [0, 1]
+    assert len(batch) == 0
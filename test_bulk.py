@@ -0,0 +1,60 @@
+"""
+Tests for bulk_upsert: insert/update counts when keys repeat across
+chunks, and the error for databases without ON CONFLICT support.
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.database import SessionLocal
+from src.models.daily_price import DailyPrice
+from src.repositories import bulk
+from src.repositories.bulk import UnsupportedDialectError, bulk_upsert
+from src.repositories.data_repository import DailyPriceRepository
+from src.schemas.batch import ColumnBatch
+
+START = date(2024, 1, 1)
+
+
+def _prices(offsets, close=1.5):
+    days = [START + timedelta(days=i) for i in offsets]
+    n = len(days)
+    return ColumnBatch(columns={
+        "symbol": ["AAA"] * n,
+        "trade_date": days,
+        "open_price": [1.0] * n,
+        "high_price": [2.0] * n,
+        "low_price": [0.5] * n,
+        "close_price": [close + i for i in range(n)],
+        "volume": [100] * n,
+    })
+
+
+def _upsert(rows):
+    with SessionLocal() as db:
+        result = bulk_upsert(db, DailyPrice, rows, DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+        db.commit()
+    return result
+
+
+def test_keys_repeated_across_chunks_are_counted_once(db_tables, monkeypatch):
+    monkeypatch.setattr(bulk.settings, "UPSERT_CHUNK_SIZE", 2)
+    # Day 0 is in the first and the last chunk, day 1 in the first and second
+    batch = _prices([0, 1, 2, 1, 3, 0])
+    result = _upsert(batch)
+    assert (result.inserted, result.updated) == (4, 0)
+    with SessionLocal() as db:
+        stored = {p.trade_date: p.close_price for p in db.query(DailyPrice)}
+    # The last row of each key wins
+    assert stored[START] == pytest.approx(6.5) and stored[START + timedelta(days=1)] == pytest.approx(4.5)
+
+    # The same holds for row dictionaries, against stored keys
+    result = _upsert(_prices([3, 4, 4, 5]).rows())
+    assert (result.inserted, result.updated) == (2, 1)
+
+
+def test_unsupported_dialect_names_the_database():
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mssql")))
+    with pytest.raises(UnsupportedDialectError, match="'mssql'"):
+        bulk_upsert(db, DailyPrice, _prices([0]), DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
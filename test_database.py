@@ -0,0 +1,40 @@
+"""
+Tests for engine setup: the index migration runs its DDL once, and
+psycopg 3 engines prepare repeated statements on the server.
+"""
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from src import database
+from src.database import REDUNDANT_INDEXES, Base, ensure_indexes
+
+
+def test_index_migration_runs_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # An older layout: one model index missing, one redundant index present
+        conn.execute(text("DROP INDEX ix_daily_prices_trade_date_symbol"))
+        conn.execute(text("CREATE INDEX ix_daily_prices_symbol ON daily_prices (symbol)"))
+
+    ensure_indexes(engine)
+    names = {index["name"] for index in inspect(engine).get_indexes("daily_prices")}
+    assert "ix_daily_prices_trade_date_symbol" in names
+    assert not names & set(REDUNDANT_INDEXES)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    ensure_indexes(engine)
+    assert not [s for s in statements if s.lstrip().upper().startswith(("CREATE", "DROP"))]
+
+
+def test_psycopg_engines_prepare_statements(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(database, "create_engine", lambda url, **options: captured.update(options))
+    monkeypatch.setattr(database.settings, "DB_PREPARE_THRESHOLD", 3)
+
+    database.build_engine("postgresql+psycopg://user@localhost/db")
+    assert captured["connect_args"] == {"prepare_threshold": 3}
+    captured.clear()
+    database.build_engine("postgresql+psycopg2://user@localhost/db")
+    assert "connect_args" not in captured
@@ -0,0 +1,100 @@
+"""
+Tests for the incremental Parquet export: the first run writes every
+partition, later runs rewrite only the partitions changed since the
+watermark, and partitions whose rows are gone lose their file.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from src.database import SessionLocal
+from src.models.daily_price import DailyPrice
+from src.repositories.bulk import bulk_upsert
+from src.repositories.data_repository import DailyPriceRepository
+from src.repositories.export_repository import ExportPartitionRepository, batch_partitions
+from src.schemas.batch import ColumnBatch
+from src.schemas.jobs import Dataset
+from src.services.export import ParquetExporter
+
+
+def _prices(symbol, first, count, close=1.5):
+    days = [first + timedelta(days=i) for i in range(count)]
+    return ColumnBatch(columns={
+        "symbol": [symbol] * count,
+        "trade_date": days,
+        "open_price": [1.0] * count,
+        "high_price": [2.0] * count,
+        "low_price": [0.5] * count,
+        "close_price": [close] * count,
+        "volume": [100] * count,
+    })
+
+
+def _write(batch):
+    with SessionLocal() as db:
+        ExportPartitionRepository(db).stage("daily_prices", batch_partitions(batch, "trade_date"))
+        bulk_upsert(db, DailyPrice, batch, DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+        db.commit()
+
+
+def _closes(path):
+    table = pq.read_table(path)
+    return list(zip(table.column("trade_date").to_pylist(), table.column("close_price").to_pylist()))
+
+
+@pytest.fixture
+def exporter(db_tables, tmp_path):
+    return ParquetExporter(str(tmp_path), overlap_seconds=0)
+
+
+def test_only_changed_partitions_are_rewritten(exporter):
+    # AAA spans a year boundary: two partitions
+    _write(_prices("AAA", date(2023, 12, 30), 4))
+    _write(_prices("BBB", date(2024, 3, 1), 2))
+
+    summary = exporter.export([Dataset.DAILY_PRICES])
+    assert summary[Dataset.DAILY_PRICES] == {"partitions": 3, "rows": 6}
+    paths = {
+        key: exporter.partition_path(Dataset.DAILY_PRICES, *key)
+        for key in [("AAA", 2023), ("AAA", 2024), ("BBB", 2024)]
+    }
+    assert _closes(paths["AAA", 2023]) == [(date(2023, 12, 30), 1.5), (date(2023, 12, 31), 1.5)]
+    written = {key: path.stat().st_mtime_ns for key, path in paths.items()}
+
+    # Nothing changed: nothing is rewritten
+    assert exporter.export([Dataset.DAILY_PRICES])[Dataset.DAILY_PRICES] == {"partitions": 0, "rows": 0}
+
+    _write(_prices("AAA", date(2024, 1, 2), 1, close=9.5))
+    assert exporter.export([Dataset.DAILY_PRICES])[Dataset.DAILY_PRICES] == {"partitions": 1, "rows": 2}
+    assert _closes(paths["AAA", 2024]) == [(date(2024, 1, 1), 1.5), (date(2024, 1, 2), 9.5)]
+    assert paths["AAA", 2023].stat().st_mtime_ns == written["AAA", 2023]
+    assert paths["BBB", 2024].stat().st_mtime_ns == written["BBB", 2024]
+
+    # full=True rewrites every partition
+    assert exporter.export([Dataset.DAILY_PRICES], full=True)[Dataset.DAILY_PRICES] == {"partitions": 3, "rows": 6}
+
+
+def test_emptied_partition_loses_its_file(exporter):
+    _write(_prices("AAA", date(2024, 1, 1), 2))
+    exporter.export([Dataset.DAILY_PRICES])
+    path = exporter.partition_path(Dataset.DAILY_PRICES, "AAA", 2024)
+    assert path.exists()
+
+    with SessionLocal() as db:
+        db.execute(delete(DailyPrice).where(DailyPrice.symbol == "AAA"))
+        ExportPartitionRepository(db).stage("daily_prices", [("AAA", 2024)])
+        db.commit()
+    assert exporter.export([Dataset.DAILY_PRICES])[Dataset.DAILY_PRICES] == {"partitions": 1, "rows": 0}
+    assert not path.exists()
+
+
+def test_new_export_directory_exports_everything(exporter, tmp_path):
+    _write(_prices("AAA", date(2024, 1, 1), 2))
+    exporter.export([Dataset.DAILY_PRICES])
+
+    # A directory without watermarks starts with a full export
+    fresh = ParquetExporter(str(tmp_path / "fresh"), overlap_seconds=0)
+    assert fresh.export([Dataset.DAILY_PRICES])[Dataset.DAILY_PRICES] == {"partitions": 1, "rows": 2}
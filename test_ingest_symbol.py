@@ -0,0 +1,156 @@
+"""
+Tests for all-dataset ingestion: concurrent and single-dataset ingests of
+the same symbol share one fetch per dataset, the rows are committed in one
+transaction, and cancelling or failing a run writes nothing.
+"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from src.database import SessionLocal, run_in_db_thread
+from src.models.balance_sheet import BalanceSheet
+from src.models.daily_price import DailyPrice
+from src.models.income_statement import IncomeStatement
+from src.schemas.jobs import Dataset
+from src.services import ingestion
+from src.services.ingestion import IngestionService
+
+REPORTS = {"symbol": "AAA", "annualReports": [{"fiscalDateEnding": "2023-12-31", "totalAssets": "100", "totalRevenue": "50"}]}
+PRICES = {
+    "Meta Data": {"2. Symbol": "AAA"},
+    "Time Series (Daily)": {
+        "2024-01-02": {"1. open": "1.0", "2. high": "2.0", "3. low": "0.5", "4. close": "1.5", "5. volume": "100"},
+        "2024-01-03": {"1. open": "1.5", "2. high": "2.5", "3. low": "1.0", "4. close": "2.0", "5. volume": "120"},
+    },
+}
+
+
+class FakeFetches:
+    """Connector fetches that wait for ``release`` and count their calls."""
+
+    def __init__(self, service, fail=None):
+        self.calls = Counter()
+        self.release = asyncio.Event()
+        self.fail = fail
+
+        def fake(dataset, raw):
+            async def fetch(symbol, *args, **kwargs):
+                self.calls[dataset] += 1
+                await self.release.wait()
+                if dataset == self.fail:
+                    raise ValueError(f"{dataset.value} unavailable")
+                return raw
+            return fetch
+
+        service.balance_connector.fetch = fake(Dataset.BALANCE_SHEET, REPORTS)
+        service.is_connector.fetch = fake(Dataset.INCOME_STATEMENT, REPORTS)
+        fetch_prices = fake(Dataset.DAILY_PRICES, PRICES)
+
+        async def fetch_daily_prices(symbol, incremental):
+            raw = await fetch_prices(symbol)
+            return await run_in_db_thread(service._parse_daily_prices, symbol, raw)
+
+        service._fetch_daily_prices = fetch_daily_prices
+
+
+@pytest.fixture
+def service(db_tables, monkeypatch):
+    monkeypatch.setattr(ingestion.settings, "INGEST_COALESCING_ENABLED", True)
+    monkeypatch.setattr(ingestion.settings, "INGEST_RESULT_REUSE_SECONDS", 0.0)
+    return IngestionService()
+
+
+def _stored():
+    with SessionLocal() as db:
+        return tuple(db.query(model).count() for model in (BalanceSheet, DailyPrice, IncomeStatement))
+
+
+async def _settle():
+    # Let the callers start and reach their fetches
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_concurrent_ingests_share_one_fetch_per_dataset(service):
+    fetches = FakeFetches(service)
+
+    async def run():
+        first = asyncio.ensure_future(service.ingest_symbol("AAA"))
+        second = asyncio.ensure_future(service.ingest_symbol("AAA"))
+        await _settle()
+        single = asyncio.ensure_future(service.ingest_balance_sheet("aaa"))
+        await _settle()
+        fetches.release.set()
+        return await asyncio.gather(first, second, single)
+
+    first, second, single = asyncio.run(run())
+    assert fetches.calls == {Dataset.BALANCE_SHEET: 1, Dataset.DAILY_PRICES: 1, Dataset.INCOME_STATEMENT: 1}
+    assert {d: r.inserted for d, r in first.items()} == {
+        Dataset.BALANCE_SHEET: 1, Dataset.DAILY_PRICES: 2, Dataset.INCOME_STATEMENT: 1,
+    }
+    assert {d: r.inserted for d, r in second.items()} == {d: r.inserted for d, r in first.items()}
+    assert single.inserted == 1
+    # Shared results are copies
+    assert second is not first
+    assert _stored() == (1, 2, 1)
+
+
+def test_cancelling_one_caller_leaves_the_shared_run(service):
+    fetches = FakeFetches(service)
+
+    async def run():
+        first = asyncio.ensure_future(service.ingest_symbol("AAA"))
+        second = asyncio.ensure_future(service.ingest_symbol("AAA"))
+        await _settle()
+        first.cancel()
+        await _settle()
+        fetches.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    results = asyncio.run(run())
+    assert sum(fetches.calls.values()) == 3
+    assert results[Dataset.DAILY_PRICES].inserted == 2
+    assert _stored() == (1, 2, 1)
+
+
+def test_cancelling_every_caller_writes_nothing(service):
+    fetches = FakeFetches(service)
+
+    async def run():
+        only = asyncio.ensure_future(service.ingest_symbol("AAA"))
+        await _settle()
+        only.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await only
+        # The abandoned run may still be unwinding; wait for it to end
+        await service.cancel_ingests(abandoned_only=True)
+        assert await service.cancel_ingests() == 0
+        assert _stored() == (0, 0, 0)
+        # A later ingest starts afresh instead of joining the cancelled run
+        fetches.release.set()
+        return await service.ingest_symbol("AAA")
+
+    results = asyncio.run(run())
+    assert fetches.calls == {Dataset.BALANCE_SHEET: 2, Dataset.DAILY_PRICES: 2, Dataset.INCOME_STATEMENT: 2}
+    assert results[Dataset.BALANCE_SHEET].inserted == 1
+
+
+def test_a_failed_dataset_writes_nothing(service):
+    fetches = FakeFetches(service, fail=Dataset.INCOME_STATEMENT)
+
+    async def run():
+        first = asyncio.ensure_future(service.ingest_symbol("AAA"))
+        await _settle()
+        joined = asyncio.ensure_future(service.ingest_balance_sheet("AAA"))
+        await _settle()
+        fetches.release.set()
+        return await asyncio.gather(first, joined, return_exceptions=True)
+
+    first, joined = asyncio.run(run())
+    assert isinstance(first, ValueError) and "income_statement" in str(first)
+    # The balance sheet caller joined the failed transaction
+    assert isinstance(joined, Exception)
+    assert _stored() == (0, 0, 0)
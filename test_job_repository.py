@@ -0,0 +1,273 @@
+"""
+Tests for the durable job queue: JobRepository on SQLite, and the retry
+and dead-letter policy JobManager applies on top of it.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.connectors.base import AlphavantageAPIError
+from src.connectors.cache import CacheMissError
+from src.connectors.rate_limiter import QuotaExhaustedError, next_quota_reset
+from src.database import SessionLocal
+from src.repositories.bulk import UpsertResult
+from src.repositories.job_repository import JobRepository
+from src.schemas.jobs import Dataset, JobStatus
+from src.services.jobs import JobManager, retry_delay
+from src.settings import settings
+
+
+class FakeService:
+    """Stands in for IngestionService: returns or raises the queued outcomes in turn."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    async def ingest(self, dataset, symbol, write=None):
+        self.calls.append((dataset, symbol))
+        outcome = self.outcomes.pop(0) if self.outcomes else UpsertResult(inserted=1)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def cancel_ingests(self, abandoned_only=False):
+        return 0
+
+
+def _create(job_id, symbols, datasets=(Dataset.DAILY_PRICES,)):
+    with SessionLocal() as db:
+        JobRepository(db).create(job_id, symbols, [d.value for d in datasets])
+
+
+def _load(job_id):
+    with SessionLocal() as db:
+        job, items = JobRepository(db).get(job_id)
+        db.expunge_all()
+        return job, items
+
+
+def _later():
+    # Every retry scheduled by the tests is due by then
+    return datetime.utcnow() + timedelta(days=1)
+
+
+async def _process_next(manager):
+    item = await manager._claim()
+    assert item is not None
+    await manager._process(item)
+    return item
+
+
+@pytest.fixture
+def retry_now(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+
+
+def test_concurrent_claims_are_exclusive(db_tables):
+    symbols = [f"S{i:03d}" for i in range(60)]
+    _create("race", symbols, list(Dataset))
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        with SessionLocal() as db:
+            repository = JobRepository(db)
+            while True:
+                try:
+                    item = repository.claim(_later())
+                except OperationalError:
+                    # SQLite refuses a write on a stale snapshot; JobManager logs and retries
+                    db.rollback()
+                    continue
+                if item is not None:
+                    with lock:
+                        claimed.append(item.id)
+                    continue
+                _, items = _load("race")
+                if all(i.status != JobStatus.PENDING.value for i in items):
+                    return
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _, items = _load("race")
+    assert len(claimed) == len(set(claimed)) == len(symbols) * len(Dataset)
+    assert sorted(claimed) == sorted(i.id for i in items)
+    assert {i.status for i in items} == {JobStatus.RUNNING.value}
+
+
+def test_retry_delay_backs_off_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 100.0)
+    assert 15.0 <= retry_delay(1) <= 30.0
+    assert 30.0 <= retry_delay(2) <= 60.0
+    assert 50.0 <= retry_delay(10) <= 100.0
+
+
+def test_failed_item_is_retried_then_dead_lettered(db_tables, retry_now):
+    _create("flaky", ["AAA"])
+    manager = JobManager(FakeService(*[RuntimeError("upstream 503")] * 3))
+
+    async def run():
+        for attempt in (1, 2):
+            await _process_next(manager)
+            job, (item,) = _load("flaky")
+            assert item.status == JobStatus.PENDING.value
+            assert item.attempts == attempt
+            assert item.error == "upstream 503"
+            assert job.status == JobStatus.RUNNING.value
+        await _process_next(manager)
+        assert await manager._claim() is None
+
+    asyncio.run(run())
+    job, (item,) = _load("flaky")
+    assert item.status == JobStatus.FAILED.value
+    assert item.attempts == settings.JOB_MAX_ATTEMPTS
+    assert job.status == JobStatus.FAILED.value
+    assert job.finished_at is not None
+
+
+def test_retry_waits_for_its_backoff(db_tables, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 60.0)
+    _create("backoff", ["AAA"])
+    manager = JobManager(FakeService(RuntimeError("timeout")))
+
+    async def run():
+        await _process_next(manager)
+        # Pending again, but not due for another 30-60 seconds
+        assert await manager._claim() is None
+
+    asyncio.run(run())
+    _, (item,) = _load("backoff")
+    assert item.status == JobStatus.PENDING.value
+    assert item.next_attempt_at > datetime.utcnow() + timedelta(seconds=25)
+
+
+def test_cache_miss_is_dead_lettered_at_once(db_tables, retry_now):
+    _create("offline", ["AAA"])
+    manager = JobManager(FakeService(CacheMissError("no cached response")))
+    asyncio.run(_process_next(manager))
+
+    job, (item,) = _load("offline")
+    assert item.status == JobStatus.FAILED.value
+    assert item.attempts == 1
+    assert job.status == JobStatus.FAILED.value
+
+
+def test_unknown_symbol_is_dead_lettered_at_once(db_tables, retry_now):
+    _create("unknown", ["NOPE"])
+    service = FakeService(AlphavantageAPIError("API Error: Invalid API call"))
+    manager = JobManager(service)
+
+    async def run():
+        await _process_next(manager)
+        assert await manager._claim() is None
+
+    asyncio.run(run())
+    job, (item,) = _load("unknown")
+    assert len(service.calls) == 1
+    assert (item.status, item.attempts) == (JobStatus.FAILED.value, 1)
+    assert job.status == JobStatus.FAILED.value
+
+
+def test_exhausted_quota_waits_for_the_reset_without_an_attempt(db_tables, retry_now):
+    _create("quota", ["AAA", "BBB"])
+    resets_at = next_quota_reset()
+    exhausted = [QuotaExhaustedError("Daily Alphavantage quota of 25 calls exhausted", resets_at)] * 2
+    manager = JobManager(FakeService(*exhausted))
+
+    async def run():
+        # Every item is postponed, however many times the quota is hit
+        await _process_next(manager)
+        await _process_next(manager)
+        assert await manager._claim() is None
+
+    asyncio.run(run())
+    job, items = _load("quota")
+    assert resets_at.time() == datetime.min.time() and resets_at > datetime.utcnow()
+    for item in items:
+        assert (item.status, item.attempts) == (JobStatus.PENDING.value, 0)
+        assert item.next_attempt_at == resets_at
+        assert "quota" in item.error
+    assert job.status == JobStatus.RUNNING.value and job.finished_at is None
+
+    # After the reset the items run normally
+    with SessionLocal() as db:
+        assert JobRepository(db).claim(resets_at).symbol == "AAA"
+
+
+def test_requeue_running_resumes_interrupted_items(db_tables, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "BATCH_MAX_CONCURRENCY", 2)
+    _create("resume", ["AAA", "BBB"])
+    with SessionLocal() as db:
+        # A crash leaves the claimed item running
+        interrupted = JobRepository(db).claim(datetime.utcnow())
+    with SessionLocal() as db:
+        assert JobRepository(db).requeue_running() == 1
+    _, items = _load("resume")
+    assert all(i.status == JobStatus.PENDING.value and i.attempts == 0 for i in items)
+
+    # Claimed again and left running: JobManager.start requeues it before its workers run
+    with SessionLocal() as db:
+        assert JobRepository(db).claim(datetime.utcnow()).id == interrupted.id
+    service = FakeService()
+
+    async def run():
+        manager = JobManager(service)
+        await manager.start()
+        try:
+            deadline = time.monotonic() + 10
+            while (await manager.get("resume")).status != JobStatus.COMPLETED:
+                assert time.monotonic() < deadline, "job did not finish"
+                await asyncio.sleep(0.02)
+        finally:
+            await manager.shutdown()
+
+    asyncio.run(run())
+    job, items = _load("resume")
+    assert sorted(symbol for _, symbol in service.calls) == ["AAA", "BBB"]
+    assert all(i.status == JobStatus.COMPLETED.value and i.inserted == 1 for i in items)
+    assert job.finished_at is not None
+
+
+def test_final_status_once_every_item_is_done(db_tables, retry_now):
+    _create("mixed", ["AAA", "BBB"])
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        repository = JobRepository(db)
+        first = repository.claim(now)
+        repository.complete(first.id, inserted=3, updated=2, unchanged=0, seconds=0.1)
+        assert repository.finish_if_done("mixed", now) is None
+        second = repository.claim(now)
+        repository.fail(second.id, "boom", 0.1, retry_at=None)
+        # Completed as long as any item completed; written rows are summed
+        assert repository.finish_if_done("mixed", now) == (JobStatus.COMPLETED, 5)
+        # Only the first caller closes the job
+        assert repository.finish_if_done("mixed", now) is None
+    assert _load("mixed")[0].status == JobStatus.COMPLETED.value
+
+    _create("dead", ["AAA"])
+    with SessionLocal() as db:
+        repository = JobRepository(db)
+        repository.fail(repository.claim(datetime.utcnow()).id, "boom", 0.1, retry_at=None)
+        assert repository.finish_if_done("dead", now) == (JobStatus.FAILED, 0)
+
+
+def test_release_does_not_count_an_attempt(db_tables):
+    _create("release", ["AAA"])
+    with SessionLocal() as db:
+        repository = JobRepository(db)
+        item = repository.claim(datetime.utcnow())
+        repository.release(item.id)
+        again = repository.claim(datetime.utcnow())
+    assert again.id == item.id and again.attempts == 0
@@ -0,0 +1,149 @@
+"""
+Tests for the connector parsers: the daily-price field mapping and the
+fundamentals parsers must match the previous hand-written parsers (kept in
+benchmarks/bench_parsers.py), row by row and column by column.
+"""
+from datetime import date
+
+import pytest
+
+from benchmarks.bench_parsers import handwritten_balance, handwritten_income, handwritten_prices
+from src.connectors.alphavantage import (
+    DAILY_PRICE_MAPPING,
+    AlphavantageBalanceSheetConnector,
+    AlphavantageDailyPriceConnector,
+)
+from src.connectors.alphavantage_income import AlphavantageIncomeStatementConnector
+from src.connectors.mapping import Field, RowMapping
+from src.schemas.batch import get_batch_validator
+from src.schemas.price import DailyPriceIn
+
+
+def _session(close="1.5", **overrides):
+    values = {"1. open": "1.0", "2. high": "2.0", "3. low": "0.5", "4. close": close, "5. volume": "100"}
+    values.update(overrides)
+    return values
+
+
+def _prices(series):
+    return {"Meta Data": {"2. Symbol": "AAA"}, "Time Series (Daily)": series}
+
+
+def _transpose(records, columns):
+    return {column: [record[column] for record in records] for column in columns}
+
+
+REPORTS = [
+    {"fiscalDateEnding": "2023-12-31", "reportedCurrency": "EUR", "totalAssets": "10.5",
+     "totalLiabilities": "4", "totalShareholderEquity": "6.5", "totalRevenue": "100",
+     "grossProfit": "40", "operatingIncome": "20", "ebit": "18", "ebitda": "25", "netIncome": "12"},
+    # Alphavantage's "None" and empty strings stand for missing figures
+    {"fiscalDateEnding": "2022-12-31", "reportedCurrency": "USD", "totalAssets": "None",
+     "totalLiabilities": "", "totalShareholderEquity": "3", "totalRevenue": "None",
+     "grossProfit": "", "operatingIncome": "7", "ebit": "None", "ebitda": "", "netIncome": "1"},
+    # Missing keys fall back to the defaults
+    {"fiscalDateEnding": "2021-12-31"},
+]
+
+
+def test_balance_sheet_matches_handwritten_parser():
+    raw = {"symbol": "AAA", "annualReports": REPORTS}
+    parsed = AlphavantageBalanceSheetConnector().parse(raw)
+    assert parsed == handwritten_balance(raw)
+    assert parsed[1]["total_assets"] is None and parsed[1]["total_liabilities"] is None
+    assert parsed[2]["reported_currency"] == "USD"
+
+
+def test_income_statement_matches_handwritten_parser():
+    raw = {"symbol": "AAA", "annualReports": REPORTS}
+    parsed = AlphavantageIncomeStatementConnector().parse(raw)
+    assert parsed == handwritten_income(raw)
+    assert parsed[1]["total_revenue"] is None and parsed[1]["gross_profit"] is None
+
+
+def test_malformed_reports_are_skipped():
+    reports = [
+        REPORTS[0],
+        {"reportedCurrency": "USD", "totalAssets": "1"},  # no fiscalDateEnding
+        {"fiscalDateEnding": "2020-13-45", "totalAssets": "1"},
+        {"fiscalDateEnding": "2019-12-31", "totalAssets": "n/a"},
+        REPORTS[2],
+    ]
+    raw = {"symbol": "AAA", "annualReports": reports}
+    parsed = AlphavantageBalanceSheetConnector().parse(raw)
+    assert parsed == handwritten_balance(raw)
+    assert [r["fiscal_date_ending"] for r in parsed] == [date(2023, 12, 31), date(2021, 12, 31)]
+    # The old income parser aborted the whole payload on a missing date; now the row is skipped
+    parsed = AlphavantageIncomeStatementConnector().parse(raw)
+    assert [r["fiscal_date_ending"] for r in parsed] == [
+        date(2023, 12, 31), date(2019, 12, 31), date(2021, 12, 31)
+    ]
+
+
+def test_daily_prices_match_handwritten_parser():
+    series = {f"2024-01-{day:02d}": _session(close=f"{day}.25") for day in range(2, 20)}
+    raw = _prices(series)
+    prices = AlphavantageDailyPriceConnector()
+    expected = handwritten_prices(raw)
+    assert prices.parse(raw) == expected
+    assert prices.parse_columns(raw) == _transpose(expected, expected[0])
+
+
+def test_daily_prices_since_cutoff_is_exclusive():
+    series = {f"2024-01-{day:02d}": _session() for day in range(2, 12)}
+    raw = _prices(series)
+    prices = AlphavantageDailyPriceConnector()
+    since = date(2024, 1, 7)
+    expected = handwritten_prices(raw, since=since)
+    assert [r["date"] for r in expected] == [f"2024-01-{day:02d}" for day in range(8, 12)]
+    assert prices.parse(raw, since=since) == expected
+    assert prices.parse_columns(raw, since=since) == _transpose(expected, expected[0])
+    assert prices.parse_columns(raw, since=date(2024, 2, 1))["date"] == []
+
+
+def test_malformed_sessions_fall_back_to_row_by_row_parsing():
+    series = {
+        "2024-01-02": _session(),
+        "2024-01-03": _session(close="None"),
+        "2024-01-04": _session(**{"5. volume": ""}),
+        "2024-01-05": {"1. open": "1.0"},
+        "2024-01-08": _session(close="2.5"),
+    }
+    raw = _prices(series)
+    expected = handwritten_prices(raw)
+    assert [r["date"] for r in expected] == ["2024-01-02", "2024-01-08"]
+
+    rows, skipped = DAILY_PRICE_MAPPING.parse(series.items(), "AAA")
+    assert (rows, skipped) == (expected, 3)
+    columns, skipped = DAILY_PRICE_MAPPING.parse_columns(series.items(), "AAA")
+    assert (columns, skipped) == (_transpose(expected, expected[0]), 3)
+    # The fallback keeps the cutoff
+    columns, skipped = DAILY_PRICE_MAPPING.parse_columns(series.items(), "AAA", since="2024-01-03")
+    assert columns["date"] == ["2024-01-08"] and skipped == 2
+
+
+def test_column_validation_matches_row_validation():
+    series = {f"2024-01-{day:02d}": _session() for day in range(2, 9)}
+    series["2024-02-30"] = _session()  # parses, but is not a valid date
+    raw = _prices(series)
+    prices = AlphavantageDailyPriceConnector()
+    validator = get_batch_validator(DailyPriceIn)
+    by_rows = validator.validate(prices.parse(raw))
+    by_columns = validator.validate_columns(prices.parse_columns(raw))
+    assert by_columns == by_rows
+    assert len(by_columns) == 7 and by_columns.rejected[0][0] == 7
+
+    columns = prices.parse_columns(raw)
+    del columns["volume"]
+    assert len(validator.validate_columns(columns)) == 0
+
+
+def test_invalid_mappings_are_refused():
+    with pytest.raises(ValueError, match="duplicate"):
+        RowMapping("bad", [Field("a", "x"), Field("a", "y")])
+    with pytest.raises(ValueError, match="converter"):
+        RowMapping("bad", [Field("a", "x", "decimal")])
+    with pytest.raises(ValueError, match="argument"):
+        RowMapping("bad", [Field("day", arg="key")])
+    with pytest.raises(ValueError, match="key or an arg"):
+        RowMapping("bad", [Field("a")])
@@ -0,0 +1,92 @@
+"""
+Tests for request profiling: profiles are saved with the sampled stacks,
+failures are recorded, and the sampler is stopped off the event loop.
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from src.services import profiling
+from src.services.profiling import PROFILE_ID_HEADER, ProfileStore, RequestProfiler, StackSampler
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling.settings, "PROFILE_HEADER_ENABLED", True)
+    monkeypatch.setattr(profiling.settings, "PROFILE_INTERVAL_MS", 2.0)
+    return RequestProfiler(ProfileStore(str(tmp_path), keep=5))
+
+
+def _request(profile=True):
+    return SimpleNamespace(headers={"X-Profile": "1"} if profile else {})
+
+
+def test_profiled_request_is_saved_with_its_stacks(profiler):
+    response = Response()
+
+    async def run():
+        async with profiler.profile(_request(), response, "daily_prices", "AAA"):
+            _busy(0.1)
+
+    asyncio.run(run())
+    profile_id = response.headers[PROFILE_ID_HEADER]
+    detail = profiler.store.get(profile_id, limit=50)
+    assert (detail.endpoint, detail.symbol, detail.outcome, detail.trigger) == ("daily_prices", "AAA", "success", "header")
+    assert detail.samples > 0
+    assert any(f.function.startswith("_busy ") for f in detail.functions)
+    assert "event-loop;" in profiler.store.folded(profile_id)
+    assert [info.id for info in profiler.store.recent(10)] == [profile_id]
+
+
+def test_failed_request_is_saved_with_its_error(profiler):
+    response = Response()
+
+    async def run():
+        async with profiler.profile(_request(), response, "all", "AAA"):
+            raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    info = profiler.store.get(response.headers[PROFILE_ID_HEADER], limit=5)
+    assert (info.outcome, info.error) == ("error", "upstream down")
+
+
+def test_unprofiled_requests_start_no_sampler(profiler):
+    response = Response()
+
+    async def run():
+        async with profiler.profile(_request(profile=False), response, "all", "AAA"):
+            pass
+
+    asyncio.run(run())
+    assert PROFILE_ID_HEADER not in response.headers
+    assert profiler.store.recent(10) == []
+
+
+def test_sampler_is_stopped_off_the_event_loop(profiler, monkeypatch):
+    stopped_on = []
+    stop = StackSampler.stop
+
+    def recording_stop(self):
+        stopped_on.append(threading.get_ident())
+        stop(self)
+
+    monkeypatch.setattr(StackSampler, "stop", recording_stop)
+
+    async def run():
+        async with profiler.profile(_request(), Response(), "all", "AAA"):
+            pass
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert stopped_on and stopped_on[0] != loop_thread
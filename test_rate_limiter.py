@@ -0,0 +1,83 @@
+"""
+Tests for the adaptive rate limiter: throttles reaching callers already
+queued, refunds for cancelled callers, and which responses count as
+throttling.
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.connectors.base import throttle_message
+from src.connectors.rate_limiter import AdaptiveRateLimiter, QuotaExhaustedError
+
+
+async def _timed_calls(limiter, n, throttle_after_reserving=False):
+    """Start ``n`` callers together; return when each got through, relative to the start."""
+    started = time.monotonic()
+    done = []
+
+    async def call(i):
+        await limiter.acquire()
+        done.append((i, time.monotonic() - started))
+
+    tasks = [asyncio.ensure_future(call(i)) for i in range(n)]
+    await asyncio.sleep(0.01)
+    if throttle_after_reserving:
+        limiter.on_throttle()
+    await asyncio.gather(*tasks)
+    return done
+
+
+def test_queued_callers_are_spaced_at_the_rate():
+    # 600 calls/min: one token every 0.1s
+    limiter = AdaptiveRateLimiter(calls_per_minute=600, burst=1)
+    done = asyncio.run(_timed_calls(limiter, 3))
+    assert [i for i, _ in done] == [0, 1, 2]
+    assert [round(t, 1) for _, t in done] == [0.0, 0.1, 0.2]
+
+
+def test_throttle_slows_callers_that_already_reserved():
+    limiter = AdaptiveRateLimiter(calls_per_minute=600, burst=1, backoff_factor=0.5)
+    # Callers 1 and 2 reserved at 600/min (due at 0.1s and 0.2s); the rate
+    # then halves, so they get through at 0.2s and 0.4s instead
+    done = asyncio.run(_timed_calls(limiter, 3, throttle_after_reserving=True))
+    assert [i for i, _ in done] == [0, 1, 2]
+    assert [round(t, 1) for _, t in done] == [0.0, 0.2, 0.4]
+
+
+def test_cancelled_caller_gets_its_token_and_daily_call_back():
+    limiter = AdaptiveRateLimiter(calls_per_minute=6, calls_per_day=2, burst=1)
+
+    async def run():
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert limiter._calls_today == 2
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(run())
+    assert limiter._calls_today == 1
+    # The next caller takes the refunded slot: one interval away, not two
+    _, wait = limiter._reserve()
+    assert 9.0 < wait <= 10.0
+    with pytest.raises(QuotaExhaustedError):
+        limiter._reserve()
+
+
+def test_only_rate_limit_notices_count_as_throttling():
+    assert throttle_message({"Note": (
+        "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+        "and 500 calls per day."
+    )})
+    assert throttle_message({"Information": (
+        "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."
+    )})
+    # Premium-only endpoints answer with an Information notice too
+    assert throttle_message({"Information": (
+        "Thank you for using Alpha Vantage! This is a premium endpoint. You may subscribe to any "
+        "of the premium plans at https://www.alphavantage.co/premium/ to instantly unlock all premium endpoints"
+    )}) is None
+    assert throttle_message({"Note": "rate limit", "Meta Data": {}}) is None
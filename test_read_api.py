@@ -0,0 +1,118 @@
+"""
+Tests for the read API: keyset pagination, ETags and 304s, and ETag
+versions that change on every commit, including commits made out of order.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database import SessionLocal
+from src.models.daily_price import DailyPrice
+from src.repositories import export_repository
+from src.repositories.bulk import bulk_upsert
+from src.repositories.data_repository import DailyPriceRepository
+from src.repositories.export_repository import ExportPartitionRepository, batch_partitions
+from src.routes.data import router
+from src.schemas.batch import ColumnBatch
+from src.services.read_cache import ReadCache
+
+START = date(2024, 1, 1)
+
+
+def _prices(symbol, first, count, close=1.5):
+    days = [START + timedelta(days=first + i) for i in range(count)]
+    return ColumnBatch(columns={
+        "symbol": [symbol] * count,
+        "trade_date": days,
+        "open_price": [1.0] * count,
+        "high_price": [2.0] * count,
+        "low_price": [0.5] * count,
+        "close_price": [close] * count,
+        "volume": [100] * count,
+    })
+
+
+def _write(batch, staged_at=None, monkeypatch=None):
+    """Write ``batch`` as ingestion does, with its export marks stamped at ``staged_at``."""
+    if staged_at is not None:
+        class _Clock(datetime):
+            @classmethod
+            def utcnow(cls):
+                return staged_at
+        monkeypatch.setattr(export_repository, "datetime", _Clock)
+    with SessionLocal() as db:
+        ExportPartitionRepository(db).stage("daily_prices", batch_partitions(batch, "trade_date"))
+        bulk_upsert(db, DailyPrice, batch, DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+        db.commit()
+
+
+@pytest.fixture
+def client(db_tables):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.read_cache = ReadCache(max_entries=100)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_keyset_pagination_walks_every_row_once(client):
+    _write(_prices("BBB", 0, 3))
+    _write(_prices("AAA", 0, 4))
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/daily-prices", params=params).json()
+        seen += [(item["symbol"], item["trade_date"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    expected = [("AAA", str(START + timedelta(days=i))) for i in range(4)]
+    expected += [("BBB", str(START + timedelta(days=i))) for i in range(3)]
+    assert seen == expected
+
+    # Filters apply on every page
+    page = client.get("/api/daily-prices", params={"symbol": "aaa", "start": "2024-01-02", "limit": 2}).json()
+    assert [item["trade_date"] for item in page["items"]] == ["2024-01-02", "2024-01-03"]
+    page = client.get("/api/daily-prices", params={"symbol": "aaa", "cursor": page["next_cursor"]}).json()
+    assert [item["trade_date"] for item in page["items"]] == ["2024-01-04"] and page["next_cursor"] is None
+
+    assert client.get("/api/daily-prices", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_matching_etag_gets_304(client):
+    _write(_prices("AAA", 0, 2))
+    first = client.get("/api/daily-prices", params={"symbol": "AAA"})
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and len(first.json()["items"]) == 2
+
+    assert client.get("/api/daily-prices", params={"symbol": "AAA"}, headers={"If-None-Match": etag}).status_code == 304
+    weak = f'"other", W/{etag}'
+    assert client.get("/api/daily-prices", params={"symbol": "AAA"}, headers={"If-None-Match": weak}).status_code == 304
+    # A different query has its own ETag
+    other = client.get("/api/daily-prices", params={"symbol": "AAA", "limit": 1}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    # Writes to another symbol leave this symbol's ETag alone, but not the dataset's
+    unfiltered = client.get("/api/daily-prices").headers["etag"]
+    _write(_prices("BBB", 0, 1))
+    assert client.get("/api/daily-prices", params={"symbol": "AAA"}, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/daily-prices", headers={"If-None-Match": unfiltered}).status_code == 200
+
+
+def test_out_of_order_commits_change_the_etag(client, monkeypatch):
+    later = datetime(2024, 6, 1, 12, 0, 1)
+    # Writer 1 staged its rows after writer 2, but commits first
+    _write(_prices("AAA", 0, 2), staged_at=later, monkeypatch=monkeypatch)
+    symbol_etag = client.get("/api/daily-prices", params={"symbol": "AAA"}).headers["etag"]
+    dataset_etag = client.get("/api/daily-prices").headers["etag"]
+
+    # Writer 2 commits last, into another year's partition and with the older mark
+    _write(_prices("AAA", -3, 2, close=9.5), staged_at=later - timedelta(seconds=1), monkeypatch=monkeypatch)
+
+    fresh = client.get("/api/daily-prices", params={"symbol": "AAA"}, headers={"If-None-Match": symbol_etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != symbol_etag
+    assert [item["close_price"] for item in fresh.json()["items"]] == [9.5, 9.5, 1.5, 1.5]
+    assert client.get("/api/daily-prices", headers={"If-None-Match": dataset_etag}).status_code == 200
@@ -0,0 +1,83 @@
+"""
+Tests for skipping unchanged annual reports: repeated payloads write
+nothing, changed reports are written, and rejected reports are retried.
+"""
+import pytest
+from sqlalchemy import event
+
+from src.database import SessionLocal, engine
+from src.models.balance_sheet import BalanceSheet
+from src.models.report_hash import ReportHash
+from src.services import ingestion
+from src.services.ingestion import IngestionService
+
+
+def _report(year, assets="100", currency="USD"):
+    return {
+        "fiscalDateEnding": f"{year}-12-31",
+        "reportedCurrency": currency,
+        "totalAssets": assets,
+        "totalLiabilities": "60",
+        "totalShareholderEquity": "40",
+    }
+
+
+def _raw(*reports):
+    return {"symbol": "AAA", "annualReports": list(reports)}
+
+
+@pytest.fixture
+def service(db_tables, monkeypatch):
+    monkeypatch.setattr(ingestion.settings, "REPORT_CHANGE_DETECTION", True)
+    return IngestionService()
+
+
+@pytest.fixture
+def writes():
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("SELECT", "PRAGMA")):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", collect)
+    yield statements
+    event.remove(engine, "before_cursor_execute", collect)
+
+
+def _counts(result):
+    return result.inserted, result.updated, result.unchanged
+
+
+def test_unchanged_reports_are_skipped(service, writes):
+    assert _counts(service._load_balance_sheet("AAA", _raw(_report(2023), _report(2022)))) == (2, 0, 0)
+
+    assert writes
+    writes.clear()
+    assert _counts(service._load_balance_sheet("AAA", _raw(_report(2023), _report(2022)))) == (0, 0, 2)
+    assert writes == []
+
+    # Only the changed report is written, and its hash replaced
+    result = service._load_balance_sheet("AAA", _raw(_report(2023, assets="120"), _report(2022)))
+    assert _counts(result) == (0, 1, 1)
+    with SessionLocal() as db:
+        assets = {row.fiscal_date_ending.year: row.total_assets for row in db.query(BalanceSheet)}
+        assert assets == {2023: 120.0, 2022: 100.0}
+        assert db.query(ReportHash).count() == 2
+    assert _counts(service._load_balance_sheet("AAA", _raw(_report(2023, assets="120"), _report(2022)))) == (0, 0, 2)
+
+
+def test_rejected_reports_store_no_hash(service):
+    result = service._load_balance_sheet("AAA", _raw(_report(2023), _report(2022, currency=None)))
+    assert _counts(result) == (1, 0, 0)
+    with SessionLocal() as db:
+        assert [h.fiscal_date_ending.year for h in db.query(ReportHash)] == [2023]
+
+    # The rejected report is validated again next time, and written once valid
+    assert _counts(service._load_balance_sheet("AAA", _raw(_report(2023), _report(2022)))) == (1, 0, 1)
+
+
+def test_change_detection_can_be_turned_off(service, monkeypatch):
+    service._load_balance_sheet("AAA", _raw(_report(2023)))
+    monkeypatch.setattr(ingestion.settings, "REPORT_CHANGE_DETECTION", False)
+    assert _counts(service._load_balance_sheet("AAA", _raw(_report(2023)))) == (0, 1, 0)
@@ -0,0 +1,60 @@
+"""
+Tests for the streaming TIME_SERIES_DAILY parser: entries split across
+chunks, payloads without a series, and malformed entries failing as soon
+as they are complete.
+"""
+import json
+
+import pytest
+
+from src.connectors.streaming import DailySeriesStreamParser
+
+SERIES = {
+    "2024-01-03": {"1. open": "2.0", "4. close": "2.5", "5. volume": "200"},
+    "2024-01-02": {"1. open": "1.0", "4. close": "1.5", "5. volume": "100"},
+}
+BODY = json.dumps({
+    "Meta Data": {"1. Information": "Daily Prices", "2. Symbol": "AAA"},
+    "Time Series (Daily)": SERIES,
+}, indent=4).encode()
+
+
+def _feed(parser, body, size):
+    entries = []
+    for i in range(0, len(body), size):
+        entries += parser.feed(body[i:i + size])
+    return entries
+
+
+@pytest.mark.parametrize("size", [1, 7, len(BODY)])
+def test_entries_split_across_chunks(size):
+    parser = DailySeriesStreamParser()
+    entries = _feed(parser, BODY, size)
+    parser.close()
+    assert entries == list(SERIES.items())
+    assert parser.symbol == "AAA" and parser.entries == 2
+
+
+def test_payload_without_series_is_decoded_on_close():
+    parser = DailySeriesStreamParser()
+    assert _feed(parser, b'{"Note": "Thank you for using Alpha Vantage!"}', 5) == []
+    parser.close()
+    assert not parser.found_series and parser.payload == {"Note": "Thank you for using Alpha Vantage!"}
+
+
+def test_malformed_entry_fails_once_more_input_is_buffered():
+    parser = DailySeriesStreamParser()
+    head, _, _ = BODY.partition(b'"2024-01-02"')
+    assert parser.feed(head) == [("2024-01-03", SERIES["2024-01-03"])]
+    # The entry is incomplete until its closing brace arrives
+    assert parser.feed(b'"2024-01-02": {"1. open": 1.0.0') == []
+    with pytest.raises(ValueError, match="Malformed TIME_SERIES_DAILY entry"):
+        parser.feed(b'}\n    }\n}')
+
+
+def test_truncated_series_fails_on_close():
+    parser = DailySeriesStreamParser()
+    entries = parser.feed(BODY[:-40])
+    with pytest.raises(ValueError, match="Truncated"):
+        parser.close()
+    assert entries == [("2024-01-03", SERIES["2024-01-03"])]
@@ -0,0 +1,190 @@
+"""
+Tests for the in-process symbol state index: loading, LRU eviction,
+record/invalidate, writes answered without state queries, and rollbacks.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from src.database import SessionLocal, engine
+from src.models.balance_sheet import BalanceSheet
+from src.models.daily_price import DailyPrice
+from src.models.income_statement import IncomeStatement
+from src.repositories import symbol_state
+from src.repositories.bulk import UpsertResult, bulk_upsert
+from src.repositories.data_repository import BalanceSheetRepository, DailyPriceRepository
+from src.repositories.symbol_state import SymbolStateIndex
+from src.schemas.batch import ColumnBatch
+
+PRICES = DailyPrice.__tablename__
+BALANCE = BalanceSheet.__tablename__
+INCOME = IncomeStatement.__tablename__
+START = date(2024, 1, 1)
+
+
+def _prices(symbol, first, count):
+    days = [START + timedelta(days=first + i) for i in range(count)]
+    return ColumnBatch(columns={
+        "symbol": [symbol] * count,
+        "trade_date": days,
+        "open_price": [1.0] * count,
+        "high_price": [2.0] * count,
+        "low_price": [0.5] * count,
+        "close_price": [1.5] * count,
+        "volume": [100] * count,
+    })
+
+
+def _balance(symbol, years):
+    return ColumnBatch(columns={
+        "symbol": [symbol] * len(years),
+        "fiscal_date_ending": [date(y, 12, 31) for y in years],
+        "reported_currency": ["USD"] * len(years),
+        "total_assets": [10.0] * len(years),
+        "total_liabilities": [4.0] * len(years),
+        "total_shareholder_equity": [6.0] * len(years),
+    })
+
+
+def _elsewhere(model, batch, key_columns, update_columns):
+    """Write as another process would: straight to the table, bypassing this index."""
+    with SessionLocal() as db:
+        bulk_upsert(db, model, batch, key_columns, update_columns)
+        db.commit()
+
+
+def _write_prices(batch):
+    with SessionLocal() as db:
+        return DailyPriceRepository(db).upsert_many(batch)
+
+
+@pytest.fixture
+def index(db_tables, monkeypatch):
+    index = SymbolStateIndex(max_entries=100)
+    monkeypatch.setattr(symbol_state, "_default_index", index)
+    monkeypatch.setattr(symbol_state.settings, "SYMBOL_STATE_ENABLED", True)
+    return index
+
+
+def test_load_reads_every_table_in_one_query(index):
+    _elsewhere(DailyPrice, _prices("AAA", 0, 5), DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+    _elsewhere(DailyPrice, _prices("BBB", 3, 2), DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+    _elsewhere(BalanceSheet, _balance("AAA", [2021, 2022]), BalanceSheetRepository.KEY_COLUMNS, BalanceSheetRepository.UPDATE_COLUMNS)
+    with SessionLocal() as db:
+        assert index.load(db) == 3
+
+    aaa = index.lookup(PRICES, "AAA")
+    # SQLite returns the UNION's dates as text; they are parsed back
+    assert aaa.latest == START + timedelta(days=4) and isinstance(aaa.latest, date)
+    assert aaa.rows == 5
+    assert index.lookup(PRICES, "BBB").latest == START + timedelta(days=4)
+    assert (index.lookup(BALANCE, "AAA").latest, index.lookup(BALANCE, "AAA").rows) == (date(2022, 12, 31), 2)
+    assert index.lookup(INCOME, "AAA") is None
+
+
+def test_load_over_capacity_and_lru_eviction(index):
+    for symbol in ("AAA", "BBB", "CCC"):
+        _elsewhere(DailyPrice, _prices(symbol, 0, 2), DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+    index.max_entries = 2
+    with SessionLocal() as db:
+        assert index.load(db) == 2
+        (missing,) = {"AAA", "BBB", "CCC"} - {s for _, s in index._entries}
+        assert index.lookup(PRICES, missing) is None
+        # A miss is answered by the database, and evicts the least recently used entry
+        indexed = [s for _, s in index._entries]
+        index.lookup(PRICES, indexed[0])
+        assert index.latest(db, PRICES, missing) == START + timedelta(days=1)
+    assert len(index) == 2
+    assert index.lookup(PRICES, indexed[1]) is None
+    assert index.lookup(PRICES, indexed[0]) is not None
+
+
+@pytest.fixture
+def state_queries():
+    """Collect the symbol-state reads (max date and count) sent to the database."""
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if "count(*)" in statement and "max(" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", collect)
+    yield statements
+    event.remove(engine, "before_cursor_execute", collect)
+
+
+def test_writes_are_answered_from_the_index(index, state_queries):
+    _elsewhere(DailyPrice, _prices("AAA", 0, 10), DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+
+    # Not indexed: read once from the database, in the writing transaction
+    result = _write_prices(_prices("AAA", 0, 15))
+    assert (result.inserted, result.updated) == (5, 10)
+    assert len(state_queries) == 1
+    state = index.lookup(PRICES, "AAA")
+    assert (state.latest, state.rows) == (START + timedelta(days=14), 15)
+
+    # Indexed: later writes need no state query, and their counts stay exact
+    result = _write_prices(_prices("AAA", 12, 6))
+    assert (result.inserted, result.updated) == (3, 3)
+    assert len(state_queries) == 1
+    state = index.lookup(PRICES, "AAA")
+    assert (state.latest, state.rows) == (START + timedelta(days=17), 18)
+
+
+def test_rolled_back_writes_are_discarded(index, monkeypatch):
+    _write_prices(_prices("AAA", 0, 3))
+    with SessionLocal() as db:
+        def fail():
+            raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+        monkeypatch.setattr(db, "commit", fail)
+        with pytest.raises(OperationalError):
+            DailyPriceRepository(db).upsert_many(_prices("AAA", 3, 4))
+    assert index.lookup(PRICES, "AAA") is None
+    with SessionLocal() as db:
+        assert index.latest(db, PRICES, "AAA") == START + timedelta(days=2)
+    assert index.lookup(PRICES, "AAA").rows == 3
+
+
+def test_other_processes_are_seen_after_invalidation(index):
+    _write_prices(_prices("AAA", 0, 10))
+    # Another process appends five days behind the index's back
+    _elsewhere(DailyPrice, _prices("AAA", 10, 5), DailyPriceRepository.KEY_COLUMNS, DailyPriceRepository.UPDATE_COLUMNS)
+    assert index.lookup(PRICES, "AAA").latest == START + timedelta(days=9)
+
+    # Once invalidated, the symbol is re-read and counts are exact again
+    index.invalidate(PRICES, ["AAA"])
+    result = _write_prices(_prices("AAA", 13, 4))
+    assert (result.inserted, result.updated) == (2, 2)
+    state = index.lookup(PRICES, "AAA")
+    assert (state.latest, state.rows) == (START + timedelta(days=16), 17)
+
+
+def test_new_after_for_new_and_mixed_batches(index):
+    with SessionLocal() as db:
+        assert index.new_after(db, PRICES, _prices("NEW", 0, 3)) == date.min
+        mixed = ColumnBatch(columns={"symbol": ["AAA", "BBB"], "trade_date": [START, START]})
+        assert index.new_after(db, PRICES, mixed) is None
+
+
+def test_record_and_invalidate(index):
+    result = _write_prices(_prices("AAA", 0, 3))
+    assert (result.inserted, result.updated) == (3, 0)
+    assert index.lookup(PRICES, "AAA").rows == 3
+    assert index.lookup(PRICES, "AAA").fetched_at is not None
+
+    # Mixed batches have no per-symbol counts: their symbols are dropped
+    mixed = ColumnBatch(columns={**_prices("AAA", 3, 1).columns})
+    for name, values in _prices("BBB", 0, 1).columns.items():
+        mixed.columns[name] += values
+    index.record(PRICES, mixed, UpsertResult(inserted=2))
+    assert index.lookup(PRICES, "AAA") is None and index.lookup(PRICES, "BBB") is None
+
+    # The next write re-reads the symbol, so the count is exact again
+    _write_prices(_prices("AAA", 4, 1))
+    assert index.lookup(PRICES, "AAA").rows == 4
+    index.invalidate(PRICES, ["AAA"])
+    assert index.lookup(PRICES, "AAA") is None
+    with SessionLocal() as db:
+        assert index.latest(db, PRICES, "AAA") == START + timedelta(days=4)